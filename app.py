@@ -1,14 +1,25 @@
-﻿import random
+﻿import bisect
+import gzip
+import hashlib
+import hmac
+import itertools
+import json
+import math
+import os
+import random
 import string
 import threading
 import time
 import uuid
-from collections import Counter
+import zlib
+from collections import Counter, OrderedDict, deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set, Tuple, Union
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple, Union
 
 from flask import (
     Flask,
+    Response,
+    g,
     jsonify,
     redirect,
     render_template,
@@ -17,6 +28,13 @@ from flask import (
     url_for,
 )
 
+import assets
+import history
+import memory
+import profiler
+import roles
+import wire
+
 def random_drawing():
     drawings = [
         "cuzgabs todo teso","kika a mamar mariana", "miguel a dar o cu",
@@ -131,15 +149,21 @@ def _default_task_pool() -> Dict[str, List[Union[str, Dict[str, object]]]]:
     }
 
 
+# Built asset URLs (see assets.py); the source files when the build has not run.
+ASSETS = assets.load_manifest(os.path.join(os.path.dirname(os.path.abspath(__file__)), "static"))
+
 AVATAR_POOL: List[str] = [
-    "/static/img/avatars/avatar-red.svg",
-    "/static/img/avatars/avatar-blue.svg",
-    "/static/img/avatars/avatar-green.svg",
-    "/static/img/avatars/avatar-yellow.svg",
-    "/static/img/avatars/avatar-pink.svg",
-    "/static/img/avatars/avatar-orange.svg",
-    "/static/img/avatars/avatar-cyan.svg",
-    "/static/img/avatars/avatar-purple.svg",
+    ASSETS.avatar(name)
+    for name in (
+        "avatar-red",
+        "avatar-blue",
+        "avatar-green",
+        "avatar-yellow",
+        "avatar-pink",
+        "avatar-orange",
+        "avatar-cyan",
+        "avatar-purple",
+    )
 ]
 
 
@@ -148,6 +172,9 @@ class TaskItem:
     task_id: str
     name: str
     done: bool = False
+    category: str = ""
+    assigned_at: float = 0.0
+    completed_at: Optional[float] = None
 
     def to_payload(self) -> Dict[str, object]:
         return {"id": self.task_id, "name": self.name, "done": self.done}
@@ -175,11 +202,11 @@ class Player:
     killed_by: Optional[str] = None
     killed_by_name: Optional[str] = None
     death_reported: bool = False
+    death_reported_at: Optional[float] = None
     left_game: bool = False
     emergency_available: bool = True
-    medic_vitals_active_until: float = 0.0
-    medic_vitals_ready: bool = True
-    medic_completed_tasks: Set[str] = field(default_factory=set)
+    # Per-round data owned by the player's role plugins (see roles.py).
+    role_state: Dict[str, object] = field(default_factory=dict)
 
     def lobby_payload(self, current_id: str, leader_id: Optional[str]) -> Dict[str, object]:
         return {
@@ -211,10 +238,6 @@ class Player:
             payload.pop("killedByName", None)
         return payload
 
-    def kill_cooldown_remaining(self) -> int:
-        remaining = max(0.0, self.kill_cooldown_end - time.time())
-        return int(remaining)
-
     def tasks_payload(self) -> Dict[str, List[Dict[str, object]]]:
         payload: Dict[str, List[Dict[str, object]]] = {}
         for category, items in self.tasks.items():
@@ -222,6 +245,548 @@ class Player:
         return payload
 
 
+@dataclass
+class ReplayEntry:
+    created_at: float
+    done: threading.Event = field(default_factory=threading.Event)
+    status_code: int = 0
+    body: Optional[Dict[str, object]] = None
+
+
+class IdempotencyCache:
+    """Remember recent action responses so retried POSTs can be replayed.
+
+    Entries are keyed by ``(player_id, path, key)``, expire after ``ttl``
+    seconds and the oldest ones are dropped once ``max_entries`` is reached.
+    The cache has its own lock so replays never wait on the game lock.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 120.0) -> None:
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str, str], ReplayEntry]" = OrderedDict()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def _purge_expired_locked(self, now: float) -> None:
+        while self._entries:
+            scope, entry = next(iter(self._entries.items()))
+            if now - entry.created_at < self.ttl:
+                break
+            self._entries.pop(scope)
+            entry.done.set()
+            self.expired += 1
+
+    def claim(self, scope: Tuple[str, str, str]) -> Tuple[ReplayEntry, bool]:
+        with self._lock:
+            now = time.time()
+            self._purge_expired_locked(now)
+            entry = self._entries.get(scope)
+            if entry:
+                self.hits += 1
+                return entry, False
+            self.misses += 1
+            entry = ReplayEntry(created_at=now)
+            self._entries[scope] = entry
+            while len(self._entries) > self.max_entries:
+                _, dropped = self._entries.popitem(last=False)
+                dropped.done.set()
+                self.evicted += 1
+            return entry, True
+
+    def complete(self, entry: ReplayEntry, status_code: int, body: Dict[str, object]) -> None:
+        entry.status_code = status_code
+        entry.body = body
+        entry.done.set()
+
+    def abandon(self, scope: Tuple[str, str, str], entry: ReplayEntry) -> None:
+        with self._lock:
+            if self._entries.get(scope) is entry:
+                self._entries.pop(scope)
+        entry.done.set()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            self._purge_expired_locked(time.time())
+            return {
+                "size": len(self._entries),
+                "maxEntries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evicted": self.evicted,
+            }
+
+
+@dataclass
+class ChatMessage:
+    message_id: int
+    player_id: str
+    name: str
+    text: str
+    sent_at: float
+    ghost: bool
+
+    def payload(self) -> Dict[str, object]:
+        return {
+            "id": self.message_id,
+            "playerId": self.player_id,
+            "name": self.name,
+            "text": self.text,
+            "at": int(self.sent_at * 1000),
+            "ghost": self.ghost,
+        }
+
+
+class MeetingChat:
+    """Messages of the current meeting in a fixed-size ring, guarded by the lobby lock.
+
+    Ids keep increasing across meetings, so a client cursor stays valid when
+    the next meeting clears the ring.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._messages: Deque[ChatMessage] = deque(maxlen=capacity)
+        self.meeting_id: Optional[str] = None
+        self.last_id = 0
+        self._first_meeting_id = 1
+
+    def reset(self, meeting_id: Optional[str]) -> None:
+        self._messages.clear()
+        self.meeting_id = meeting_id
+        self._first_meeting_id = self.last_id + 1
+
+    def append(self, player: Player, text: str, now: float) -> ChatMessage:
+        self.last_id += 1
+        message = ChatMessage(self.last_id, player.player_id, player.name, text, now, not player.alive)
+        self._messages.append(message)
+        return message
+
+    def since(self, after: int, see_ghosts: bool) -> Tuple[List[ChatMessage], bool]:
+        """Messages newer than ``after`` the viewer may read, and whether some were overwritten."""
+        if not self._messages or after >= self.last_id:
+            return [], False
+        first = self._messages[0].message_id
+        truncated = first > self._first_meeting_id and after + 1 < first
+        skip = max(0, after + 1 - first)
+        messages = [
+            message
+            for message in itertools.islice(self._messages, skip, None)
+            if see_ghosts or not message.ghost
+        ]
+        return messages, truncated
+
+
+class GameReport:
+    """End-of-game statistics folded in as events happen, guarded by the lobby lock.
+
+    Meeting resolution and ``reset_to_lobby`` discard the state these come
+    from, so kills, task toggles, meeting tallies and departures are recorded
+    when they occur. ``finish`` builds the report (and its JSON body) once per
+    game; it stays available until the next game starts.
+    """
+
+    def __init__(self) -> None:
+        self.game_id: Optional[str] = None
+        self.round_number = 0
+        self.started_at = 0.0
+        self.players: Dict[str, Dict[str, object]] = {}
+        # (seconds since start, event, actor id, target id)
+        self.timeline: List[Tuple[float, str, Optional[str], Optional[str]]] = []
+        self.meetings: List[Dict[str, object]] = []
+        self.summary: Optional[Dict[str, object]] = None
+        self.body: Optional[bytes] = None
+
+    def _elapsed(self, now: float) -> float:
+        return round(now - self.started_at, 1)
+
+    def start(self, players: List[Player], round_number: int, now: float) -> None:
+        self.game_id = str(uuid.uuid4())
+        self.round_number = round_number
+        self.started_at = now
+        self.timeline = []
+        self.meetings = []
+        self.summary = None
+        self.body = None
+        self.players = {
+            player.player_id: {
+                "id": player.player_id,
+                "name": player.name,
+                "avatar": player.avatar,
+                "role": player.role,
+                "specialRole": player.special_role,
+                "tasksTotal": sum(len(items) for items in player.tasks.values()),
+                "tasksDone": 0,
+                "kills": 0,
+                "votesCast": 0,
+                "votesReceived": 0,
+                "meetingsCalled": 0,
+                "fate": "survived",
+                "diedAfter": None,
+            }
+            for player in players
+        }
+
+    def _fate(self, player_id: str, fate: str, now: float) -> None:
+        stats = self.players.get(player_id)
+        if stats is not None and stats["fate"] == "survived":
+            stats["fate"] = fate
+            stats["diedAfter"] = self._elapsed(now)
+
+    def kill(self, killer_id: str, victim_id: str, now: float) -> None:
+        if killer_id in self.players:
+            self.players[killer_id]["kills"] += 1
+        self._fate(victim_id, "killed", now)
+        self.timeline.append((self._elapsed(now), "kill", killer_id, victim_id))
+
+    def task(self, player_id: str, delta: int) -> None:
+        if delta and player_id in self.players:
+            self.players[player_id]["tasksDone"] += delta
+
+    def meeting_started(self, meeting: Dict[str, object]) -> None:
+        caller = meeting["caller"]
+        if caller in self.players:
+            self.players[caller]["meetingsCalled"] += 1
+        event = "report" if meeting.get("reported_body") else "emergency"
+        self.timeline.append((self._elapsed(meeting["started_at"]), event, caller, meeting.get("reported_body")))
+
+    def meeting_resolved(
+        self, meeting: Dict[str, object], outcome: str, ejected_id: Optional[str], now: float
+    ) -> None:
+        tally: Counter = Counter()
+        for voter, target in meeting["votes"].items():
+            tally[target] += 1
+            if voter in self.players:
+                self.players[voter]["votesCast"] += 1
+            if target in self.players:
+                self.players[target]["votesReceived"] += 1
+        self.meetings.append(
+            {
+                "type": meeting.get("type", "reported"),
+                "caller": meeting["caller"],
+                "body": meeting.get("reported_body"),
+                "startedAfter": self._elapsed(meeting["started_at"]),
+                "votesCast": len(meeting["votes"]),
+                "tally": dict(tally),
+                "outcome": outcome,
+                "ejected": ejected_id,
+            }
+        )
+        if ejected_id:
+            self._fate(ejected_id, "ejected", now)
+            self.timeline.append((self._elapsed(now), "ejected", None, ejected_id))
+
+    def left(self, player_id: str, now: float) -> None:
+        self._fate(player_id, "left", now)
+        self.timeline.append((self._elapsed(now), "left", player_id, None))
+
+    def finish(self, end_info: Dict[str, object], now: float) -> None:
+        if self.game_id is None or self.summary is not None:
+            return
+        kills = [event for event in self.timeline if event[1] == "kill"]
+        self.summary = {
+            "ok": True,
+            "gameId": self.game_id,
+            "round": self.round_number,
+            "startedAt": int(self.started_at),
+            "duration": self._elapsed(now),
+            "winner": end_info.get("winner"),
+            "reason": end_info.get("reason"),
+            "timeToFirstKill": kills[0][0] if kills else None,
+            "players": list(self.players.values()),
+            "kills": [{"at": at, "killer": killer, "victim": victim} for at, _, killer, victim in kills],
+            "meetings": self.meetings,
+            "timeline": [
+                {"at": at, "type": event, "actor": actor, "target": target}
+                for at, event, actor, target in self.timeline
+            ],
+        }
+        self.body = json.dumps(self.summary, separators=(",", ":")).encode("utf-8")
+
+
+def compress_body(body: bytes, encoding: str, level: int = 6) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    return zlib.compress(body, level)
+
+
+class TokenBucketLimiter:
+    """Token buckets keyed by string, refilled at ``rate`` per second up to ``burst``.
+
+    Only the ``max_keys`` most recently used buckets are kept; an evicted key
+    simply starts again with a full bucket.
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 10000) -> None:
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+
+    def acquire(self, key: str, now: Optional[float] = None) -> float:
+        """Take one token. Returns 0.0 when admitted, else seconds until a token is due."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [self.burst, now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                return 0.0
+            return (1.0 - bucket[0]) / self.rate
+
+
+class AdmissionController:
+    """Sheds player API requests before they reach a lobby lock.
+
+    A request must get a token from its session's bucket, then from its
+    lobby's bucket, then a slot in the lobby's concurrency gate
+    (``GameState.request_gate``). Anything refused is answered with 429.
+    """
+
+    GATE_RETRY_SECONDS = 0.5
+
+    def __init__(
+        self,
+        session_rate: float = 5.0,
+        session_burst: float = 15.0,
+        lobby_rate: float = 200.0,
+        lobby_burst: float = 400.0,
+    ) -> None:
+        self.sessions = TokenBucketLimiter(session_rate, session_burst)
+        self.lobbies = TokenBucketLimiter(lobby_rate, lobby_burst)
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self._shed: Counter = Counter()
+        self._shed_routes: Counter = Counter()
+
+    def admit(self, session_key: str, lobby: "GameState", route: str) -> Tuple[Optional[str], float]:
+        """Returns ``(None, 0.0)`` once admitted (release the gate afterwards), else ``(reason, retry_after)``."""
+        reason: Optional[str] = None
+        retry_after = self.sessions.acquire(session_key)
+        if retry_after:
+            reason = "session"
+        else:
+            retry_after = self.lobbies.acquire(lobby.code)
+            if retry_after:
+                reason = "lobby"
+            elif not lobby.request_gate.acquire(blocking=False):
+                reason, retry_after = "concurrency", self.GATE_RETRY_SECONDS
+        with self._lock:
+            if reason:
+                self._shed[reason] += 1
+                self._shed_routes[route] += 1
+            else:
+                self.admitted += 1
+        return reason, retry_after
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            shed = sum(self._shed.values())
+            total = self.admitted + shed
+            return {
+                "admitted": self.admitted,
+                "shed": shed,
+                "shedRate": round(shed / total, 4) if total else 0.0,
+                "shedByReason": dict(self._shed),
+                "shedByRoute": dict(self._shed_routes.most_common(20)),
+            }
+
+
+class CompressedBodyCache:
+    """Compressed response bodies keyed by (lobby, state version, body digest).
+
+    Pollers that get a byte-identical body at the same version share a single
+    compression, so it is only worth it for bodies every viewer shares (the
+    spectator view). Player and lobby views carry per-request fields (poll
+    backoff, ``is_me``) and are compressed per response. Only the newest
+    version of each lobby is kept; a late request for an older version
+    compresses without touching it. The least recently used lobbies are
+    dropped past ``max_lobbies``.
+    """
+
+    def __init__(self, max_lobbies: int = 512, max_entries_per_lobby: int = 64) -> None:
+        self._lock = threading.Lock()
+        self._lobbies: "OrderedDict[str, Tuple[int, OrderedDict]]" = OrderedDict()
+        self.max_lobbies = max_lobbies
+        self.max_entries_per_lobby = max_entries_per_lobby
+        self.hits = 0
+        self.misses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def get_or_compress(self, code: str, version: int, encoding: str, body: bytes) -> bytes:
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        with self._lock:
+            slot = self._lobbies.get(code)
+            cached = slot[1].get(key) if slot is not None and slot[0] == version else None
+            if cached is not None:
+                self._lobbies.move_to_end(code)
+                self.hits += 1
+                self.bytes_in += len(body)
+                self.bytes_out += len(cached)
+                return cached
+
+        compressed = compress_body(body, encoding)
+        with self._lock:
+            self.misses += 1
+            self.bytes_in += len(body)
+            self.bytes_out += len(compressed)
+            slot = self._lobbies.get(code)
+            if slot is not None and slot[0] > version:
+                return compressed
+            if slot is None or slot[0] != version:
+                slot = (version, OrderedDict())
+                self._lobbies[code] = slot
+            entries = slot[1]
+            entries[key] = compressed
+            while len(entries) > self.max_entries_per_lobby:
+                entries.popitem(last=False)
+            self._lobbies.move_to_end(code)
+            while len(self._lobbies) > self.max_lobbies:
+                self._lobbies.popitem(last=False)
+        return compressed
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "lobbies": len(self._lobbies),
+                "entries": sum(len(entries) for _, entries in self._lobbies.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytesIn": self.bytes_in,
+                "bytesOut": self.bytes_out,
+                "ratio": round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else None,
+            }
+
+
+class QuantileSketch:
+    """Log-bucketed histogram: fixed memory, quantiles within ~5% relative error."""
+
+    GAMMA = 1.1
+    MIN_VALUE = 1.0
+    BUCKETS = 110  # 1s .. ~10h; larger values land in the last bucket
+
+    def __init__(self) -> None:
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        if value <= self.MIN_VALUE:
+            index = 0
+        else:
+            index = min(self.BUCKETS - 1, int(math.ceil(math.log(value / self.MIN_VALUE, self.GAMMA))))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen > rank:
+                upper = self.MIN_VALUE * self.GAMMA ** index
+                estimate = 2 * upper / (self.GAMMA + 1) if index else self.MIN_VALUE
+                return min(self.max, max(self.min, estimate))
+        return self.max
+
+    def summary(self) -> Dict[str, object]:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 1),
+            "min": round(self.min, 1),
+            "p50": round(self.quantile(0.5), 1),
+            "p90": round(self.quantile(0.9), 1),
+            "p99": round(self.quantile(0.99), 1),
+            "max": round(self.max, 1),
+        }
+
+
+class TaskTimingStats:
+    """Process-wide completion times per task name and per category.
+
+    Finished games feed seconds from assignment (game start) to completion.
+    Memory is bounded by ``max_names`` sketches; further names share one.
+    """
+
+    OVERFLOW_NAME = "(outras)"
+
+    def __init__(self, max_names: int = 256) -> None:
+        self._lock = threading.Lock()
+        self.max_names = max_names
+        self._by_name: Dict[str, QuantileSketch] = {}
+        self._by_category: Dict[str, QuantileSketch] = {}
+        self._assigned: Counter = Counter()
+        self.games = 0
+
+    def record_game(self, samples: List[Tuple[str, str, Optional[float]]]) -> None:
+        """``samples`` holds ``(category, name, seconds)``; ``None`` for unfinished tasks."""
+        with self._lock:
+            self.games += 1
+            for category, name, seconds in samples:
+                if name not in self._by_name and len(self._by_name) >= self.max_names:
+                    name = self.OVERFLOW_NAME
+                self._assigned[name] += 1
+                self._assigned[f"category:{category}"] += 1
+                by_name = self._by_name.setdefault(name, QuantileSketch())
+                by_category = self._by_category.setdefault(category, QuantileSketch())
+                if seconds is not None:
+                    by_name.add(seconds)
+                    by_category.add(seconds)
+
+    def stats(self) -> Dict[str, object]:
+        def row(sketch: QuantileSketch, assigned: int) -> Dict[str, object]:
+            payload = sketch.summary()
+            payload["assigned"] = assigned
+            payload["completionRate"] = round(sketch.count / assigned, 3) if assigned else None
+            return payload
+
+        with self._lock:
+            return {
+                "games": self.games,
+                "categories": {
+                    category: row(sketch, self._assigned[f"category:{category}"])
+                    for category, sketch in self._by_category.items()
+                },
+                "tasks": {name: row(sketch, self._assigned[name]) for name, sketch in self._by_name.items()},
+            }
+
+
+task_timings = TaskTimingStats()
+# Finished games are appended here once enable_history() has been called: at import
+# when HISTORY_DB is set (any WSGI server), or by server.py with its default file.
+history_store: Optional[history.GameHistoryStore] = None
+
+
+def enable_history(path: str) -> history.GameHistoryStore:
+    global history_store
+    if history_store is None:
+        history_store = history.GameHistoryStore(path)
+    return history_store
+
+
 class GameState:
     SKIP_VOTE = "skip"
     MEETING_VOTE_DELAY = 10
@@ -229,6 +794,32 @@ class GameState:
         "required_players": {"min": 2, "max": 15},
         "kill_cooldown": {"min": 10, "max": 600},
     }
+    # Seats enforced by join(); add_player() is the unchecked builder for benches.
+    MAX_PLAYERS = 15
+    LARGE_LOBBY_MAX_PLAYERS = 300
+    # Lists in large lobbies are shipped in pages of this size.
+    LARGE_LOBBY_PAGE_SIZE = 24
+    LARGE_LOBBY_TOP_VOTES = 10
+    # (base, ceiling) poll delay in ms recommended to clients for each status.
+    POLL_INTERVALS_MS = {
+        "lobby": (2500, 10000),
+        "in_game": (4000, 12000),
+        "meeting": (2000, 5000),
+        "ended": (5000, 30000),
+    }
+    # Fixed intervals the clients used before the server drove polling.
+    POLL_BASELINE_MS = {"state": 2500, "player": 4000}
+    POLL_MIN_MS = 750
+    POLL_DEADLINE_SLACK_MS = 250
+    POLL_BACKOFF_AFTER = 3
+    POLL_BACKOFF_MAX_STEPS = 4
+    # A longer silence from one poller starts a new polling session in poll_stats.
+    POLL_SESSION_GAP_MS = 60000
+    BATCH_MAX_ACTIONS = 20
+    # Player API requests allowed to wait on this lobby at once (see AdmissionController).
+    MAX_CONCURRENT_REQUESTS = 8
+    CHAT_CAPACITY = 100
+    CHAT_MAX_LENGTH = 200
 
     def __init__(self, code: str) -> None:
         self.code = code.upper()
@@ -237,6 +828,7 @@ class GameState:
         self.players: Dict[str, Player] = {}
         self.status: str = "lobby"  # lobby | in_game
         self.round_number: int = 0
+        self.started_at: float = 0.0
         self.leader_id: Optional[str] = None
         self.config = {
             "required_players": 2,
@@ -244,6 +836,7 @@ class GameState:
             "task_counts": {"common": 1, "long": 1, "fast": 3},
             "kill_cooldown": 120,
             "meeting_duration": 150,
+            "large_lobby": False,
         }
         self.medic_vitals_duration: int = 5
         self.task_pool = _default_task_pool()
@@ -258,12 +851,192 @@ class GameState:
         self.comms_sabotage_end: float = 0.0
         self.comms_sabotage_by: Optional[str] = None
         self.comms_sabotage_duration: int = 25  # seconds
+        self.version: int = 0
+        # Indexes kept in step with player state so polls avoid full scans.
+        self._roster: List[Tuple[str, str]] = []  # sorted (name.lower(), player_id)
+        self._alive_ids: Set[str] = set()
+        self._death_order: List[str] = []
+        self._left_count: int = 0
+        self._tasks_total: int = 0
+        self._tasks_completed: int = 0
+        self.idempotency = IdempotencyCache()
+        self.request_gate = threading.BoundedSemaphore(self.MAX_CONCURRENT_REQUESTS)
+        # Set (under the lock) once the lobby leaves the manager; joins are refused after that.
+        self.closed = False
+        self.wire_strings = wire.ViewerTables()
+        self._listeners: List[Callable[["GameState"], None]] = []
+        # Called on new chat messages only; chat does not bump ``version``.
+        self._chat_listeners: List[Callable[["GameState"], None]] = []
+        self.chat = MeetingChat(self.CHAT_CAPACITY)
+        self.report = GameReport()
+        # Role hook dispatch tables, rebuilt at start_game from the roles dealt.
+        self._view_roles: Dict[str, Tuple[roles.Role, ...]] = {}
+        self._task_roles: Dict[str, Tuple[roles.Role, ...]] = {}
+        self._tick_roles: List[Tuple[roles.Role, Player]] = []
+        self._spectator_cache: Optional[Tuple[int, bytes]] = None
+        # (version, shared death views); see _death_views_locked.
+        self._death_cache: Optional[Tuple[int, Dict[str, object]]] = None
+        # "<channel>:<viewer>" -> (version seen, unchanged polls, time of the poll)
+        self._poll_watermarks: Dict[str, Tuple[int, int, float]] = {}
+        self._poll_counters: Dict[str, Dict[str, float]] = {
+            channel: {"requests": 0, "recommendedMs": 0, "gaps": 0, "gapMs": 0.0}
+            for channel in self.POLL_BASELINE_MS
+        }
         self._refresh_task_templates()
         self._reset_task_usage()
 
     def current_player(self, player_id: str) -> Optional[Player]:
         return self.players.get(player_id)
 
+    def _touch_locked(self) -> None:
+        self.version += 1
+        for listener in self._listeners:
+            listener(self)
+
+    def add_listener(self, listener: Callable[["GameState"], None]) -> None:
+        """Register a callback run (under the lobby lock) after every state change."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def add_chat_listener(self, listener: Callable[["GameState"], None]) -> None:
+        with self._lock:
+            self._chat_listeners.append(listener)
+
+    def now(self) -> float:
+        """Current time for role hooks; follows this module's clock (patched by the simulator)."""
+        return time.time()
+
+    def tick(self) -> None:
+        """Expire timed state (meetings, sabotage, medic window) without a poll."""
+        with self._lock:
+            self._expire_timed_locked()
+
+    def _expire_timed_locked(self) -> None:
+        if self.meeting:
+            self._maybe_finalize_meeting_locked()
+        self._clear_expired_comms_locked()
+        for role, player in self._tick_roles:
+            role.tick(self, player)
+
+    def _large_lobby(self) -> bool:
+        return bool(self.config.get("large_lobby"))
+
+    def _page_limit(self) -> Optional[int]:
+        return self.LARGE_LOBBY_PAGE_SIZE if self._large_lobby() else None
+
+    def _unindex_player_locked(self, player: Player) -> None:
+        key = (player.name.lower(), player.player_id)
+        index = bisect.bisect_left(self._roster, key)
+        if index < len(self._roster) and self._roster[index] == key:
+            del self._roster[index]
+        self._alive_ids.discard(player.player_id)
+
+    def _rebuild_indexes_locked(self) -> None:
+        self._roster = sorted((p.name.lower(), p.player_id) for p in self.players.values())
+        self._alive_ids = {
+            p.player_id for p in self.players.values() if p.alive and not p.left_game
+        }
+        self._death_order = []
+        self._left_count = 0
+        self._tasks_total, self._tasks_completed = self._recount_task_totals_unlocked()
+
+    def _roster_page_locked(
+        self,
+        include: Callable[[Player], bool],
+        cursor: int = 0,
+        limit: Optional[int] = None,
+        query: str = "",
+    ) -> Tuple[List[Player], Optional[int]]:
+        """Walk the name-sorted roster from ``cursor`` and return matching players.
+
+        The second value is the cursor of the next matching player, or ``None``
+        once the roster (or the ``query`` name prefix) is exhausted. Small
+        lobbies are not paged and keep listing players in join order.
+        """
+        prefix = query.strip().lower()
+        if not self._large_lobby():
+            page = [
+                player
+                for player in list(self.players.values())[max(0, cursor):]
+                if include(player) and player.name.lower().startswith(prefix)
+            ]
+            return page, None
+        index = max(0, cursor)
+        if prefix:
+            index = max(index, bisect.bisect_left(self._roster, (prefix,)))
+        page: List[Player] = []
+        while index < len(self._roster):
+            name_key, pid = self._roster[index]
+            if prefix and not name_key.startswith(prefix):
+                break
+            player = self.players.get(pid)
+            if player and include(player):
+                if limit is not None and len(page) >= limit:
+                    return page, index
+                page.append(player)
+            index += 1
+        return page, None
+
+    def _forget_poller_locked(self, player_id: str) -> None:
+        for channel in self.POLL_BASELINE_MS:
+            self._poll_watermarks.pop(f"{channel}:{player_id}", None)
+
+    def _recommended_poll_ms_locked(
+        self, channel: str, viewer_id: str, deadlines: List[float]
+    ) -> int:
+        base, ceiling = self.POLL_INTERVALS_MS.get(self.status, self.POLL_INTERVALS_MS["lobby"])
+        key = f"{channel}:{viewer_id}"
+        now = time.time()
+        seen = self._poll_watermarks.get(key)
+        unchanged = seen[1] + 1 if seen and seen[0] == self.version else 0
+        self._poll_watermarks[key] = (self.version, unchanged, now)
+        counters = self._poll_counters[channel]
+        if seen:
+            gap_ms = (now - seen[2]) * 1000
+            if 0 <= gap_ms <= self.POLL_SESSION_GAP_MS:
+                counters["gaps"] += 1
+                counters["gapMs"] += gap_ms
+
+        delay = base
+        if unchanged >= self.POLL_BACKOFF_AFTER:
+            steps = min(unchanged - self.POLL_BACKOFF_AFTER + 1, self.POLL_BACKOFF_MAX_STEPS)
+            delay = min(ceiling, base * (2 ** steps))
+        upcoming = [deadline - now for deadline in deadlines if deadline and deadline > now]
+        if upcoming:
+            delay = min(delay, int(min(upcoming) * 1000) + self.POLL_DEADLINE_SLACK_MS)
+        delay = max(self.POLL_MIN_MS, delay)
+
+        counters["requests"] += 1
+        counters["recommendedMs"] += delay
+        return delay
+
+    def poll_stats(self) -> Dict[str, object]:
+        """Measured poll rate per channel against the fixed baseline.
+
+        The rate counts the requests each poller actually made per minute it
+        was polling, so a meeting polled faster than the baseline shows up as
+        a higher rate rather than skewing an average of recommended delays.
+        ``reduction`` is the share of baseline requests saved; it is negative
+        while clients poll more often than the baseline did.
+        """
+        with self._lock:
+            channels: Dict[str, Dict[str, object]] = {}
+            for channel, counters in self._poll_counters.items():
+                requests = counters["requests"]
+                baseline = self.POLL_BASELINE_MS[channel]
+                average = counters["recommendedMs"] / requests if requests else float(baseline)
+                baseline_rate = 60000 / baseline
+                measured = counters["gaps"] * 60000 / counters["gapMs"] if counters["gapMs"] else None
+                channels[channel] = {
+                    "requests": requests,
+                    "averageIntervalMs": round(average, 1),
+                    "baselineIntervalMs": baseline,
+                    "requestsPerPlayerMinute": round(measured, 2) if measured is not None else None,
+                    "baselinePerPlayerMinute": round(baseline_rate, 2),
+                    "reduction": round(1 - measured / baseline_rate, 3) if measured is not None else 0.0,
+                }
+            return {"code": self.code, "version": self.version, "channels": channels}
+
     def _assign_new_leader_locked(self) -> None:
         active_players = [player for player in self.players.values() if not player.left_game]
         if not active_players:
@@ -287,16 +1060,35 @@ class GameState:
 
     def add_player(self, name: str) -> Player:
         with self._lock:
-            player_id = str(uuid.uuid4())
-            new_player = Player(
-                player_id=player_id,
-                name=name.strip(),
-                avatar=self._allocate_avatar_locked(),
-            )
-            self.players[player_id] = new_player
-            if not self.leader_id:
-                self.leader_id = player_id
-            return new_player
+            return self._add_player_locked(name)
+
+    def join(self, name: str) -> Tuple[Optional[Player], Optional[str]]:
+        """Check that the lobby is open and the name free, then add the player, atomically."""
+        with self._lock:
+            if self.closed:
+                return None, "Lobby nao encontrado."
+            if self.status != "lobby":
+                return None, "O jogo ja comecou. Aguarda terminar para entrar."
+            if self._has_player_named_locked(name):
+                return None, "Esse nome ja esta em uso neste lobby."
+            if len(self.players) - self._left_count >= self._capacity_unlocked():
+                return None, "O lobby esta cheio."
+            return self._add_player_locked(name), None
+
+    def _add_player_locked(self, name: str) -> Player:
+        player_id = str(uuid.uuid4())
+        new_player = Player(
+            player_id=player_id,
+            name=name.strip(),
+            avatar=self._allocate_avatar_locked(),
+        )
+        self.players[player_id] = new_player
+        bisect.insort(self._roster, (new_player.name.lower(), player_id))
+        self._alive_ids.add(player_id)
+        if not self.leader_id:
+            self.leader_id = player_id
+        self._touch_locked()
+        return new_player
 
     def remove_player(self, player_id: str) -> bool:
         with self._lock:
@@ -311,24 +1103,77 @@ class GameState:
                 removed = self.players.pop(player_id, None)
                 if not removed:
                     return False
+                # An ended game still counts its crew's tasks until reset.
+                self._drop_task_counts_locked(removed)
+                self._unindex_player_locked(removed)
+                self.wire_strings.discard(player_id)
                 self._release_avatar_locked(removed.avatar)
                 if removed.player_id == self.leader_id:
                     self._assign_new_leader_locked()
             if player.player_id == self.leader_id and player.left_game:
                 self._assign_new_leader_locked()
+            self._forget_poller_locked(player_id)
+            self._touch_locked()
             return True
 
+    def memory_usage(self) -> Dict[str, object]:
+        """Approximate deep size in bytes, split by component.
+
+        Components are measured in order and share one ``seen`` set, so tasks
+        are not counted again under players and ``other`` is what remains.
+        """
+        with self._lock:
+            seen: Set[int] = set()
+            components = {
+                "tasks": sum(memory.deep_size(player.tasks, seen) for player in self.players.values()),
+                "players": memory.deep_size(self.players, seen),
+                "taskTemplates": memory.deep_size(self.task_templates, seen)
+                + memory.deep_size(self._selected_common_tasks, seen),
+                "taskPool": memory.deep_size(self.task_pool, seen),
+                "taskUsage": memory.deep_size(self._task_usage, seen),
+                "meeting": memory.deep_size(self.meeting, seen) + memory.deep_size(self.chat, seen),
+                "summaries": memory.deep_size(self.last_meeting_summary, seen)
+                + memory.deep_size(self.end_info, seen)
+                + memory.deep_size(self.report, seen),
+                "indexes": sum(
+                    memory.deep_size(index, seen) for index in (self._roster, self._alive_ids, self._death_order)
+                ),
+                "caches": sum(
+                    memory.deep_size(cache, seen)
+                    for cache in (
+                        self.idempotency,
+                        self.wire_strings,
+                        self._spectator_cache,
+                        self._death_cache,
+                        self._poll_watermarks,
+                    )
+                ),
+            }
+            components["other"] = memory.deep_size(self, seen)
+            return {"players": len(self.players), "bytes": sum(components.values()), "components": components}
+
     def is_empty(self) -> bool:
         with self._lock:
             return not any(not player.left_game for player in self.players.values())
 
     def has_player_named(self, name: str) -> bool:
+        with self._lock:
+            return self._has_player_named_locked(name)
+
+    def _has_player_named_locked(self, name: str) -> bool:
         name_key = name.strip().lower()
+        return any(
+            player.name.lower() == name_key and not player.left_game
+            for player in self.players.values()
+        )
+
+    def close(self, only_if_empty: bool = False) -> bool:
+        """Mark the lobby closed to new joins; with ``only_if_empty``, only when nobody is left."""
         with self._lock:
-            return any(
-                player.name.lower() == name_key and not player.left_game
-                for player in self.players.values()
-            )
+            if only_if_empty and any(not player.left_game for player in self.players.values()):
+                return False
+            self.closed = True
+            return True
 
     def is_leader(self, player_id: str) -> bool:
         with self._lock:
@@ -342,6 +1187,7 @@ class GameState:
             if player.left_game:
                 return False
             player.ready = ready
+            self._touch_locked()
             return True
 
     def everyone_ready(self) -> bool:
@@ -364,11 +1210,19 @@ class GameState:
             "killCooldown": self.config["kill_cooldown"],
             "impostors": self.config["impostors"],
             "meetingDuration": self.config["meeting_duration"],
+            "largeLobby": self._large_lobby(),
         }
 
+    def _capacity_unlocked(self) -> int:
+        return self.LARGE_LOBBY_MAX_PLAYERS if self._large_lobby() else self.MAX_PLAYERS
+
+    def _required_players_limits(self) -> Dict[str, int]:
+        # A round can never need more players than the lobby seats.
+        return {"min": self.CONFIG_LIMITS["required_players"]["min"], "max": self._capacity_unlocked()}
+
     def _config_limits_payload(self) -> Dict[str, Dict[str, int]]:
         return {
-            "requiredPlayers": self.CONFIG_LIMITS["required_players"],
+            "requiredPlayers": self._required_players_limits(),
             "killCooldown": self.CONFIG_LIMITS["kill_cooldown"],
         }
 
@@ -380,9 +1234,19 @@ class GameState:
                 return {"ok": False, "error": "Nao podes alterar definicoes depois do jogo comecar."}
 
             errors = []
+            large_lobby = updates.get("largeLobby")
+            active = len(self.players) - self._left_count
+            if large_lobby is not None and not large_lobby and active > self.MAX_PLAYERS:
+                errors.append(f"Ha mais de {self.MAX_PLAYERS} jogadores: o lobby tem de continuar grande.")
+            elif large_lobby is not None:
+                self.config["large_lobby"] = bool(large_lobby)
+                limits = self._required_players_limits()
+                if self.config["required_players"] > limits["max"]:
+                    self.config["required_players"] = limits["max"]
+
             required_players = updates.get("requiredPlayers")
             if required_players is not None:
-                limits = self.CONFIG_LIMITS["required_players"]
+                limits = self._required_players_limits()
                 if not isinstance(required_players, int):
                     errors.append("Numero de jogadores invalido.")
                 elif required_players < limits["min"] or required_players > limits["max"]:
@@ -404,6 +1268,7 @@ class GameState:
                 else:
                     self.config["kill_cooldown"] = kill_cooldown
 
+            self._touch_locked()
             if errors:
                 return {"ok": False, "error": " ".join(errors)}
 
@@ -425,12 +1290,16 @@ class GameState:
             if not removed:
                 return {"ok": False, "error": "Nao foi possivel expulsar o jogador."}
 
+            self._unindex_player_locked(removed)
+            self.wire_strings.discard(target_id)
             self._release_avatar_locked(removed.avatar)
             removed.ready = False
             removed.alive = False
 
             if removed.player_id == self.leader_id:
                 self._assign_new_leader_locked()
+            self._forget_poller_locked(target_id)
+            self._touch_locked()
 
             return {
                 "ok": True,
@@ -516,6 +1385,7 @@ class GameState:
     def _build_tasks(self) -> Dict[str, List[TaskItem]]:
         tasks: Dict[str, List[TaskItem]] = {}
         task_counts = self.config.get("task_counts", {})
+        now = time.time()
         for category, count in task_counts.items():
             if count <= 0:
                 tasks[category] = []
@@ -523,7 +1393,12 @@ class GameState:
             if category == "common":
                 selected_templates = self._selected_common_tasks[:count]
                 tasks[category] = [
-                    TaskItem(task_id=f"{category}:{uuid.uuid4().hex}", name=template.name)
+                    TaskItem(
+                        task_id=f"{category}:{uuid.uuid4().hex}",
+                        name=template.name,
+                        category=category,
+                        assigned_at=now,
+                    )
                     for template in selected_templates
                 ]
                 continue
@@ -537,7 +1412,12 @@ class GameState:
                 assigned_names.add(template.name)
                 self._increment_task_usage(category, template)
             tasks[category] = [
-                TaskItem(task_id=f"{category}:{uuid.uuid4().hex}", name=template.name)
+                TaskItem(
+                    task_id=f"{category}:{uuid.uuid4().hex}",
+                    name=template.name,
+                    category=category,
+                    assigned_at=now,
+                )
                 for template in assigned_templates
             ]
         return tasks
@@ -559,6 +1439,7 @@ class GameState:
 
             self._clear_comms_sabotage_locked()
             self.round_number += 1
+            self.started_at = time.time()
             self.status = "in_game"
             self.meeting = None
             self.last_meeting_summary = None
@@ -577,34 +1458,38 @@ class GameState:
                 player.role = "impostor" if pid in impostor_ids else "crewmate"
                 player.tasks = {}
                 player.alive = True
-                if player.role == "impostor":
-                    player.kill_cooldown_end = time.time()
-                else:
-                    player.kill_cooldown_end = 0.0
+                player.kill_cooldown_end = 0.0
                 player.death_time = None
                 player.killed_by = None
                 player.killed_by_name = None
                 player.death_reported = False
+                player.death_reported_at = None
                 player.left_game = False
                 player.special_role = None
                 player.emergency_available = True
-                player.medic_vitals_active_until = 0.0
-                player.medic_vitals_ready = False
-                player.medic_completed_tasks = set()
+                player.role_state = {}
 
             assignment_players = active_players[:]
             random.shuffle(assignment_players)
             for player in assignment_players:
                 player.tasks = self._build_tasks()
 
-            medic_candidates = [p for p in self.players.values() if p.role == "crewmate" and not p.left_game]
-            if medic_candidates:
-                medic = random.choice(medic_candidates)
-                medic.special_role = "medic"
-                medic.medic_vitals_active_until = 0.0
-                medic.medic_vitals_ready = True
-                medic.medic_completed_tasks = set()
-
+            for player in active_players:
+                role = roles.ROLES.get(player.role)
+                if role:
+                    role.assign(self, player)
+            for role in roles.special_roles():
+                candidates = [p for p in active_players if p.role == role.base and not p.special_role]
+                for player in random.sample(candidates, min(role.count, len(candidates))):
+                    player.special_role = role.name
+                    role.assign(self, player)
+            self._build_role_tables_locked()
+            self.report.start(active_players, self.round_number, self.started_at)
+
+            self._rebuild_indexes_locked()
+            # New round, new task ids: start fresh string tables for compact clients.
+            self.wire_strings.rotate()
+            self._touch_locked()
             return {"ok": True}
 
     def reset_to_lobby(self) -> None:
@@ -631,87 +1516,73 @@ class GameState:
                 player.killed_by = None
                 player.killed_by_name = None
                 player.death_reported = False
+                player.death_reported_at = None
                 player.left_game = False
                 player.special_role = None
                 player.emergency_available = True
-                player.medic_vitals_active_until = 0.0
-                player.medic_vitals_ready = True
-                player.medic_completed_tasks = set()
+                player.role_state = {}
             self._clear_comms_sabotage_locked()
+            self.chat.reset(None)
+            self._build_role_tables_locked()
+            self._rebuild_indexes_locked()
+            self._touch_locked()
+
+    def _build_role_tables_locked(self) -> None:
+        """Index the hooks of the roles each active player holds, so polls skip the rest."""
+        self._view_roles = {}
+        self._task_roles = {}
+        self._tick_roles = []
+        if self.status == "lobby":
+            return
+        for player in self.players.values():
+            if player.left_game:
+                continue
+            held = [roles.ROLES[name] for name in (player.role, player.special_role) if name in roles.ROLES]
+            viewing = tuple(role for role in held if role.implements("view") or role.implements("deadlines"))
+            if viewing:
+                self._view_roles[player.player_id] = viewing
+            on_task = tuple(role for role in held if role.implements("on_task_complete"))
+            if on_task:
+                self._task_roles[player.player_id] = on_task
+            self._tick_roles.extend((role, player) for role in held if role.implements("tick"))
+
+    def _drop_role_hooks_locked(self, player: Player) -> None:
+        self._view_roles.pop(player.player_id, None)
+        self._task_roles.pop(player.player_id, None)
+        self._tick_roles = [(role, other) for role, other in self._tick_roles if other is not player]
 
     def impostor_sabotage(self, player_id: str) -> Dict[str, object]:
         with self._lock:
-            player = self.players.get(player_id)
-            if not player:
-                return {"ok": False, "error": "Jogador nao encontrado."}
-            if self.status != "in_game":
-                return {"ok": False, "error": "O jogo ainda nao comecou."}
-            if player.role != "impostor":
-                return {"ok": False, "error": "Apenas o impostor pode usar este botao."}
-            if player.left_game:
-                return {"ok": False, "error": "Jogador nao esta ativo."}
+            return self._impostor_sabotage_locked(player_id)
+
+    def _impostor_sabotage_locked(self, player_id: str) -> Dict[str, object]:
+        player = self.players.get(player_id)
+        if not player:
+            return {"ok": False, "error": "Jogador nao encontrado."}
+        if self.status != "in_game":
+            return {"ok": False, "error": "O jogo ainda nao comecou."}
+        if player.role != "impostor":
+            return {"ok": False, "error": "Apenas o impostor pode usar este botao."}
+        if player.left_game:
+            return {"ok": False, "error": "Jogador nao esta ativo."}
 
-            self._clear_expired_comms_locked()
-            if time.time() < self.comms_sabotage_end:
-                remaining = int(self.comms_sabotage_end - time.time())
-                return {
-                    "ok": False,
-                    "error": "As comunicacoes ja estao sabotadas.",
-                    "remaining": remaining,
-                }
+        self._clear_expired_comms_locked()
+        if time.time() < self.comms_sabotage_end:
+            return {
+                "ok": False,
+                "error": "As comunicacoes ja estao sabotadas.",
+                "endsAt": self.comms_sabotage_end,
+            }
 
-            now = time.time()
-            self.comms_sabotage_end = now + self.comms_sabotage_duration
-            self.comms_sabotage_by = player_id
-            return {"ok": True, "duration": self.comms_sabotage_duration}
+        now = time.time()
+        self.comms_sabotage_end = now + self.comms_sabotage_duration
+        self.comms_sabotage_by = player_id
+        self._touch_locked()
+        return {"ok": True, "duration": self.comms_sabotage_duration, "endsAt": self.comms_sabotage_end}
 
     def medic_activate_vitals(self, player_id: str) -> Dict[str, object]:
         with self._lock:
-            player = self.players.get(player_id)
-            if not player:
-                return {"ok": False, "error": "Jogador nao encontrado."}
-            if self.status != "in_game":
-                return {"ok": False, "error": "As vitals so estao disponiveis durante a ronda."}
-            if player.special_role != "medic":
-                return {"ok": False, "error": "Apenas o medico pode usar este botao."}
-            if player.left_game:
-                return {"ok": False, "error": "Jogador nao esta ativo."}
-
-            self._clear_expired_medic_window_locked(player)
-            now = time.time()
-            remaining = max(0, int(player.medic_vitals_active_until - now))
-            if player.medic_vitals_active_until > now:
-                vitals = self._collect_vitals_locked()
-                return {
-                    "ok": True,
-                    "active": True,
-                    "remaining": remaining,
-                    "ready": player.medic_vitals_ready,
-                    "duration": self.medic_vitals_duration,
-                    "vitals": vitals,
-                }
-
-            if not player.medic_vitals_ready:
-                return {
-                    "ok": False,
-                    "error": "Completa uma nova tarefa para desbloquear novamente as vitals.",
-                    "active": False,
-                    "remaining": 0,
-                    "ready": False,
-                    "duration": self.medic_vitals_duration,
-                }
-
-            player.medic_vitals_ready = False
-            player.medic_vitals_active_until = now + self.medic_vitals_duration
-            vitals = self._collect_vitals_locked()
-            return {
-                "ok": True,
-                "active": True,
-                "remaining": self.medic_vitals_duration,
-                "ready": player.medic_vitals_ready,
-                "duration": self.medic_vitals_duration,
-                "vitals": vitals,
-            }
+            return roles.ACTIONS["vitals"](self, player_id, {})
 
     def _apply_impostor_cooldown_locked(self, cooldown_end: float) -> None:
         for other in self.players.values():
@@ -720,41 +1591,45 @@ class GameState:
 
     def impostor_kill(self, player_id: str, target_id: str) -> Dict[str, object]:
         with self._lock:
-            player = self.players.get(player_id)
-            if not player:
-                return {"ok": False, "error": "Jogador nao encontrado."}
-            if self.status != "in_game":
-                return {"ok": False, "error": "O jogo ainda nao comecou."}
-            if player.role != "impostor":
-                return {"ok": False, "error": "Apenas o impostor pode usar este botao."}
-            if not target_id:
-                return {"ok": False, "error": "Seleciona a vitima."}
-
-            target_player = self.players.get(target_id)
-            if not target_player or not target_player.alive:
-                return {"ok": False, "error": "Vitima invalida."}
-            if target_player.player_id == player.player_id:
-                return {"ok": False, "error": "Nao podes matar-te a ti proprio."}
-            if target_player.role == "impostor":
-                return {"ok": False, "error": "Nao podes matar outro impostor."}
-
-            now = time.time()
-            if now < player.kill_cooldown_end:
-                remaining = int(player.kill_cooldown_end - now)
-                return {
-                    "ok": False,
-                    "error": f"Ainda faltam {remaining} segundos para poder matar novamente.",
-                    "remaining": remaining,
-                }
+            return self._impostor_kill_locked(player_id, target_id)
+
+    def _impostor_kill_locked(self, player_id: str, target_id: str) -> Dict[str, object]:
+        player = self.players.get(player_id)
+        if not player:
+            return {"ok": False, "error": "Jogador nao encontrado."}
+        if self.status != "in_game":
+            return {"ok": False, "error": "O jogo ainda nao comecou."}
+        if player.role != "impostor":
+            return {"ok": False, "error": "Apenas o impostor pode usar este botao."}
+        if not target_id:
+            return {"ok": False, "error": "Seleciona a vitima."}
+
+        target_player = self.players.get(target_id)
+        if not target_player or not target_player.alive:
+            return {"ok": False, "error": "Vitima invalida."}
+        if target_player.player_id == player.player_id:
+            return {"ok": False, "error": "Nao podes matar-te a ti proprio."}
+        if target_player.role == "impostor":
+            return {"ok": False, "error": "Nao podes matar outro impostor."}
+
+        now = time.time()
+        if now < player.kill_cooldown_end:
+            remaining = int(player.kill_cooldown_end - now)
+            return {
+                "ok": False,
+                "error": f"Ainda faltam {remaining} segundos para poder matar novamente.",
+                "killReadyAt": player.kill_cooldown_end,
+            }
 
-            cooldown_end = now + self.config["kill_cooldown"]
-            self._apply_impostor_cooldown_locked(cooldown_end)
-            self._mark_player_dead_locked(target_player, player)
+        cooldown_end = now + self.config["kill_cooldown"]
+        self._apply_impostor_cooldown_locked(cooldown_end)
+        self._mark_player_dead_locked(target_player, player)
+        self.report.kill(player.player_id, target_player.player_id, target_player.death_time)
 
-            impostor_survivor = self._impostor_last_crewmate_locked()
-            if impostor_survivor and self.status == "in_game":
-                self.status = "ended"
-                self.end_info = {
+        impostor_survivor = self._impostor_last_crewmate_locked()
+        if impostor_survivor and self.status == "in_game":
+            self._end_game_locked(
+                {
                     "winner": "impostor",
                     "reason": "last_crewmate",
                     "impostor": {
@@ -763,18 +1638,24 @@ class GameState:
                     },
                     "message": f"O impostor {impostor_survivor.name} Venceu!",
                 }
+            )
 
-            if self.status == "ended":
-                self._clear_comms_sabotage_locked()
+        if self.status == "ended":
+            self._clear_comms_sabotage_locked()
+        self._touch_locked()
 
-            return {
-                "ok": True,
-                "cooldown": self.config["kill_cooldown"],
-                "victim": target_player.death_payload(),
-                "gameOver": self.end_info if self.status == "ended" else None,
-            }
+        return {
+            "ok": True,
+            "cooldown": self.config["kill_cooldown"],
+            "killReadyAt": cooldown_end,
+            "victim": target_player.death_payload(),
+            "gameOver": self.end_info if self.status == "ended" else None,
+        }
 
     def _task_totals_unlocked(self) -> Tuple[int, int]:
+        return self._tasks_total, self._tasks_completed
+
+    def _recount_task_totals_unlocked(self) -> Tuple[int, int]:
         total = 0
         completed = 0
         for player in self.players.values():
@@ -789,42 +1670,54 @@ class GameState:
 
     def mark_task(self, player_id: str, task_id: str, done: bool) -> Dict[str, object]:
         with self._lock:
-            player = self.players.get(player_id)
-            if not player:
-                return {"ok": False, "error": "Jogador nao encontrado."}
-            if self.status not in {"in_game", "meeting"}:
-                return {"ok": False, "error": "Ainda nao podes marcar tarefas."}
-            if not task_id:
-                return {"ok": False, "error": "Tarefa invalida."}
-
-            target_task: Optional[TaskItem] = None
-            for group in player.tasks.values():
-                for task in group:
-                    if task.task_id == task_id:
-                        target_task = task
-                        break
-                if target_task:
+            return self._mark_task_locked(player_id, task_id, done)
+
+    def _mark_task_locked(self, player_id: str, task_id: str, done: bool) -> Dict[str, object]:
+        player = self.players.get(player_id)
+        if not player:
+            return {"ok": False, "error": "Jogador nao encontrado."}
+        if self.status not in {"in_game", "meeting"}:
+            return {"ok": False, "error": "Ainda nao podes marcar tarefas."}
+        if not task_id:
+            return {"ok": False, "error": "Tarefa invalida."}
+
+        target_task: Optional[TaskItem] = None
+        for group in player.tasks.values():
+            for task in group:
+                if task.task_id == task_id:
+                    target_task = task
                     break
+            if target_task:
+                break
 
         if not target_task:
             return {"ok": False, "error": "Tarefa nao encontrada."}
 
         previous_done = target_task.done
         target_task.done = bool(done)
-        if player.special_role == "medic":
-            self._handle_medic_task_update_locked(player, target_task, previous_done)
+        if target_task.done != previous_done:
+            target_task.completed_at = time.time() if target_task.done else None
+        if player.role == "crewmate" and not player.left_game:
+            self._tasks_completed += int(target_task.done) - int(previous_done)
+        self.report.task(player_id, int(target_task.done) - int(previous_done))
+        if target_task.done and not previous_done:
+            for role in self._task_roles.get(player_id, ()):
+                role.on_task_complete(self, player, target_task)
         total, completed = self._task_totals_unlocked()
         current_progress = completed / total if total else 0.0
         if total and completed >= total and self.status in {"in_game", "meeting"}:
-            self.status = "ended"
-            self.end_info = {
-                "winner": "crewmates",
-                "reason": "tasks",
-                "message": "Todas as tarefas foram concluidas. Tripulacao venceu!",
-            }
+            self._end_game_locked(
+                {
+                    "winner": "crewmates",
+                    "reason": "tasks",
+                    "message": "Todas as tarefas foram concluidas. Tripulacao venceu!",
+                }
+            )
             self.revealed_progress = max(self.revealed_progress, current_progress)
             self.meeting = None
             self._clear_comms_sabotage_locked()
+        # After the end-game block, so listeners see the lobby as ended.
+        self._touch_locked()
         progress_payload = {
             "total": total,
             "completed": completed,
@@ -840,20 +1733,62 @@ class GameState:
             result["gameOver"] = self.end_info
         return result
 
-    def _handle_medic_task_update_locked(
-        self, player: Player, task: TaskItem, previous_done: bool
-    ) -> None:
-        if player.special_role != "medic":
-            return
-        if task.done and not previous_done and task.task_id not in player.medic_completed_tasks:
-            player.medic_completed_tasks.add(task.task_id)
-            player.medic_vitals_ready = True
-
     def _alive_players_unlocked(self) -> List[Player]:
-        return [player for player in self.players.values() if player.alive and not player.left_game]
+        return [self.players[pid] for pid in self._alive_ids]
 
     def _dead_players_unlocked(self) -> List[Player]:
-        return [player for player in self.players.values() if not player.alive and player.death_time]
+        return [self.players[pid] for pid in self._death_order if pid in self.players]
+
+    def _recent_dead_players_unlocked(self, cursor: int = 0) -> Tuple[List[Player], Optional[int]]:
+        """Dead players, most recent first; paged in large lobbies.
+
+        Small lobbies keep listing the dead in join order.
+        """
+        limit = self._page_limit()
+        if limit is None:
+            dead = set(self._death_order)
+            return [player for player in self.players.values() if player.player_id in dead], None
+        end = len(self._death_order) - max(0, cursor)
+        start = 0 if limit is None else max(0, end - limit)
+        next_cursor = cursor + limit if limit is not None and start > 0 else None
+        ids = self._death_order[start:end]
+        return [self.players[pid] for pid in reversed(ids) if pid in self.players], next_cursor
+
+    def _death_views_locked(self) -> Dict[str, object]:
+        """First page of death payloads and the meeting summary, built once per version.
+
+        Every viewer shares the public payloads; a dead viewer's own entry
+        (which adds who killed them and when) is swapped in by
+        ``_dead_payloads_locked``. Callers must not mutate the results.
+        """
+        cached = self._death_cache
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        dead_page, dead_next = self._recent_dead_players_unlocked()
+        public: List[Dict[str, object]] = []
+        own: Dict[str, Tuple[int, Dict[str, object]]] = {}
+        for player in dead_page:
+            payload = player.death_payload()
+            if payload:
+                own[player.player_id] = (len(public), player.death_payload(player.player_id))
+                public.append(payload)
+        views: Dict[str, object] = {
+            "dead": public,
+            "deadNext": dead_next,
+            "own": own,
+            "summary": self._public_meeting_summary_unlocked(),
+        }
+        self._death_cache = (self.version, views)
+        return views
+
+    def _dead_payloads_locked(self, viewer_id: str) -> Tuple[List[Dict[str, object]], Optional[int]]:
+        views = self._death_views_locked()
+        dead = views["dead"]
+        own = views["own"].get(viewer_id)
+        if own is not None:
+            dead = list(dead)
+            dead[own[0]] = own[1]
+        return dead, views["deadNext"]
 
     def _active_players_unlocked(self) -> List[Player]:
         return [player for player in self.players.values() if not player.left_game]
@@ -862,37 +1797,45 @@ class GameState:
         if self.comms_sabotage_end and time.time() >= self.comms_sabotage_end:
             self.comms_sabotage_end = 0.0
             self.comms_sabotage_by = None
+            self._touch_locked()
 
     def _clear_comms_sabotage_locked(self) -> None:
         self.comms_sabotage_end = 0.0
         self.comms_sabotage_by = None
 
-    def _comms_remaining_locked(self) -> int:
-        self._clear_expired_comms_locked()
-        return max(0, int(self.comms_sabotage_end - time.time()))
-
-    def _clear_expired_medic_window_locked(self, player: Player) -> None:
-        if player.medic_vitals_active_until and time.time() >= player.medic_vitals_active_until:
-            player.medic_vitals_active_until = 0.0
-
-    def _collect_vitals_locked(self) -> List[Dict[str, object]]:
-        vitals: List[Dict[str, object]] = []
-        for other in self.players.values():
-            vitals.append(
-                {
-                    "id": other.player_id,
-                    "name": other.name,
-                    "alive": other.alive and not other.left_game,
-                    "leftGame": other.left_game,
-                }
-            )
-        return vitals
+    def _collect_vitals_locked(self, cursor: int = 0) -> Tuple[List[Dict[str, object]], Optional[int]]:
+        rows, next_cursor = self._roster_page_locked(lambda other: True, cursor, self._page_limit())
+        vitals = [
+            {
+                "id": other.player_id,
+                "name": other.name,
+                "alive": other.alive and not other.left_game,
+                "leftGame": other.left_game,
+            }
+            for other in rows
+        ]
+        return vitals, next_cursor
+
+    def _vitals_payload_locked(self) -> Dict[str, object]:
+        vitals, next_cursor = self._collect_vitals_locked()
+        payload: Dict[str, object] = {"vitals": vitals}
+        if self._large_lobby():
+            alive = len(self._alive_ids)
+            payload["vitalsSummary"] = {
+                "alive": alive,
+                "dead": len(self.players) - alive - self._left_count,
+                "left": self._left_count,
+            }
+            payload["vitalsNext"] = next_cursor
+        return payload
 
     def _mark_player_dead_locked(self, victim: Player, killer: Optional[Player]) -> None:
         if not victim.alive:
             return
         victim.alive = False
         victim.death_time = time.time()
+        self._alive_ids.discard(victim.player_id)
+        self._death_order.append(victim.player_id)
         if killer:
             victim.killed_by = killer.player_id
             victim.killed_by_name = killer.name
@@ -900,36 +1843,102 @@ class GameState:
             victim.killed_by = None
             victim.killed_by_name = None
         victim.death_reported = False
+        victim.death_reported_at = None
+
+    def _end_game_locked(self, end_info: Dict[str, object]) -> None:
+        self.status = "ended"
+        self.end_info = end_info
+        self.report.finish(end_info, time.time())
+        self._record_task_timings_locked()
+        if history_store is not None:
+            history_store.record(self._history_record_locked())
+
+    def _history_record_locked(self) -> Dict[str, object]:
+        start = self.started_at
+        players = [player for player in self.players.values() if player.role]
+        deaths = []
+        tasks = []
+        for player in players:
+            if player.death_time:
+                cause = "kill" if player.killed_by else "left"
+                latency = player.death_reported_at - player.death_time if player.death_reported_at else None
+                deaths.append((cause, player.death_time - start, latency))
+            if player.role != "crewmate" or player.left_game:
+                continue
+            for items in player.tasks.values():
+                for task in items:
+                    completed = task.completed_at - start if task.completed_at else None
+                    tasks.append((task.category, completed))
+        return {
+            "code": self.code,
+            "round": self.round_number,
+            "startedAt": start,
+            "endedAt": time.time(),
+            "winner": self.end_info.get("winner"),
+            "reason": self.end_info.get("reason"),
+            "players": len(players),
+            "impostors": sum(1 for player in players if player.role == "impostor"),
+            "endInfo": self.end_info,
+            "deaths": deaths,
+            "tasks": tasks,
+        }
 
-    def _handle_player_departure_locked(self, player: Player) -> None:
-        if player.left_game:
-            return
-
-        player.left_game = True
-        player.ready = False
+    def _record_task_timings_locked(self) -> None:
+        samples: List[Tuple[str, str, Optional[float]]] = []
+        for player in self.players.values():
+            if player.role != "crewmate" or player.left_game:
+                continue
+            for items in player.tasks.values():
+                for task in items:
+                    if not task.assigned_at:
+                        continue
+                    seconds = task.completed_at - task.assigned_at if task.completed_at else None
+                    samples.append((task.category, task.name, seconds))
+        if samples:
+            task_timings.record_game(samples)
+
+    def _drop_task_counts_locked(self, player: Player) -> None:
+        if player.role == "crewmate":
+            for items in player.tasks.values():
+                self._tasks_total -= len(items)
+                self._tasks_completed -= sum(1 for task in items if task.done)
+
+    def _handle_player_departure_locked(self, player: Player) -> None:
+        if player.left_game:
+            return
+
+        player.left_game = True
+        self._left_count += 1
+        if self.status in {"in_game", "meeting"}:
+            self.report.left(player.player_id, time.time())
+        self._drop_task_counts_locked(player)
+        player.ready = False
         player.special_role = None
         player.emergency_available = False
-        player.medic_vitals_active_until = 0.0
-        player.medic_vitals_ready = False
-        player.medic_completed_tasks = set()
+        player.role_state = {}
+        self._drop_role_hooks_locked(player)
 
         if player.alive and player.role == "impostor":
             player.alive = False
             player.death_time = time.time()
+            self._alive_ids.discard(player.player_id)
+            self._death_order.append(player.player_id)
             player.killed_by = None
             player.killed_by_name = None
             player.death_reported = True
             player.tasks = {}
             self.meeting = None
             self.last_meeting_summary = None
-            self.status = "ended"
-            self.end_info = {
-                "winner": "crewmates",
-                "reason": "impostor_left",
-                "impostor": {"id": player.player_id, "name": player.name},
-                "message": f"O impostor {player.name} abandonou o jogo. Tripulacao vence!",
-            }
+            self._end_game_locked(
+                {
+                    "winner": "crewmates",
+                    "reason": "impostor_left",
+                    "impostor": {"id": player.player_id, "name": player.name},
+                    "message": f"O impostor {player.name} abandonou o jogo. Tripulacao vence!",
+                }
+            )
             self._clear_comms_sabotage_locked()
+            self._touch_locked()
             return
 
         if player.alive:
@@ -945,29 +1954,34 @@ class GameState:
         if self.status == "in_game":
             impostor_survivor = self._impostor_last_crewmate_locked()
             if impostor_survivor:
-                self.status = "ended"
-                self.end_info = {
-                    "winner": "impostor",
-                    "reason": "last_crewmate",
-                    "impostor": {
-                        "id": impostor_survivor.player_id,
-                        "name": impostor_survivor.name,
-                    },
-                    "message": f"O impostor {impostor_survivor.name} Venceu!",
-                }
+                self._end_game_locked(
+                    {
+                        "winner": "impostor",
+                        "reason": "last_crewmate",
+                        "impostor": {
+                            "id": impostor_survivor.player_id,
+                            "name": impostor_survivor.name,
+                        },
+                        "message": f"O impostor {impostor_survivor.name} Venceu!",
+                    }
+                )
                 self.meeting = None
             elif not any(
                 p.alive and p.role == "impostor" and not p.left_game for p in self.players.values()
             ):
-                self.status = "ended"
-                self.end_info = {
-                    "winner": "crewmates",
-                    "reason": "impostors_gone",
-                    "message": "Todos os impostores foram eliminados. Tripulacao vence!",
-                }
+                self._end_game_locked(
+                    {
+                        "winner": "crewmates",
+                        "reason": "impostors_gone",
+                        "message": "Todos os impostores foram eliminados. Tripulacao vence!",
+                    }
+                )
                 self.meeting = None
         if self.status == "ended":
             self._clear_comms_sabotage_locked()
+        # Last, so listeners see the lobby after the departure.
+        self._touch_locked()
+
     def _impostor_last_crewmate_locked(self) -> Optional[Player]:
         alive_players = self._alive_players_unlocked()
         impostors = [player for player in alive_players if player.role == "impostor"]
@@ -978,71 +1992,120 @@ class GameState:
 
     def call_emergency_meeting(self, caller_id: str) -> Dict[str, object]:
         with self._lock:
-            caller = self.players.get(caller_id)
-            if not caller:
-                return {"ok": False, "error": "Jogador nao encontrado."}
-            if caller.left_game:
-                return {"ok": False, "error": "Jogador nao esta ativo."}
-            if not caller.alive:
-                return {"ok": False, "error": "Jogadores mortos nao podem chamar reuniao."}
-            if self.status != "in_game":
-                return {"ok": False, "error": "Nao podes chamar reuniao agora."}
-            if self.meeting:
-                return {"ok": False, "error": "Ja existe uma reuniao a decorrer."}
-            if not caller.emergency_available:
-                return {"ok": False, "error": "Ja usaste a tua reuniao de emergencia."}
-
-            caller.emergency_available = False
-            now = time.time()
-            meeting_id = str(uuid.uuid4())
-            self.status = "meeting"
-            self.meeting = {
-                "id": meeting_id,
-                "caller": caller_id,
-                "started_at": now,
-                "ends_at": now + self.config["meeting_duration"],
-                "votes": {},
-                "reported_body": None,
-                "voting_starts_at": now + self.MEETING_VOTE_DELAY,
-                "type": "emergency",
-            }
-            self._clear_comms_sabotage_locked()
-            return {"ok": True, "meetingId": meeting_id}
+            return self._call_emergency_meeting_locked(caller_id)
+
+    def _call_emergency_meeting_locked(self, caller_id: str) -> Dict[str, object]:
+        caller = self.players.get(caller_id)
+        if not caller:
+            return {"ok": False, "error": "Jogador nao encontrado."}
+        if caller.left_game:
+            return {"ok": False, "error": "Jogador nao esta ativo."}
+        if not caller.alive:
+            return {"ok": False, "error": "Jogadores mortos nao podem chamar reuniao."}
+        if self.status != "in_game":
+            return {"ok": False, "error": "Nao podes chamar reuniao agora."}
+        if self.meeting:
+            return {"ok": False, "error": "Ja existe uma reuniao a decorrer."}
+        if not caller.emergency_available:
+            return {"ok": False, "error": "Ja usaste a tua reuniao de emergencia."}
+
+        caller.emergency_available = False
+        now = time.time()
+        meeting_id = str(uuid.uuid4())
+        self.status = "meeting"
+        self.meeting = {
+            "id": meeting_id,
+            "caller": caller_id,
+            "started_at": now,
+            "ends_at": now + self.config["meeting_duration"],
+            "votes": {},
+            "reported_body": None,
+            "voting_starts_at": now + self.MEETING_VOTE_DELAY,
+            "type": "emergency",
+        }
+        self.chat.reset(meeting_id)
+        self.report.meeting_started(self.meeting)
+        self._clear_comms_sabotage_locked()
+        self._touch_locked()
+        return {"ok": True, "meetingId": meeting_id}
 
     def start_meeting(self, caller_id: str, body_id: Optional[str]) -> Dict[str, object]:
         with self._lock:
-            caller = self.players.get(caller_id)
-            if not caller:
-                return {"ok": False, "error": "Jogador nao encontrado."}
-            if not caller.alive:
-                return {"ok": False, "error": "Apenas jogadores vivos podem reportar."}
-            if self.status not in {"in_game"}:
-                return {"ok": False, "error": "Nao podes chamar reuniao agora."}
-            if self.meeting:
-                return {"ok": False, "error": "Ja existe uma reuniao a decorrer."}
-
-            if not body_id:
-                return {"ok": False, "error": "Indica o corpo reportado."}
-            reported_body = self.players.get(body_id)
-            if not reported_body or reported_body.alive or not reported_body.death_time:
-                return {"ok": False, "error": "Esse corpo nao foi encontrado."}
-            reported_body.death_reported = True
+            return self._start_meeting_locked(caller_id, body_id)
+
+    def _start_meeting_locked(self, caller_id: str, body_id: Optional[str]) -> Dict[str, object]:
+        caller = self.players.get(caller_id)
+        if not caller:
+            return {"ok": False, "error": "Jogador nao encontrado."}
+        if not caller.alive:
+            return {"ok": False, "error": "Apenas jogadores vivos podem reportar."}
+        if self.status not in {"in_game"}:
+            return {"ok": False, "error": "Nao podes chamar reuniao agora."}
+        if self.meeting:
+            return {"ok": False, "error": "Ja existe uma reuniao a decorrer."}
+
+        if not body_id:
+            return {"ok": False, "error": "Indica o corpo reportado."}
+        reported_body = self.players.get(body_id)
+        if not reported_body or reported_body.alive or not reported_body.death_time:
+            return {"ok": False, "error": "Esse corpo nao foi encontrado."}
+        now = time.time()
+        if not reported_body.death_reported:
+            reported_body.death_reported_at = now
+        reported_body.death_reported = True
+
+        meeting_id = str(uuid.uuid4())
+        self.status = "meeting"
+        self.meeting = {
+            "id": meeting_id,
+            "caller": caller_id,
+            "started_at": now,
+            "ends_at": now + self.config["meeting_duration"],
+            "votes": {},
+            "reported_body": reported_body.player_id,
+            "voting_starts_at": now + self.MEETING_VOTE_DELAY,
+            "type": "reported",
+        }
+        self.chat.reset(meeting_id)
+        self.report.meeting_started(self.meeting)
+        self._clear_comms_sabotage_locked()
+        self._touch_locked()
+        return {"ok": True, "meetingId": meeting_id}
 
-            now = time.time()
-            meeting_id = str(uuid.uuid4())
-            self.status = "meeting"
-            self.meeting = {
-                "id": meeting_id,
-                "caller": caller_id,
-                "started_at": now,
-                "ends_at": now + self.config["meeting_duration"],
-                "votes": {},
-                "reported_body": reported_body.player_id,
-                "voting_starts_at": now + self.MEETING_VOTE_DELAY,
-                "type": "reported",
+    def post_chat(self, player_id: str, text: str) -> Dict[str, object]:
+        with self._lock:
+            return self._post_chat_locked(player_id, text)
+
+    def _post_chat_locked(self, player_id: str, text: str) -> Dict[str, object]:
+        player = self.players.get(player_id)
+        if not player or player.left_game:
+            return {"ok": False, "error": "Jogador nao encontrado."}
+        if self.status != "meeting" or not self.meeting:
+            return {"ok": False, "error": "O chat so esta aberto durante reunioes."}
+        text = " ".join(text.split())
+        if not text:
+            return {"ok": False, "error": "Escreve uma mensagem."}
+        if len(text) > self.CHAT_MAX_LENGTH:
+            return {"ok": False, "error": "Mensagem demasiado longa."}
+        message = self.chat.append(player, text, time.time())
+        for listener in self._chat_listeners:
+            listener(self)
+        return {"ok": True, "message": message.payload()}
+
+    def chat_since(self, player_id: str, after: int) -> Dict[str, object]:
+        """Chat messages after the ``after`` cursor; ghosts' messages reach dead players only."""
+        with self._lock:
+            player = self.players.get(player_id)
+            if not player or player.left_game:
+                return {"ok": False, "error": "Jogador nao encontrado."}
+            messages, truncated = self.chat.since(after, see_ghosts=not player.alive)
+            return {
+                "ok": True,
+                "meetingId": self.chat.meeting_id,
+                "messages": [message.payload() for message in messages],
+                "cursor": self.chat.last_id,
+                "truncated": truncated,
             }
-            self._clear_comms_sabotage_locked()
-            return {"ok": True, "meetingId": meeting_id}
 
     def _maybe_finalize_meeting_locked(self) -> None:
         if not self.meeting:
@@ -1073,6 +2136,7 @@ class GameState:
             ejected_player = self.players.get(chosen_target)
             if ejected_player and ejected_player.alive:
                 ejected_player.alive = False
+                self._alive_ids.discard(ejected_player.player_id)
                 outcome = "ejected"
             else:
                 chosen_target = None
@@ -1080,19 +2144,30 @@ class GameState:
                 outcome = "no_elimination"
         elif vote_counter:
             outcome = "skipped" if vote_counter.get(skip_key) else "no_elimination"
+        self.report.meeting_resolved(
+            meeting, outcome, ejected_player.player_id if ejected_player else None, time.time()
+        )
 
         total, completed = self._task_totals_unlocked()
         current_progress = completed / total if total else 0.0
         self.revealed_progress = current_progress
 
+        large_lobby = self._large_lobby()
+        tallies = vote_counter.most_common() if large_lobby else list(vote_counter.items())
         votes_breakdown = []
-        for target, count in vote_counter.items():
+        other_votes = 0
+        for target, count in tallies:
+            if large_lobby and target != skip_key and len(votes_breakdown) >= self.LARGE_LOBBY_TOP_VOTES:
+                other_votes += count
+                continue
             if target == skip_key:
                 label = "Skip"
             else:
                 player = self.players.get(target)
                 label = player.name if player else "Desconhecido"
             votes_breakdown.append({"target": target, "label": label, "count": count})
+        if other_votes:
+            votes_breakdown.append({"target": None, "label": "Outros", "count": other_votes})
 
         summary = {
             "id": meeting["id"],
@@ -1106,9 +2181,12 @@ class GameState:
                 "revealed": self.revealed_progress,
             },
         }
+        dead_page, _ = self._recent_dead_players_unlocked()
         summary["deceased"] = [
-            payload for payload in (p.death_payload() for p in self.players.values()) if payload
+            payload for payload in (p.death_payload() for p in dead_page) if payload
         ]
+        if large_lobby:
+            summary["deceasedTotal"] = len(self._death_order)
 
         if ejected_player:
             summary["ejected"] = {
@@ -1120,27 +2198,29 @@ class GameState:
         impostor_survivor = self._impostor_last_crewmate_locked()
 
         if ejected_player and ejected_player.role == "impostor":
-            self.status = "ended"
-            self.end_info = {
-                "winner": "crewmates",
-                "reason": "impostor_ejected",
-                "impostor": {
-                    "id": ejected_player.player_id,
-                    "name": ejected_player.name,
-                },
-            }
+            self._end_game_locked(
+                {
+                    "winner": "crewmates",
+                    "reason": "impostor_ejected",
+                    "impostor": {
+                        "id": ejected_player.player_id,
+                        "name": ejected_player.name,
+                    },
+                }
+            )
             summary["gameOver"] = self.end_info
         elif impostor_survivor:
-            self.status = "ended"
-            self.end_info = {
-                "winner": "impostor",
-                "reason": "last_crewmate",
-                "impostor": {
-                    "id": impostor_survivor.player_id,
-                    "name": impostor_survivor.name,
-                },
-                "message": f"O impostor {impostor_survivor.name} Venceu!",
-            }
+            self._end_game_locked(
+                {
+                    "winner": "impostor",
+                    "reason": "last_crewmate",
+                    "impostor": {
+                        "id": impostor_survivor.player_id,
+                        "name": impostor_survivor.name,
+                    },
+                    "message": f"O impostor {impostor_survivor.name} Venceu!",
+                }
+            )
             summary["gameOver"] = self.end_info
         else:
             self.status = "in_game"
@@ -1149,70 +2229,67 @@ class GameState:
         self.meeting = None
         if self.status == "ended":
             self._clear_comms_sabotage_locked()
+        self._touch_locked()
 
     def cast_vote(self, voter_id: str, target_id: Optional[str]) -> Dict[str, object]:
         with self._lock:
-            voter = self.players.get(voter_id)
-            if not voter:
-                return {"ok": False, "error": "Jogador nao encontrado."}
-            if not voter.alive:
-                return {"ok": False, "error": "Jogadores mortos nao votam."}
-            if self.status != "meeting" or not self.meeting:
-                return {"ok": False, "error": "Nao existe reuniao ativa."}
-
-            self._maybe_finalize_meeting_locked()
-            if self.status != "meeting" or not self.meeting:
-                return {"ok": False, "error": "A reuniao ja terminou."}
-
-            vote_start = self.meeting.get("voting_starts_at", self.meeting.get("started_at", 0))
-            now = time.time()
-            if now < vote_start:
-                remaining = int(vote_start - now)
-                return {
-                    "ok": False,
-                    "error": "Ainda nao podes votar. Aguarda alguns segundos.",
-                    "delay": remaining,
-                }
+            return self._cast_vote_locked(voter_id, target_id)
+
+    def _cast_vote_locked(self, voter_id: str, target_id: Optional[str]) -> Dict[str, object]:
+        voter = self.players.get(voter_id)
+        if not voter:
+            return {"ok": False, "error": "Jogador nao encontrado."}
+        if not voter.alive:
+            return {"ok": False, "error": "Jogadores mortos nao votam."}
+        if self.status != "meeting" or not self.meeting:
+            return {"ok": False, "error": "Nao existe reuniao ativa."}
+
+        self._maybe_finalize_meeting_locked()
+        if self.status != "meeting" or not self.meeting:
+            return {"ok": False, "error": "A reuniao ja terminou."}
+
+        vote_start = self.meeting.get("voting_starts_at", self.meeting.get("started_at", 0))
+        now = time.time()
+        if now < vote_start:
+            return {
+                "ok": False,
+                "error": "Ainda nao podes votar. Aguarda alguns segundos.",
+                "votingStartsAt": vote_start,
+            }
 
-            if target_id and target_id != self.SKIP_VOTE:
-                target_player = self.players.get(target_id)
-                if not target_player or not target_player.alive:
-                    return {"ok": False, "error": "Destino invalido."}
+        if target_id and target_id != self.SKIP_VOTE:
+            target_player = self.players.get(target_id)
+            if not target_player or not target_player.alive:
+                return {"ok": False, "error": "Destino invalido."}
 
-            vote_value = target_id or self.SKIP_VOTE
-            self.meeting["votes"][voter_id] = vote_value
+        vote_value = target_id or self.SKIP_VOTE
+        self.meeting["votes"][voter_id] = vote_value
+        self._touch_locked()
 
-            alive_ids = {p.player_id for p in self._alive_players_unlocked()}
-            if alive_ids.issubset(set(self.meeting["votes"].keys())):
-                self._resolve_meeting_locked()
-                return {"ok": True, "final": True}
+        if self._alive_ids.issubset(self.meeting["votes"].keys()):
+            self._resolve_meeting_locked()
+            return {"ok": True, "final": True}
 
-            return {"ok": True, "final": False}
+        return {"ok": True, "final": False}
 
     def _meeting_payload_unlocked(self, current_player_id: str) -> Optional[Dict[str, object]]:
         if not self.meeting:
             return None
-        remaining = max(0, int(self.meeting["ends_at"] - time.time()))
-        voting_starts_in = max(0, int(self.meeting["voting_starts_at"] - time.time()))
         votes = self.meeting["votes"]
-        alive_players = []
-        for p in self.players.values():
-            if not p.alive or p.left_game:
-                continue
-            alive_players.append(
-                {
-                    "id": p.player_id,
-                    "name": p.name,
-                    "avatar": p.avatar,
-                    "hasVoted": p.player_id in votes,
-                }
-            )
+        alive_page, alive_next = self._roster_page_locked(
+            lambda p: p.alive and not p.left_game, 0, self._page_limit()
+        )
+        alive_players = [
+            {
+                "id": p.player_id,
+                "name": p.name,
+                "avatar": p.avatar,
+                "hasVoted": p.player_id in votes,
+            }
+            for p in alive_page
+        ]
 
-        deceased_players = []
-        for player in self._dead_players_unlocked():
-            payload = player.death_payload(current_player_id)
-            if payload:
-                deceased_players.append(payload)
+        deceased_players, dead_next = self._dead_payloads_locked(current_player_id)
 
         reported_body_id = self.meeting.get("reported_body")
         reported_body = self.players.get(reported_body_id) if reported_body_id else None
@@ -1236,153 +2313,282 @@ class GameState:
                 "avatar": caller.avatar,
             }
 
-        votes = self.meeting["votes"]
-        return {
+        payload = {
             "id": self.meeting["id"],
             "caller": self.meeting["caller"],
             "type": self.meeting.get("type", "reported"),
-            "endsIn": remaining,
+            "endsAt": self.meeting["ends_at"],
             "alivePlayers": alive_players,
             "deceased": deceased_players,
             "reportedBody": reported_payload,
             "reporter": reporter_payload,
-            "voted": list(votes.keys()),
-            "votingStartsIn": voting_starts_in,
+            "votingStartsAt": self.meeting["voting_starts_at"],
             "myVote": votes.get(current_player_id),
         }
+        if self._large_lobby():
+            payload["alivePlayersNext"] = alive_next
+            payload["deceasedNext"] = dead_next
+            payload["aliveCount"] = len(self._alive_ids)
+            payload["votedCount"] = len(votes)
+        else:
+            payload["voted"] = list(votes.keys())
+        return payload
 
-    def _meeting_summary_for_player_unlocked(
-        self, current_player_id: str
-    ) -> Optional[Dict[str, object]]:
+    def _public_meeting_summary_unlocked(self) -> Optional[Dict[str, object]]:
         summary = self.last_meeting_summary
         if not summary:
             return None
         filtered = summary.copy()
-        raw_deceased = summary.get("deceased", [])
-        deceased_entries: List[Dict[str, object]] = []
-        for entry in raw_deceased:
-            if not entry:
-                continue
-            entry_copy = dict(entry)
-            if entry_copy.get("id") != current_player_id:
+        if "deceased" in filtered:
+            deceased_entries: List[Dict[str, object]] = []
+            for entry in summary["deceased"]:
+                if not entry:
+                    continue
+                entry_copy = dict(entry)
                 entry_copy.pop("killedAt", None)
                 entry_copy.pop("killedBy", None)
                 entry_copy.pop("killedByName", None)
-            deceased_entries.append(entry_copy)
-        if "deceased" in filtered:
+                deceased_entries.append(entry_copy)
             filtered["deceased"] = deceased_entries
         return filtered
 
-    def player_view(self, player_id: str) -> Dict[str, object]:
+    def spectator_view(self) -> Tuple[int, bytes]:
+        """Role-safe board payload, serialized once per state version and shared."""
         with self._lock:
-            player = self.players.get(player_id)
-            if not player:
-                return {"ok": False, "error": "Jogador nao encontrado."}
-
             if self.meeting:
                 self._maybe_finalize_meeting_locked()
             self._clear_expired_comms_locked()
+            cached = self._spectator_cache
+            if cached is None or cached[0] != self.version:
+                payload = self._spectator_payload_locked()
+                cached = (self.version, json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+                self._spectator_cache = cached
+            return cached
+
+    def _spectator_payload_locked(self) -> Dict[str, object]:
+        # Deadlines are absolute so the payload stays valid for the whole version.
+        total, _ = self._task_totals_unlocked()
+        views = self._death_views_locked()
+        payload: Dict[str, object] = {
+            "ok": True,
+            "code": self.code,
+            "status": self.status,
+            "round": self.round_number,
+            "version": self.version,
+            "playerCount": len(self._active_players_unlocked()),
+            "aliveCount": len(self._alive_ids),
+            "progress": {"total": total, "revealed": self.revealed_progress},
+            "deadPlayers": views["dead"],
+            "deadPlayersTotal": len(self._death_order),
+            "commsSabotage": {
+                "active": self.comms_sabotage_end > 0,
+                "endsAt": self.comms_sabotage_end or None,
+            },
+        }
+        if self.meeting:
+            meeting = self._meeting_payload_unlocked("")
+            meeting.pop("myVote", None)
+            meeting["votedCount"] = len(self.meeting["votes"])
+            meeting["aliveCount"] = len(self._alive_ids)
+            payload["meeting"] = meeting
+        summary = views["summary"]
+        if summary:
+            payload["meetingSummary"] = summary
+        if self.status == "ended" and self.end_info:
+            payload["gameOver"] = self.end_info
+        return payload
 
-            total, completed = self._task_totals_unlocked()
-            current_progress = completed / total if total else 0.0
-
-            meeting_payload = self._meeting_payload_unlocked(player_id)
-            summary = self._meeting_summary_for_player_unlocked(player_id)
-            end_info = self.end_info if self.status == "ended" else None
-
-            dead_payloads = []
-            for target in self.players.values():
-                payload = target.death_payload(player_id)
-                if payload:
-                    dead_payloads.append(payload)
-            kill_targets = []
-            if player.role == "impostor":
-                for other in self.players.values():
-                    if (
-                        other.player_id == player_id
-                        or not other.alive
-                        or other.left_game
-                    ):
-                        continue
-                    kill_targets.append(
-                        {
-                            "id": other.player_id,
-                            "name": other.name,
-                            "avatar": other.avatar,
-                        }
-                    )
+    def game_summary(self) -> Optional[Tuple[str, bytes]]:
+        """(game id, JSON body) of the last finished game's report, if any."""
+        with self._lock:
+            if self.report.body is None:
+                return None
+            return self.report.game_id, self.report.body
 
-            death_note = None
-            if not player.alive and player.death_time and player.killed_by_name:
-                killed_at = time.strftime("%H:%M", time.localtime(player.death_time))
-                death_note = f"Foste morto as {killed_at} por {player.killed_by_name}."
-            elif not player.alive and player.death_time:
-                killed_at = time.strftime("%H:%M", time.localtime(player.death_time))
-                death_note = f"Foste morto as {killed_at}."
+    def player_view(self, player_id: str) -> Dict[str, object]:
+        with self._lock:
+            return self._player_view_locked(player_id)
 
-            payload = {
-                "ok": True,
-                "name": player.name,
-                "role": player.role,
-                "status": self.status,
-                "alive": player.alive,
-                "isLeader": player.player_id == self.leader_id,
-                "leaderId": self.leader_id,
-                "avatar": player.avatar,
-                "lobbyCode": self.code,
-                "tasks": player.tasks_payload(),
-                "killCooldown": self.config["kill_cooldown"],
-                "killRemaining": player.kill_cooldown_remaining(),
-                "deadPlayers": dead_payloads,
-                "deathNote": death_note,
-                "progress": {
-                    "total": total,
-                    "completed": completed,
-                    "current": current_progress,
-                    "revealed": self.revealed_progress,
-                },
-                "specialRole": player.special_role,
-                "emergencyAvailable": player.emergency_available,
-            }
-            comms_remaining = self._comms_remaining_locked()
-            comms_active = comms_remaining > 0
-            payload["commsSabotage"] = {
-                "active": comms_active,
-                "remaining": comms_remaining,
-                "affectsPlayer": comms_active and player.role != "impostor",
-            }
-            if kill_targets:
-                payload["killTargets"] = kill_targets
-
-            if player.special_role == "medic":
-                self._clear_expired_medic_window_locked(player)
-                now = time.time()
-                remaining = max(0, int(player.medic_vitals_active_until - now))
-                active = player.medic_vitals_active_until > now
-                medic_payload: Dict[str, object] = {
-                    "active": active,
-                    "remaining": remaining,
-                    "ready": player.medic_vitals_ready,
-                    "duration": self.medic_vitals_duration,
-                }
-                if active:
-                    medic_payload["vitals"] = self._collect_vitals_locked()
-                payload["medicVitals"] = medic_payload
+    def push_view(self, player_id: str) -> Tuple[int, Dict[str, object]]:
+        """The player's view and the version it was built from."""
+        with self._lock:
+            return self.version, self._player_view_locked(player_id, advise_poll=False)
+
+    def _player_view_locked(self, player_id: str, advise_poll: bool = True) -> Dict[str, object]:
+        player = self.players.get(player_id)
+        if not player:
+            return {"ok": False, "error": "Jogador nao encontrado."}
 
-            if meeting_payload:
-                payload["meeting"] = meeting_payload
-            if summary:
-                payload["meetingSummary"] = summary
-            if end_info:
-                payload["gameOver"] = end_info
+        self._expire_timed_locked()
 
+        total, completed = self._task_totals_unlocked()
+        current_progress = completed / total if total else 0.0
+
+        meeting_payload = self._meeting_payload_unlocked(player_id)
+        summary = self._death_views_locked()["summary"]
+        end_info = self.end_info if self.status == "ended" else None
+        dead_payloads, dead_next = self._dead_payloads_locked(player_id)
+
+        death_note = None
+        if not player.alive and player.death_time and player.killed_by_name:
+            killed_at = time.strftime("%H:%M", time.localtime(player.death_time))
+            death_note = f"Foste morto as {killed_at} por {player.killed_by_name}."
+        elif not player.alive and player.death_time:
+            killed_at = time.strftime("%H:%M", time.localtime(player.death_time))
+            death_note = f"Foste morto as {killed_at}."
+
+        payload = {
+            "ok": True,
+            "name": player.name,
+            "role": player.role,
+            "status": self.status,
+            "alive": player.alive,
+            "isLeader": player.player_id == self.leader_id,
+            "leaderId": self.leader_id,
+            "avatar": player.avatar,
+            "lobbyCode": self.code,
+            "tasks": player.tasks_payload(),
+            "killCooldown": self.config["kill_cooldown"],
+            "killReadyAt": player.kill_cooldown_end or None,
+            "deadPlayers": dead_payloads,
+            "deathNote": death_note,
+            "progress": {
+                "total": total,
+                "completed": completed,
+                "current": current_progress,
+                "revealed": self.revealed_progress,
+            },
+            "specialRole": player.special_role,
+            "emergencyAvailable": player.emergency_available,
+        }
+        comms_active = self.comms_sabotage_end > 0
+        payload["commsSabotage"] = {
+            "active": comms_active,
+            "endsAt": self.comms_sabotage_end or None,
+            "affectsPlayer": comms_active and player.role != "impostor",
+        }
+        if self._large_lobby():
+            payload["deadPlayersNext"] = dead_next
+            payload["deadPlayersTotal"] = len(self._death_order)
+        view_roles = self._view_roles.get(player_id, ())
+        for role in view_roles:
+            role.view(self, player, payload)
+
+        if meeting_payload:
+            payload["meeting"] = meeting_payload
+        if summary:
+            payload["meetingSummary"] = summary
+        if end_info:
+            payload["gameOver"] = end_info
+
+        if not advise_poll:
             return payload
+        # Countdowns are rendered by the client from the absolute times above;
+        # only deadlines that change server state call for an earlier poll.
+        deadlines = [self.meeting["ends_at"]] if self.meeting else []
+        for role in view_roles:
+            deadlines.extend(role.deadlines(self, player))
+        payload["pollAfterMs"] = self._recommended_poll_ms_locked("player", player_id, deadlines)
+
+        return payload
+
+    def _kill_targets_locked(
+        self, player_id: str, cursor: int = 0, query: str = ""
+    ) -> Tuple[List[Dict[str, object]], Optional[int]]:
+        targets, next_cursor = self._roster_page_locked(
+            lambda other: other.player_id != player_id and other.alive and not other.left_game,
+            cursor,
+            self._page_limit(),
+            query,
+        )
+        payload = [
+            {"id": other.player_id, "name": other.name, "avatar": other.avatar}
+            for other in targets
+        ]
+        return payload, next_cursor
+
+    def player_list(
+        self, player_id: str, kind: str, cursor: int = 0, query: str = ""
+    ) -> Dict[str, object]:
+        with self._lock:
+            player = self.players.get(player_id)
+            if not player:
+                return {"ok": False, "error": "Jogador nao encontrado."}
+            if kind in roles.LISTS:
+                result = roles.LISTS[kind](self, player, cursor, query)
+                if not result.get("ok"):
+                    return result
+                items, next_cursor = result["items"], result["nextCursor"]
+            elif kind == "deadPlayers":
+                dead_page, next_cursor = self._recent_dead_players_unlocked(cursor)
+                items = [payload for payload in (p.death_payload(player_id) for p in dead_page) if payload]
+            elif kind == "alivePlayers":
+                if not self.meeting:
+                    return {"ok": False, "error": "Nao existe reuniao ativa."}
+                votes = self.meeting["votes"]
+                alive_page, next_cursor = self._roster_page_locked(
+                    lambda p: p.alive and not p.left_game, cursor, self._page_limit(), query
+                )
+                items = [
+                    {
+                        "id": p.player_id,
+                        "name": p.name,
+                        "avatar": p.avatar,
+                        "hasVoted": p.player_id in votes,
+                    }
+                    for p in alive_page
+                ]
+            else:
+                return {"ok": False, "error": "Lista desconhecida."}
+            return {"ok": True, "kind": kind, "items": items, "nextCursor": next_cursor}
+
+    def apply_batch(self, player_id: str, actions: List[object]) -> Dict[str, object]:
+        with self._lock:
+            results = [self._apply_action_locked(player_id, action) for action in actions]
+            view = self._player_view_locked(player_id)
+        return {"ok": True, "results": results, "player": view}
+
+    def apply_action(self, player_id: str, action: object) -> Dict[str, object]:
+        with self._lock:
+            return self._apply_action_locked(player_id, action)
+
+    def _apply_action_locked(self, player_id: str, action: object) -> Dict[str, object]:
+        if not isinstance(action, dict):
+            return {"ok": False, "error": "Acao invalida."}
+        kind = action.get("type")
+        if kind == "mark_task":
+            task_id = str(action.get("taskId") or "")
+            result = self._mark_task_locked(player_id, task_id, bool(action.get("done", True)))
+        elif kind == "report":
+            body_id = action.get("bodyId")
+            result = self._start_meeting_locked(player_id, str(body_id) if body_id else None)
+        elif kind == "emergency":
+            result = self._call_emergency_meeting_locked(player_id)
+        elif kind == "vote":
+            target = action.get("target")
+            result = self._cast_vote_locked(player_id, str(target) if target else None)
+        elif kind == "chat":
+            result = self._post_chat_locked(player_id, str(action.get("text") or ""))
+        elif kind in roles.ACTIONS:
+            result = roles.ACTIONS[kind](self, player_id, action)
+        else:
+            return {"ok": False, "type": kind, "error": "Acao desconhecida."}
+        return {"type": kind, **result}
 
     def lobby_snapshot(self, current_id: str) -> Dict[str, object]:
         with self._lock:
             active_players = [p for p in self.players.values() if not p.left_game]
-            players = [p.lobby_payload(current_id, self.leader_id) for p in active_players]
+            listed = active_players
+            if self._large_lobby():
+                listed, _ = self._roster_page_locked(
+                    lambda p: not p.left_game, 0, self.LARGE_LOBBY_PAGE_SIZE
+                )
+                me = self.players.get(current_id)
+                if me and me not in listed:
+                    listed = [me] + listed
+            players = [p.lobby_payload(current_id, self.leader_id) for p in listed]
             player_count = len(active_players)
+            ready_count = sum(1 for p in active_players if p.ready)
             required = self.config["required_players"]
             status = self.status
             everyone_ready = bool(active_players) and all(p.ready for p in active_players)
@@ -1397,32 +2603,259 @@ class GameState:
                 "everyoneReady": everyone_ready,
                 "canStart": can_start,
                 "players": players,
+                "readyCount": ready_count,
                 "leaderId": self.leader_id,
                 "leaderName": leader.name if leader else None,
                 "config": self._config_payload_unlocked(),
                 "configLimits": self._config_limits_payload(),
+                "pollAfterMs": self._recommended_poll_ms_locked("state", current_id, []),
             }
         return payload
 
 
+@dataclass
+class LobbySummary:
+    code: str
+    created_at: float
+    status: str = "lobby"
+    player_count: int = 0
+    round_number: int = 0
+    meeting: Optional[Dict[str, object]] = None
+    last_activity: float = 0.0
+    capacity: int = 0
+    leader_name: Optional[str] = None
+
+    def payload(self, now: float) -> Dict[str, object]:
+        return {
+            "code": self.code,
+            "status": self.status,
+            "playerCount": self.player_count,
+            "round": self.round_number,
+            "idleSeconds": int(now - self.last_activity),
+            "meeting": self.meeting,
+            "createdAt": int(self.created_at),
+        }
+
+    def browse_keys(self) -> Dict[str, Tuple[float, float, str]]:
+        # Ascending sort keys for the public browser: fullest first, newest first.
+        return {
+            "fill": (-self.player_count / self.capacity, self.created_at, self.code),
+            "age": (-self.created_at, 0.0, self.code),
+        }
+
+    def browse_payload(self) -> Dict[str, object]:
+        return {
+            "code": self.code,
+            "playerCount": self.player_count,
+            "capacity": self.capacity,
+            "host": self.leader_name,
+            "createdAt": int(self.created_at),
+        }
+
+
+class LobbyCodeAllocator:
+    """Collision-free lobby codes from a keyed permutation of the code space.
+
+    The n-th code is ``encode(permute(n))``. ``permute`` is a four-round
+    Feistel network over the next even power of two, cycle-walked back into
+    ``alphabet ** length`` (36^5, about 60M). Its round functions are
+    precomputed tables over one half, and ``encode`` joins two table entries
+    (every 3- and 2-character string, about 3 MB for 36^5). Codes therefore
+    look random but never repeat until the whole space has been handed out.
+    Each allocation is a counter step and a few integer rounds: no retry
+    loop and no registry lock. Released codes stay in quarantine for
+    ``quarantine`` seconds. Once the counter wraps into a new cycle, codes
+    still in use or in quarantine are skipped.
+    """
+
+    ALPHABET = string.ascii_uppercase + string.digits
+    LENGTH = 5
+    QUARANTINE_SECONDS = 2 * 3600.0
+
+    def __init__(
+        self,
+        alphabet: str = ALPHABET,
+        length: int = LENGTH,
+        quarantine: float = QUARANTINE_SECONDS,
+        key: Optional[bytes] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.alphabet = alphabet
+        self.length = length
+        self.space = len(alphabet) ** length
+        self.quarantine = quarantine
+        bits = max(2, (self.space - 1).bit_length())
+        self._half_bits = (bits + 1) // 2
+        self._half_mask = (1 << self._half_bits) - 1
+        key = key if key is not None else os.urandom(16)
+        halves = list(range(1 << self._half_bits))
+        self._rounds = tuple(
+            self._round_table(
+                int.from_bytes(hashlib.blake2b(bytes([index]), key=key, digest_size=4).digest(), "big"), halves
+            )
+            for index in range(4)
+        )
+        self._low_base = len(alphabet) ** (length // 2)
+        self._high = self._strings(length - length // 2)
+        self._low = self._strings(length // 2)
+        # Guards the counter and the quarantine only.
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._next = 0
+        self.cycles = 0
+        self.skipped = 0
+        self._quarantined: Dict[str, float] = {}
+        self._released: Deque[Tuple[float, str]] = deque()
+
+    def _round_table(self, round_key: int, halves: List[int]) -> Tuple[int, ...]:
+        table = []
+        for half in halves:
+            mixed = ((half ^ round_key) * 0x9E3779B1) & 0xFFFFFFFF
+            # Entries reuse the ``halves`` ints instead of allocating their own.
+            table.append(halves[(mixed ^ (mixed >> 16)) & self._half_mask])
+        return tuple(table)
+
+    def _feistel(self, value: int) -> int:
+        first, second, third, fourth = self._rounds
+        left, right = value >> self._half_bits, value & self._half_mask
+        left ^= first[right]
+        right ^= second[left]
+        left ^= third[right]
+        right ^= fourth[left]
+        return (left << self._half_bits) | right
+
+    def permute(self, index: int) -> int:
+        # Cycle-walking keeps a bijection on [0, space); expected walk < 4 steps.
+        value = self._feistel(index)
+        while value >= self.space:
+            value = self._feistel(value)
+        return value
+
+    def _strings(self, length: int) -> List[str]:
+        strings = [""]
+        for _ in range(length):
+            strings = [prefix + char for prefix in strings for char in self.alphabet]
+        return strings
+
+    def encode(self, value: int) -> str:
+        high, low = divmod(value, self._low_base)
+        return self._high[high] + self._low[low]
+
+    def allocate(self, in_use: Callable[[str], bool]) -> str:
+        """Next code. ``in_use`` is only consulted after the first full cycle."""
+        with self._lock:
+            if self.cycles:
+                self._expire_locked(self._clock())
+            for _ in range(self.space):
+                index = self._next
+                self._next += 1
+                if self._next == self.space:
+                    self._next = 0
+                    self.cycles += 1
+                code = self.encode(self.permute(index))
+                if not self.cycles:
+                    return code
+                if code not in self._quarantined and not in_use(code):
+                    return code
+                self.skipped += 1
+            raise RuntimeError("lobby code space exhausted")
+
+    def release(self, code: str) -> None:
+        with self._lock:
+            now = self._clock()
+            self._expire_locked(now)
+            self._quarantined[code] = now
+            self._released.append((now, code))
+
+    def _expire_locked(self, now: float) -> None:
+        released = self._released
+        while released and now - released[0][0] >= self.quarantine:
+            stamp, code = released.popleft()
+            if self._quarantined.get(code) == stamp:
+                del self._quarantined[code]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "allocated": self.cycles * self.space + self._next,
+                "cycles": self.cycles,
+                "quarantined": len(self._quarantined),
+                "skipped": self.skipped,
+            }
+
+
 class LobbyManager:
+    STATS_WINDOW_MINUTES = 60
+    ADMIN_SORT_KEYS: Dict[str, Callable[[LobbySummary], object]] = {
+        "code": lambda summary: summary.code,
+        "status": lambda summary: summary.status,
+        "players": lambda summary: summary.player_count,
+        "round": lambda summary: summary.round_number,
+        "idle": lambda summary: -summary.last_activity,
+        "created": lambda summary: summary.created_at,
+    }
+    BROWSE_SORTS = ("fill", "age")
+
     def __init__(self) -> None:
         self._lock = threading.Lock()
         self._lobbies: Dict[str, GameState] = {}
+        self._listeners: List[Callable[[GameState], None]] = []
+        self._chat_listeners: List[Callable[[GameState], None]] = []
+        # Operator aggregates, folded in from lobby change notifications so
+        # reading them never touches a GameState lock.
+        self._stats_lock = threading.Lock()
+        self._summaries: Dict[str, LobbySummary] = {}
+        self._status_counts: Counter = Counter()
+        self._players_online = 0
+        self._games_started = 0
+        self._games_ended = 0
+        self._end_reasons: Counter = Counter()
+        self._minutes: Deque[List[int]] = deque(maxlen=self.STATS_WINDOW_MINUTES)
+        # Public browser index: joinable lobbies only, one sorted key list per
+        # order, updated from _observe. The version feeds the ETag.
+        self._browse_entries: Dict[str, Tuple[Dict[str, Tuple[float, float, str]], Tuple[object, ...]]] = {}
+        self._browse_sorted: Dict[str, List[Tuple[float, float, str]]] = {sort: [] for sort in self.BROWSE_SORTS}
+        self._browse_version = 0
+        # Bumped on every summary change; the admin list re-sorts only when it moved.
+        self._summaries_generation = 0
+        self._admin_sorted: Dict[Tuple[str, bool], Tuple[int, List[LobbySummary]]] = {}
+        self.codes = LobbyCodeAllocator()
+
+    def add_listener(self, listener: Callable[[GameState], None]) -> None:
+        """Subscribe to state changes of every current and future lobby."""
+        with self._lock:
+            self._listeners.append(listener)
+            lobbies = list(self._lobbies.values())
+        for lobby in lobbies:
+            lobby.add_listener(listener)
 
-    def _generate_code(self) -> str:
-        alphabet = string.ascii_uppercase + string.digits
-        return "".join(random.choices(alphabet, k=5))
+    def add_chat_listener(self, listener: Callable[[GameState], None]) -> None:
+        """Subscribe to new meeting chat messages of every current and future lobby."""
+        with self._lock:
+            self._chat_listeners.append(listener)
+            lobbies = list(self._lobbies.values())
+        for lobby in lobbies:
+            lobby.add_chat_listener(listener)
 
     def create_lobby(self, host_name: str) -> Tuple[GameState, Player]:
+        # Allocated before taking the registry lock; the allocator never hands
+        # out a code that is registered or in quarantine.
+        code = self.codes.allocate(self._lobbies.__contains__)
+        lobby = GameState(code=code)
         with self._lock:
-            while True:
-                code = self._generate_code()
-                if code not in self._lobbies:
-                    lobby = GameState(code=code)
-                    self._lobbies[code] = lobby
-                    break
-        player = lobby.add_player(host_name)
+            lobby._listeners.append(self._observe)
+            lobby._listeners.extend(self._listeners)
+            lobby._chat_listeners.extend(self._chat_listeners)
+            self._lobbies[code] = lobby
+            with self._stats_lock:
+                self._summaries_generation += 1
+                self._summaries[code] = LobbySummary(
+                    code=code, created_at=lobby.created_at, last_activity=lobby.created_at
+                )
+                self._status_counts["lobby"] += 1
+            # Host added before the manager lock drops, so the new lobby is
+            # never visible (or discardable) while empty.
+            player = lobby.add_player(host_name)
         return lobby, player
 
     def get_lobby(self, code: str) -> Optional[GameState]:
@@ -1435,11 +2868,9 @@ class LobbyManager:
         lobby = self.get_lobby(code)
         if not lobby:
             return None, None, "Lobby nao encontrado."
-        if lobby.status != "lobby":
-            return None, None, "O jogo ja comecou. Aguarda terminar para entrar."
-        if lobby.has_player_named(name):
-            return None, None, "Esse nome ja esta em uso neste lobby."
-        player = lobby.add_player(name)
+        player, error = lobby.join(name)
+        if error:
+            return None, None, error
         return lobby, player, None
 
     def remove_player(self, code: str, player_id: str) -> bool:
@@ -1448,24 +2879,253 @@ class LobbyManager:
             return False
         removed = lobby.remove_player(player_id)
         if removed:
-            self._cleanup_if_empty(lobby)
+            self.discard_if_empty(lobby)
         return removed
 
     def discard_lobby(self, code: str) -> None:
         if not code:
             return
+        # Closed while still registered (manager lock, then lobby lock), so a
+        # concurrent join either lands first or sees the lobby closed.
+        with self._lock:
+            lobby = self._lobbies.pop(code.upper(), None)
+            if lobby is not None:
+                lobby.close()
+        if lobby is not None:
+            self._forget_summary(lobby)
+            self.codes.release(lobby.code)
+
+    def discard_if_empty(self, lobby: GameState) -> bool:
         with self._lock:
-            self._lobbies.pop(code.upper(), None)
+            if self._lobbies.get(lobby.code) is not lobby or not lobby.close(only_if_empty=True):
+                return False
+            self._lobbies.pop(lobby.code)
+        self._forget_summary(lobby)
+        self.codes.release(lobby.code)
+        return True
+
+    def _forget_summary(self, lobby: GameState) -> None:
+        with self._stats_lock:
+            summary = self._summaries.get(lobby.code)
+            if summary is not None and summary.created_at == lobby.created_at:
+                self._summaries.pop(lobby.code)
+                self._summaries_generation += 1
+                self._status_counts[summary.status] -= 1
+                self._players_online -= summary.player_count
+                self._unindex_browse_locked(lobby.code)
+
+    def _observe(self, lobby: GameState) -> None:
+        """Fold a lobby change into the operator aggregates (runs under the lobby lock)."""
+        status = lobby.status
+        player_count = len(lobby.players) - lobby._left_count
+        leader = lobby.players.get(lobby.leader_id) if lobby.leader_id else None
+        capacity = lobby._capacity_unlocked()
+        meeting = None
+        if lobby.meeting:
+            meeting = {"type": lobby.meeting.get("type", "reported"), "endsAt": int(lobby.meeting["ends_at"])}
+        now = time.time()
+        with self._stats_lock:
+            summary = self._summaries.get(lobby.code)
+            if summary is None or summary.created_at != lobby.created_at:
+                return
+            self._summaries_generation += 1
+            if status != summary.status:
+                self._status_counts[summary.status] -= 1
+                self._status_counts[status] += 1
+                if summary.status == "lobby" and status == "in_game":
+                    self._games_started += 1
+                    self._count_minute_locked(now, 1, 0)
+                elif status == "ended":
+                    self._games_ended += 1
+                    self._count_minute_locked(now, 0, 1)
+                    reason = lobby.end_info.get("reason") if lobby.end_info else None
+                    self._end_reasons[reason or "unknown"] += 1
+            self._players_online += player_count - summary.player_count
+            summary.status = status
+            summary.player_count = player_count
+            summary.round_number = lobby.round_number
+            summary.meeting = meeting
+            summary.last_activity = now
+            summary.capacity = capacity
+            summary.leader_name = leader.name if leader else None
+            self._index_browse_locked(summary)
+
+    def _index_browse_locked(self, summary: LobbySummary) -> None:
+        joinable = summary.status == "lobby" and 0 < summary.player_count < summary.capacity
+        if not joinable:
+            self._unindex_browse_locked(summary.code)
+            return
+        keys = summary.browse_keys()
+        fields = (summary.player_count, summary.capacity, summary.leader_name)
+        previous = self._browse_entries.get(summary.code)
+        if previous is not None:
+            if previous[1] == fields and previous[0] == keys:
+                return
+            self._unindex_browse_locked(summary.code)
+        for sort, key in keys.items():
+            bisect.insort(self._browse_sorted[sort], key)
+        self._browse_entries[summary.code] = (keys, fields)
+        self._browse_version += 1
+
+    def _unindex_browse_locked(self, code: str) -> None:
+        entry = self._browse_entries.pop(code, None)
+        if entry is None:
+            return
+        for sort, key in entry[0].items():
+            keys = self._browse_sorted[sort]
+            index = bisect.bisect_left(keys, key)
+            if index < len(keys) and keys[index] == key:
+                keys.pop(index)
+        self._browse_version += 1
+
+    def browse_version(self) -> int:
+        with self._stats_lock:
+            return self._browse_version
+
+    def browse_lobbies(self, sort: str = "fill", cursor: Optional[str] = None, limit: int = 20) -> Dict[str, object]:
+        """One page of joinable lobbies from the browser index.
+
+        The cursor is the sort key of the last lobby returned, so pages stay
+        consistent while lobbies fill up or close between requests.
+        """
+        if sort not in self.BROWSE_SORTS:
+            return {"ok": False, "error": "Ordenacao invalida."}
+        after: Optional[Tuple[float, float, str]] = None
+        if cursor:
+            try:
+                primary, secondary, code = cursor.split("_", 2)
+                after = (float(primary), float(secondary), code)
+                if not code.isalnum():
+                    raise ValueError(code)
+            except ValueError:
+                return {"ok": False, "error": "Cursor invalido."}
+        limit = max(1, min(limit, 100))
+        with self._stats_lock:
+            keys = self._browse_sorted[sort]
+            start = bisect.bisect_right(keys, after) if after else 0
+            page = keys[start:start + limit]
+            items = [self._summaries[key[2]].browse_payload() for key in page]
+            has_more = start + limit < len(keys)
+            total = len(keys)
+            version = self._browse_version
+        next_cursor = None
+        if has_more and page:
+            primary, secondary, code = page[-1]
+            next_cursor = f"{primary!r}_{secondary!r}_{code}"
+        return {"ok": True, "items": items, "total": total, "nextCursor": next_cursor, "version": version}
+
+    def _count_minute_locked(self, now: float, started: int, ended: int) -> None:
+        minute = int(now // 60)
+        if not self._minutes or self._minutes[-1][0] != minute:
+            self._minutes.append([minute, 0, 0])
+        self._minutes[-1][1] += started
+        self._minutes[-1][2] += ended
+
+    def admin_stats(self) -> Dict[str, object]:
+        now = time.time()
+        current = int(now // 60)
+        with self._stats_lock:
+            recent = [bucket for bucket in self._minutes if current - bucket[0] < self.STATS_WINDOW_MINUTES]
+            last_minute = recent[-1] if recent and recent[-1][0] == current else [current, 0, 0]
+            return {
+                "lobbies": len(self._summaries),
+                "lobbiesByStatus": {status: count for status, count in self._status_counts.items() if count},
+                "playersOnline": self._players_online,
+                "gamesStarted": self._games_started,
+                "gamesEnded": self._games_ended,
+                "startedThisMinute": last_minute[1],
+                "endedThisMinute": last_minute[2],
+                "perMinute": [
+                    {"minute": minute * 60, "started": started, "ended": ended}
+                    for minute, started, ended in recent
+                ],
+                "endReasons": dict(self._end_reasons),
+                "codes": self.codes.stats(),
+            }
 
-    def _cleanup_if_empty(self, lobby: GameState) -> None:
-        if lobby.is_empty():
-            self.discard_lobby(lobby.code)
+    def admin_lobbies(
+        self, sort: str = "idle", descending: bool = False, cursor: int = 0, limit: int = 50
+    ) -> Dict[str, object]:
+        key = self.ADMIN_SORT_KEYS.get(sort)
+        if key is None:
+            return {"ok": False, "error": "Ordenacao invalida."}
+        cursor = max(0, cursor)
+        limit = max(1, min(limit, 200))
+        with self._stats_lock:
+            generation = self._summaries_generation
+            cached = self._admin_sorted.get((sort, descending))
+            ordered = cached[1] if cached is not None and cached[0] == generation else None
+            if ordered is None:
+                summaries = list(self._summaries.values())
+        if ordered is None:
+            # Sorted outside the stats lock, which _observe takes under lobby locks.
+            ordered = sorted(summaries, key=key, reverse=descending)
+        now = time.time()
+        with self._stats_lock:
+            self._admin_sorted[(sort, descending)] = (generation, ordered)
+            page = [summary.payload(now) for summary in ordered[cursor:cursor + limit]]
+        next_cursor = cursor + limit if cursor + limit < len(ordered) else None
+        return {"ok": True, "items": page, "total": len(ordered), "nextCursor": next_cursor}
+
+    def memory_stats(self, sample: int = 500, top: int = 10) -> Dict[str, object]:
+        """Deep size of up to ``sample`` random lobbies, extrapolated to all of them."""
+        started = time.perf_counter()
+        with self._lock:
+            lobbies = list(self._lobbies.values())
+        measured = random.sample(lobbies, sample) if len(lobbies) > sample else lobbies
+        totals: Counter = Counter()
+        players = 0
+        rows: List[Dict[str, object]] = []
+        for lobby in measured:
+            usage = lobby.memory_usage()
+            totals.update(usage["components"])
+            players += usage["players"]
+            rows.append({"code": lobby.code, "players": usage["players"], "bytes": usage["bytes"]})
+        rows.sort(key=lambda row: row["bytes"], reverse=True)
+        measured_bytes = sum(totals.values())
+        scale = len(lobbies) / len(measured) if measured else 0.0
+        return {
+            "lobbies": len(lobbies),
+            "measured": len(measured),
+            "estimatedBytes": int(measured_bytes * scale),
+            "bytesPerLobby": measured_bytes // len(measured) if measured else None,
+            "bytesPerPlayer": (totals["players"] + totals["tasks"]) // players if players else None,
+            "components": {name: int(value * scale) for name, value in totals.items()},
+            "largest": rows[:max(0, top)],
+            "elapsedMs": round((time.perf_counter() - started) * 1000, 1),
+        }
 
 
 app = Flask(__name__)
 app.secret_key = "among-us-irl-demo"  # replace with environment secret in production
 
 lobby_manager = LobbyManager()
+# Set by server.py when the realtime server (WebSocket + spectator SSE) is running.
+app.config["WS_PORT"] = None
+# Operator dashboard (/admin) is disabled unless ADMIN_TOKEN is set.
+app.config["ADMIN_TOKEN"] = os.environ.get("ADMIN_TOKEN")
+# Public origin of the realtime server when it sits behind a proxy, e.g. https://rt.example.com
+app.config["REALTIME_PUBLIC_URL"] = os.environ.get("REALTIME_PUBLIC_URL")
+if os.environ.get("HISTORY_DB"):
+    enable_history(os.environ["HISTORY_DB"])
+
+compressed_bodies = CompressedBodyCache()
+stack_profiler = profiler.SamplingProfiler()
+tracemalloc_session = memory.TracemallocSession()
+admission = AdmissionController()
+# Player API paths under admission control; spectators, operators and clock sync are not limited here.
+ADMISSION_EXEMPT_PREFIXES = ("/api/admin/", "/api/spectate/", "/api/lobbies", "/api/time")
+COMPRESS_MIN_BYTES = 1024
+# Built files carry their content hash in the name, so they never change under one URL.
+BUILT_ASSET_PREFIX = "/static/" + assets.BUILD_DIR + "/"
+BUILT_ASSET_MAX_AGE = 365 * 24 * 3600
+# Pages the service worker answers from its cache; their scripts fix any stale state.
+SERVICE_WORKER_SHELL = ("/lobby", "/game")
+COMPRESSIBLE_MIMETYPES = {"application/json", wire.MIMETYPE}
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_KEY_MAX_LENGTH = 128
+IDEMPOTENCY_WAIT_SECONDS = 5.0
 
 
 def _clear_session() -> None:
@@ -1489,6 +3149,52 @@ def _current_context(require_player: bool = True) -> Tuple[Optional[GameState],
     return lobby, player
 
 
+def _realtime_origin() -> Optional[str]:
+    # Nothing to advertise unless server.py actually started the channel.
+    port = app.config["WS_PORT"]
+    if not port:
+        return None
+    if app.config["REALTIME_PUBLIC_URL"]:
+        return app.config["REALTIME_PUBLIC_URL"].rstrip("/")
+    return f"{request.scheme}://{request.host.rsplit(':', 1)[0]}:{port}"
+
+
+def _websocket_url() -> Optional[str]:
+    origin = _realtime_origin()
+    if not origin:
+        return None
+    return "ws" + origin[len("http"):] + "/ws"
+
+
+def _spectator_events_url(code: str) -> Optional[str]:
+    origin = _realtime_origin()
+    if not origin:
+        return None
+    return f"{origin}/spectate/{code}/events"
+
+
+def _admin_fingerprint() -> Optional[str]:
+    # Stored in the session instead of a flag, so a forged cookie needs the token.
+    token = app.config["ADMIN_TOKEN"]
+    if not token:
+        return None
+    return hashlib.sha256(f"admin:{token}".encode("utf-8")).hexdigest()
+
+
+def _admin_authorized() -> bool:
+    fingerprint = _admin_fingerprint()
+    if not fingerprint:
+        return False
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        return hmac.compare_digest(header[len("Bearer "):].strip(), app.config["ADMIN_TOKEN"])
+    return hmac.compare_digest(session.get("admin") or "", fingerprint)
+
+
+def _admin_denied():
+    return jsonify({"ok": False, "error": "Acesso reservado a operadores."}), 401
+
+
 def _leave_current_lobby() -> None:
     lobby, player = _current_context(require_player=False)
     if lobby and player:
@@ -1496,6 +3202,136 @@ def _leave_current_lobby() -> None:
     _clear_session()
 
 
+def _action_response(
+    lobby_obj: GameState, player: Player, run: Callable[[], Dict[str, object]]
+):
+    key = (request.headers.get(IDEMPOTENCY_HEADER) or "").strip()
+    if not key:
+        result = run()
+        status_code = 200 if result.get("ok") else 400
+        return jsonify(result), status_code
+    if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        return jsonify({"ok": False, "error": "Idempotency-Key invalida."}), 400
+
+    scope = (player.player_id, request.path, key)
+    cache = lobby_obj.idempotency
+    entry, owner = cache.claim(scope)
+    if not owner:
+        entry.done.wait(IDEMPOTENCY_WAIT_SECONDS)
+        if entry.body is None:
+            return jsonify({"ok": False, "error": "Pedido em curso. Tenta de novo."}), 409
+        response = jsonify(entry.body)
+        response.headers["Idempotent-Replayed"] = "true"
+        return response, entry.status_code
+
+    try:
+        result = run()
+    except Exception:
+        cache.abandon(scope, entry)
+        raise
+    status_code = 200 if result.get("ok") else 400
+    cache.complete(entry, status_code, result)
+    return jsonify(result), status_code
+
+
+@app.before_request
+def _tag_profiled_request():
+    if not stack_profiler.active or request.url_rule is None:
+        return
+    code = (request.view_args or {}).get("code") or session.get("lobby_code")
+    stack_profiler.tag(f"{request.method} {request.url_rule.rule}", code.upper() if code else None)
+
+
+@app.teardown_request
+def _untag_profiled_request(_error):
+    stack_profiler.untag()
+
+
+@app.before_request
+def _admit_player_request():
+    if not request.path.startswith("/api/") or request.path.startswith(ADMISSION_EXEMPT_PREFIXES):
+        return None
+    lobby_obj = lobby_manager.get_lobby(session.get("lobby_code"))
+    if lobby_obj is None:
+        return None
+    session_key = session.get("player_id") or f"addr:{request.remote_addr}"
+    route = request.url_rule.rule if request.url_rule else request.path
+    reason, retry_after = admission.admit(session_key, lobby_obj, route)
+    if reason:
+        response = jsonify(
+            {
+                "ok": False,
+                "error": "Demasiados pedidos. Tenta novamente dentro de momentos.",
+                "retryAfterMs": int(retry_after * 1000),
+            }
+        )
+        response.status_code = 429
+        response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+        return response
+    g.admission_gate = lobby_obj.request_gate
+    return None
+
+
+@app.teardown_request
+def _release_admission_gate(_error):
+    gate = g.pop("admission_gate", None)
+    if gate is not None:
+        gate.release()
+
+
+@app.after_request
+def _compress_response(response):
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = request.accept_encodings.best_match(["gzip", "deflate"])
+    if not encoding:
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    scope = g.get("compress_scope")
+    if scope:
+        compressed = compressed_bodies.get_or_compress(scope[0], scope[1], encoding, body)
+    else:
+        compressed = compress_body(body, encoding)
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+@app.after_request
+def _cache_built_assets(response):
+    if request.path.startswith(BUILT_ASSET_PREFIX) and response.status_code in {200, 304}:
+        response.headers["Cache-Control"] = f"public, max-age={BUILT_ASSET_MAX_AGE}, immutable"
+    return response
+
+
+@app.context_processor
+def _asset_helpers():
+    return {"asset_url": ASSETS.url, "service_worker": ASSETS.built}
+
+
+@app.route("/sw.js", methods=["GET"])
+def service_worker():
+    # Unregisters clients of an earlier build when the app now runs unbuilt.
+    if not ASSETS.built:
+        return Response("", status=404, mimetype="text/javascript")
+    response = Response(
+        render_template(
+            "sw.js", version=ASSETS.version, precache=ASSETS.precache(), shell=list(SERVICE_WORKER_SHELL)
+        ),
+        mimetype="text/javascript",
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
 @app.route("/", methods=["GET"])
 def index():
     lobby_obj, player = _current_context(require_player=False)
@@ -1587,7 +3423,52 @@ def game():
         return redirect(url_for("index"))
     if lobby_obj.status not in {"in_game", "meeting", "ended"}:
         return redirect(url_for("lobby"))
-    return render_template("game.html")
+    return render_template("game.html", ws_url=_websocket_url())
+
+
+@app.route("/spectate", methods=["GET"])
+def spectate_form():
+    code = (request.args.get("code") or "").strip().upper()
+    if not code:
+        return redirect(url_for("index"))
+    return redirect(url_for("spectate", code=code))
+
+
+@app.route("/spectate/<code>", methods=["GET"])
+def spectate(code: str):
+    lobby_obj = lobby_manager.get_lobby(code)
+    if not lobby_obj:
+        return render_template("index.html", spectate_error="Lobby nao encontrado.", spectate_code=code)
+    return render_template(
+        "spectate.html",
+        lobby_code=lobby_obj.code,
+        events_url=_spectator_events_url(lobby_obj.code),
+    )
+
+
+@app.route("/admin", methods=["GET"])
+def admin():
+    if not app.config["ADMIN_TOKEN"]:
+        return redirect(url_for("index"))
+    return render_template("admin.html", authorized=_admin_authorized())
+
+
+@app.route("/admin/login", methods=["POST"])
+def admin_login():
+    token = request.form.get("token") or ""
+    expected = app.config["ADMIN_TOKEN"]
+    if not expected:
+        return redirect(url_for("index"))
+    if not hmac.compare_digest(token, expected):
+        return render_template("admin.html", authorized=False, login_error="Token invalido."), 401
+    session["admin"] = _admin_fingerprint()
+    return redirect(url_for("admin"))
+
+
+@app.route("/admin/logout", methods=["POST"])
+def admin_logout():
+    session.pop("admin", None)
+    return redirect(url_for("admin"))
 
 
 @app.route("/leave", methods=["POST"])
@@ -1602,8 +3483,164 @@ def api_state():
     if not lobby_obj:
         return jsonify({"ok": False, "error": "Lobby nao encontrado."}), 404
     player_id = player.player_id if player else ""
-    snapshot = lobby_obj.lobby_snapshot(player_id)
-    return jsonify(snapshot)
+    return jsonify(lobby_obj.lobby_snapshot(player_id))
+
+
+@app.route("/api/spectate/<code>", methods=["GET"])
+def api_spectate(code: str):
+    lobby_obj = lobby_manager.get_lobby(code)
+    if not lobby_obj:
+        return jsonify({"ok": False, "error": "Lobby nao encontrado."}), 404
+    version, body = lobby_obj.spectator_view()
+    g.compress_scope = (lobby_obj.code, version)
+    response = Response(body, mimetype="application/json")
+    response.set_etag(f"{lobby_obj.code}-{int(lobby_obj.created_at * 1000)}-{version}", weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Server-Time"] = f"{time.time():.3f}"
+    return response.make_conditional(request)
+
+
+@app.route("/api/lobbies", methods=["GET"])
+def api_browse_lobbies():
+    sort = request.args.get("sort", "fill")
+    cursor = request.args.get("cursor") or None
+    limit = request.args.get("limit", 20, type=int)
+    # Checked before building the page: most browsing phones are revalidating.
+    etag = f"browse-{lobby_manager.browse_version()}-{sort}-{cursor or ''}-{limit}"
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+    result = lobby_manager.browse_lobbies(sort=sort, cursor=cursor, limit=limit)
+    if not result.get("ok"):
+        return jsonify(result), 400
+    response = jsonify(result)
+    response.set_etag(f"browse-{result['version']}-{sort}-{cursor or ''}-{limit}", weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@app.route("/api/admin/stats", methods=["GET"])
+def api_admin_stats():
+    if not _admin_authorized():
+        return _admin_denied()
+    return jsonify({"ok": True, **lobby_manager.admin_stats(), "admission": admission.stats()})
+
+
+@app.route("/api/admin/tasks", methods=["GET"])
+def api_admin_tasks():
+    if not _admin_authorized():
+        return _admin_denied()
+    return jsonify({"ok": True, **task_timings.stats()})
+
+
+@app.route("/api/admin/history", methods=["GET"])
+def api_admin_history():
+    if not _admin_authorized():
+        return _admin_denied()
+    if history_store is None:
+        return jsonify({"ok": False, "error": "Historico de jogos desativado."}), 404
+    return jsonify({"ok": True, **history_store.analytics()})
+
+
+@app.route("/api/admin/profile", methods=["GET"])
+def api_admin_profile():
+    if not _admin_authorized():
+        return _admin_denied()
+    return jsonify({"ok": True, **stack_profiler.status()})
+
+
+@app.route("/api/admin/profile/start", methods=["POST"])
+def api_admin_profile_start():
+    if not _admin_authorized():
+        return _admin_denied()
+    data = request.get_json(silent=True) or request.form
+    try:
+        duration = float(data.get("duration", 30))
+        interval_ms = float(data.get("intervalMs", 10))
+    except (TypeError, ValueError):
+        return jsonify({"ok": False, "error": "Duracao ou intervalo invalidos."}), 400
+    reset = str(data.get("reset", "true")).lower() not in {"0", "false", "no"}
+    result = stack_profiler.start(duration, interval_ms / 1000, reset=reset)
+    status_code = 200 if result.get("ok") else 409
+    return jsonify(result), status_code
+
+
+@app.route("/api/admin/profile/stop", methods=["POST"])
+def api_admin_profile_stop():
+    if not _admin_authorized():
+        return _admin_denied()
+    return jsonify(stack_profiler.stop())
+
+
+@app.route("/api/admin/profile/folded", methods=["GET"])
+def api_admin_profile_folded():
+    if not _admin_authorized():
+        return _admin_denied()
+    response = Response(stack_profiler.folded(), mimetype="text/plain")
+    response.headers["Content-Disposition"] = "inline; filename=profile.folded"
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+@app.route("/api/admin/memory", methods=["GET"])
+def api_admin_memory():
+    if not _admin_authorized():
+        return _admin_denied()
+    lobbies = lobby_manager.memory_stats(
+        sample=max(1, request.args.get("sample", 500, type=int)),
+        top=request.args.get("top", 10, type=int),
+    )
+    return jsonify({"ok": True, "process": memory.process_memory(), **lobbies})
+
+
+@app.route("/api/admin/memory/tracemalloc/<action>", methods=["POST"])
+def api_admin_tracemalloc(action: str):
+    if not _admin_authorized():
+        return _admin_denied()
+    if action == "start":
+        data = request.get_json(silent=True) or request.form
+        try:
+            frames = int(data.get("frames", 1))
+        except (TypeError, ValueError):
+            return jsonify({"ok": False, "error": "Numero de frames invalido."}), 400
+        result = tracemalloc_session.start(frames=frames)
+    elif action == "mark":
+        result = tracemalloc_session.mark()
+    elif action == "stop":
+        result = tracemalloc_session.stop()
+    else:
+        return jsonify({"ok": False, "error": "Acao desconhecida."}), 404
+    status_code = 200 if result.get("ok") else 409
+    return jsonify(result), status_code
+
+
+@app.route("/api/admin/memory/tracemalloc/diff", methods=["GET"])
+def api_admin_tracemalloc_diff():
+    if not _admin_authorized():
+        return _admin_denied()
+    result = tracemalloc_session.diff(
+        group=request.args.get("group", "lineno"),
+        limit=request.args.get("limit", 20, type=int),
+        rebase=request.args.get("rebase") in {"1", "true"},
+    )
+    status_code = 200 if result.get("ok") else 409
+    return jsonify(result), status_code
+
+
+@app.route("/api/admin/lobbies", methods=["GET"])
+def api_admin_lobbies():
+    if not _admin_authorized():
+        return _admin_denied()
+    result = lobby_manager.admin_lobbies(
+        sort=request.args.get("sort", "idle"),
+        descending=request.args.get("order") == "desc",
+        cursor=request.args.get("cursor", 0, type=int),
+        limit=request.args.get("limit", 50, type=int),
+    )
+    status_code = 200 if result.get("ok") else 400
+    return jsonify(result), status_code
 
 
 @app.route("/api/player", methods=["GET"])
@@ -1613,7 +3650,63 @@ def api_player():
         _clear_session()
         return jsonify({"ok": False, "error": "Sessao expirada. Volta ao lobby."}), 404
     payload = lobby_obj.player_view(player.player_id)
-    return jsonify(payload)
+    if request.accept_mimetypes.best_match(["application/json", wire.MIMETYPE]) == wire.MIMETYPE:
+        body = lobby_obj.wire_strings.encode(
+            player.player_id,
+            payload,
+            request.args.get("table", ""),
+            request.args.get("known", 0, type=int),
+        )
+        response = Response(body, mimetype=wire.MIMETYPE)
+    else:
+        response = jsonify(payload)
+    response.vary.add("Accept")
+    return response
+
+
+@app.route("/api/players", methods=["GET"])
+def api_players():
+    lobby_obj, player = _current_context()
+    if not lobby_obj or not player:
+        return jsonify({"ok": False, "error": "Sessao expirada. Volta ao lobby."}), 404
+    kind = request.args.get("kind", "")
+    cursor = request.args.get("cursor", 0, type=int)
+    query = (request.args.get("q") or "")[:30]
+    result = lobby_obj.player_list(player.player_id, kind, cursor, query)
+    status_code = 200 if result.get("ok") else 400
+    return jsonify(result), status_code
+
+
+@app.route("/api/time", methods=["GET"])
+def api_time():
+    # Clock samples for the client's offset estimate; deadlines in views are server epoch seconds.
+    response = jsonify({"ok": True, "serverTime": time.time()})
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+@app.route("/api/poll/stats", methods=["GET"])
+def api_poll_stats():
+    lobby_obj, player = _current_context()
+    if not lobby_obj or not player:
+        return jsonify({"ok": False, "error": "Sessao expirada. Volta ao lobby."}), 404
+    return jsonify({"ok": True, **lobby_obj.poll_stats()})
+
+
+@app.route("/api/idempotency/stats", methods=["GET"])
+def api_idempotency_stats():
+    lobby_obj, player = _current_context()
+    if not lobby_obj or not player:
+        return jsonify({"ok": False, "error": "Sessao expirada. Volta ao lobby."}), 404
+    return jsonify({"ok": True, "code": lobby_obj.code, **lobby_obj.idempotency.stats()})
+
+
+@app.route("/api/compression/stats", methods=["GET"])
+def api_compression_stats():
+    lobby_obj, player = _current_context()
+    if not lobby_obj or not player:
+        return jsonify({"ok": False, "error": "Sessao expirada. Volta ao lobby."}), 404
+    return jsonify({"ok": True, **compressed_bodies.stats()})
 
 
 @app.route("/api/tasks/complete", methods=["POST"])
@@ -1624,9 +3717,9 @@ def api_tasks_complete():
     data = request.get_json(silent=True) or {}
     task_id = data.get("taskId", "")
     done = bool(data.get("done", True))
-    result = lobby_obj.mark_task(player.player_id, task_id, done)
-    status_code = 200 if result.get("ok") else 400
-    return jsonify(result), status_code
+    return _action_response(
+        lobby_obj, player, lambda: lobby_obj.mark_task(player.player_id, task_id, done)
+    )
 
 
 @app.route("/api/medic/vitals", methods=["POST"])
@@ -1634,9 +3727,9 @@ def api_medic_vitals():
     lobby_obj, player = _current_context()
     if not lobby_obj or not player:
         return jsonify({"ok": False, "error": "Sessao expirada. Volta ao lobby."}), 404
-    result = lobby_obj.medic_activate_vitals(player.player_id)
-    status_code = 200 if result.get("ok") else 400
-    return jsonify(result), status_code
+    return _action_response(
+        lobby_obj, player, lambda: lobby_obj.medic_activate_vitals(player.player_id)
+    )
 
 
 @app.route("/api/report", methods=["POST"])
@@ -1646,9 +3739,9 @@ def api_report():
         return jsonify({"ok": False, "error": "Sessao expirada. Volta ao lobby."}), 404
     data = request.get_json(silent=True) or {}
     body_id = data.get("bodyId") or data.get("body_id")
-    result = lobby_obj.start_meeting(player.player_id, body_id)
-    status_code = 200 if result.get("ok") else 400
-    return jsonify(result), status_code
+    return _action_response(
+        lobby_obj, player, lambda: lobby_obj.start_meeting(player.player_id, body_id)
+    )
 
 
 @app.route("/api/meeting/emergency", methods=["POST"])
@@ -1656,9 +3749,9 @@ def api_meeting_emergency():
     lobby_obj, player = _current_context()
     if not lobby_obj or not player:
         return jsonify({"ok": False, "error": "Sessao expirada. Volta ao lobby."}), 404
-    result = lobby_obj.call_emergency_meeting(player.player_id)
-    status_code = 200 if result.get("ok") else 400
-    return jsonify(result), status_code
+    return _action_response(
+        lobby_obj, player, lambda: lobby_obj.call_emergency_meeting(player.player_id)
+    )
 
 
 @app.route("/api/meeting/vote", methods=["POST"])
@@ -1669,11 +3762,63 @@ def api_meeting_vote():
     data = request.get_json(silent=True) or {}
     target = data.get("target")
     vote_target = GameState.SKIP_VOTE if target == GameState.SKIP_VOTE else target
-    result = lobby_obj.cast_vote(player.player_id, vote_target)
+    return _action_response(
+        lobby_obj, player, lambda: lobby_obj.cast_vote(player.player_id, vote_target)
+    )
+
+
+@app.route("/api/game/summary", methods=["GET"])
+def api_game_summary():
+    lobby_obj, player = _current_context()
+    if not lobby_obj or not player:
+        return jsonify({"ok": False, "error": "Sessao expirada. Volta ao lobby."}), 404
+    summary = lobby_obj.game_summary()
+    if summary is None:
+        return jsonify({"ok": False, "error": "Ainda nao ha resumo de jogo."}), 404
+    game_id, body = summary
+    response = Response(body, mimetype="application/json")
+    response.set_etag(game_id)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response.make_conditional(request)
+
+
+@app.route("/api/meeting/chat", methods=["GET"])
+def api_meeting_chat():
+    lobby_obj, player = _current_context()
+    if not lobby_obj or not player:
+        return jsonify({"ok": False, "error": "Sessao expirada. Volta ao lobby."}), 404
+    after = request.args.get("after", 0, type=int)
+    result = lobby_obj.chat_since(player.player_id, after)
     status_code = 200 if result.get("ok") else 400
     return jsonify(result), status_code
 
 
+@app.route("/api/meeting/chat", methods=["POST"])
+def api_meeting_chat_post():
+    lobby_obj, player = _current_context()
+    if not lobby_obj or not player:
+        return jsonify({"ok": False, "error": "Sessao expirada. Volta ao lobby."}), 404
+    data = request.get_json(silent=True) or {}
+    text = str(data.get("text") or "")
+    return _action_response(lobby_obj, player, lambda: lobby_obj.post_chat(player.player_id, text))
+
+
+@app.route("/api/batch", methods=["POST"])
+def api_batch():
+    lobby_obj, player = _current_context()
+    if not lobby_obj or not player:
+        return jsonify({"ok": False, "error": "Sessao expirada. Volta ao lobby."}), 404
+    data = request.get_json(silent=True) or {}
+    actions = data.get("actions")
+    if not isinstance(actions, list) or not actions:
+        return jsonify({"ok": False, "error": "Indica as acoes a executar."}), 400
+    if len(actions) > GameState.BATCH_MAX_ACTIONS:
+        return jsonify({"ok": False, "error": "Demasiadas acoes num so pedido."}), 400
+    return _action_response(
+        lobby_obj, player, lambda: lobby_obj.apply_batch(player.player_id, actions)
+    )
+
+
 @app.route("/api/ready", methods=["POST"])
 def api_ready():
     lobby_obj, player = _current_context()
@@ -1705,9 +3850,9 @@ def api_impostor_kill():
         return jsonify({"ok": False, "error": "Sessao expirada. Volta ao lobby."}), 404
     data = request.get_json(silent=True) or {}
     target_id = data.get("targetId") or data.get("target_id")
-    result = lobby_obj.impostor_kill(player.player_id, target_id or "")
-    status_code = 200 if result.get("ok") else 400
-    return jsonify(result), status_code
+    return _action_response(
+        lobby_obj, player, lambda: lobby_obj.impostor_kill(player.player_id, target_id or "")
+    )
 
 
 @app.route("/api/impostor/sabotage", methods=["POST"])
@@ -1715,9 +3860,9 @@ def api_impostor_sabotage():
     lobby_obj, player = _current_context()
     if not lobby_obj or not player:
         return jsonify({"ok": False, "error": "Sessao expirada. Volta ao lobby."}), 404
-    result = lobby_obj.impostor_sabotage(player.player_id)
-    status_code = 200 if result.get("ok") else 400
-    return jsonify(result), status_code
+    return _action_response(
+        lobby_obj, player, lambda: lobby_obj.impostor_sabotage(player.player_id)
+    )
 
 
 @app.route("/api/reset", methods=["POST"])
@@ -1748,6 +3893,8 @@ def api_lobby_config():
             updates["killCooldown"] = int(data["killCooldown"])
         except (TypeError, ValueError):
             updates["killCooldown"] = data["killCooldown"]
+    if "largeLobby" in data:
+        updates["largeLobby"] = bool(data["largeLobby"])
     result = lobby_obj.update_config(player.player_id, updates)
     status_code = 200 if result.get("ok") else 400
     return jsonify(result), status_code
@@ -1764,8 +3911,8 @@ def api_lobby_kick():
         return jsonify({"ok": False, "error": "Jogador invalido."}), 400
     result = lobby_obj.kick_player(player.player_id, target_id)
     status_code = 200 if result.get("ok") else 400
-    if result.get("ok") and lobby_obj.is_empty():
-        lobby_manager.discard_lobby(lobby_obj.code)
+    if result.get("ok"):
+        lobby_manager.discard_if_empty(lobby_obj)
     return jsonify(result), status_code
 
 
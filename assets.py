@@ -0,0 +1,150 @@
+"""Static asset build: avatar sprite, fingerprinted files and the service worker cache list.
+
+    python assets.py
+
+The build writes ``static/build/``:
+
+- ``avatars.<hash>.svg`` stacks every avatar SVG in one file, with a ``<view>``
+  per avatar so ``<img src="avatars.<hash>.svg#avatar-red">`` shows just that
+  avatar. A reconnect fetches one sprite instead of one file per avatar.
+- A copy of every CSS/JS file whose name includes its content hash. The URL
+  changes whenever the content does, so these files are served as immutable.
+- ``manifest.json``, which maps source paths to built ones. Its ``version``
+  also covers the templates, so the service worker drops its cached pages
+  whenever anything the shell is made of changes.
+
+Without a build (e.g. in development) the app serves the source files as
+before and does not register the service worker.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional
+
+SVG_NS = "http://www.w3.org/2000/svg"
+BUILD_DIR = "build"
+MANIFEST = "manifest.json"
+AVATAR_DIR = os.path.join("img", "avatars")
+BUNDLED_DIRS = ("css", "js")
+HASH_LENGTH = 10
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+class Manifest:
+    """Maps source asset paths (relative to ``static/``) to the URLs pages should use."""
+
+    def __init__(self, data: Optional[Dict[str, object]] = None) -> None:
+        data = data or {}
+        self.version: Optional[str] = data.get("version")
+        self.files: Dict[str, str] = dict(data.get("files", {}))
+        self.avatars: Dict[str, str] = dict(data.get("avatars", {}))
+
+    @property
+    def built(self) -> bool:
+        return self.version is not None
+
+    def url(self, path: str) -> str:
+        return "/static/" + self.files.get(path, path)
+
+    def avatar(self, name: str) -> str:
+        built = self.avatars.get(name)
+        if built:
+            return "/static/" + built
+        return f"/static/{AVATAR_DIR.replace(os.sep, '/')}/{name}.svg"
+
+    def precache(self) -> List[str]:
+        """Every built URL, for the service worker to fetch at install time."""
+        urls = {"/static/" + path for path in self.files.values()}
+        urls.update("/static/" + path.split("#", 1)[0] for path in self.avatars.values())
+        return sorted(urls)
+
+
+def load_manifest(static_dir: str) -> Manifest:
+    try:
+        with open(os.path.join(static_dir, BUILD_DIR, MANIFEST), encoding="utf-8") as handle:
+            return Manifest(json.load(handle))
+    except (OSError, ValueError):
+        return Manifest()
+
+
+def build_sprite(svg_paths: List[str]) -> bytes:
+    """Stack the SVGs vertically, each addressable through a ``<view>`` named after its file."""
+    ET.register_namespace("", SVG_NS)
+    sprite = ET.Element(f"{{{SVG_NS}}}svg")
+    offset = 0.0
+    width = 0.0
+    for path in svg_paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        source = ET.parse(path).getroot()
+        view_box = source.get("viewBox") or f"0 0 {source.get('width', 64)} {source.get('height', 64)}"
+        _, _, box_width, box_height = (float(value) for value in view_box.replace(",", " ").split())
+        ET.SubElement(
+            sprite, f"{{{SVG_NS}}}view", id=name, viewBox=f"0 {offset:g} {box_width:g} {box_height:g}"
+        )
+        nested = ET.SubElement(
+            sprite,
+            f"{{{SVG_NS}}}svg",
+            y=f"{offset:g}",
+            width=f"{box_width:g}",
+            height=f"{box_height:g}",
+            viewBox=view_box,
+        )
+        nested.extend(list(source))
+        offset += box_height
+        width = max(width, box_width)
+    sprite.set("viewBox", f"0 0 {width:g} {offset:g}")
+    return ET.tostring(sprite, encoding="utf-8", xml_declaration=False)
+
+
+def build(static_dir: str, template_dir: str) -> Manifest:
+    build_dir = os.path.join(static_dir, BUILD_DIR)
+    shutil.rmtree(build_dir, ignore_errors=True)
+    os.makedirs(build_dir)
+    files: Dict[str, str] = {}
+    version = hashlib.sha256()
+
+    for folder in BUNDLED_DIRS:
+        for filename in sorted(os.listdir(os.path.join(static_dir, folder))):
+            with open(os.path.join(static_dir, folder, filename), "rb") as handle:
+                data = handle.read()
+            stem, ext = os.path.splitext(filename)
+            built = f"{stem}.{_digest(data)}{ext}"
+            with open(os.path.join(build_dir, built), "wb") as handle:
+                handle.write(data)
+            files[f"{folder}/{filename}"] = f"{BUILD_DIR}/{built}"
+            version.update(built.encode())
+
+    avatar_dir = os.path.join(static_dir, AVATAR_DIR)
+    svg_paths = [os.path.join(avatar_dir, name) for name in sorted(os.listdir(avatar_dir)) if name.endswith(".svg")]
+    sprite = build_sprite(svg_paths)
+    sprite_name = f"avatars.{_digest(sprite)}.svg"
+    with open(os.path.join(build_dir, sprite_name), "wb") as handle:
+        handle.write(sprite)
+    version.update(sprite_name.encode())
+    names = [os.path.splitext(os.path.basename(path))[0] for path in svg_paths]
+    avatars = {name: f"{BUILD_DIR}/{sprite_name}#{name}" for name in names}
+
+    for filename in sorted(os.listdir(template_dir)):
+        with open(os.path.join(template_dir, filename), "rb") as handle:
+            version.update(handle.read())
+
+    data = {"version": version.hexdigest()[:HASH_LENGTH], "files": files, "avatars": avatars}
+    with open(os.path.join(build_dir, MANIFEST), "w", encoding="utf-8") as handle:
+        json.dump(data, handle, indent=1, sort_keys=True)
+    return Manifest(data)
+
+
+def main() -> None:
+    root = os.path.dirname(os.path.abspath(__file__))
+    manifest = build(os.path.join(root, "static"), os.path.join(root, "templates"))
+    print(f"build {manifest.version}: {len(manifest.files)} files, {len(manifest.avatars)} avatars in one sprite")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Lobby code allocation at millions of codes: speed, uniqueness and reuse.
+
+    python -m bench.codes [--codes 2000000] [--live 50000] [--rate 100]
+
+Both allocators run the same churn: ``--codes`` lobbies are created at
+``--rate`` per (virtual) second and each is discarded once ``--live`` newer
+ones exist. The same loop drives two allocators:
+
+- ``random``: the previous ``random.choices`` draw, retried against the registry.
+- ``permutation``: ``LobbyCodeAllocator``.
+
+For each allocator the bench reports ns per allocation, and codes handed out
+again within the quarantine window after their lobby was discarded (an old
+invite link then lands in a stranger's lobby). Every permutation code is also
+checked against a bitmap of the whole space: no code may repeat before the
+counter wraps.
+
+A second run uses a tiny space so the counter wraps many times, with lobbies
+closed in random order. It checks that no live or quarantined code is ever
+handed out.
+"""
+
+import argparse
+import random
+import string
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from app import LobbyCodeAllocator
+
+ALPHABET = string.ascii_uppercase + string.digits
+
+
+class VirtualClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def random_allocator(registry: Dict[str, int]) -> Callable[[], str]:
+    def allocate() -> str:
+        while True:
+            code = "".join(random.choices(ALPHABET, k=5))
+            if code not in registry:
+                return code
+
+    return allocate
+
+
+def churn(
+    allocate: Callable[[], str],
+    release: Callable[[str], None],
+    registry: Dict[str, int],
+    clock: VirtualClock,
+    codes: int,
+    live: int,
+    rate: float,
+    quarantine: float,
+    seen: Optional[bytearray] = None,
+) -> Tuple[float, int, int]:
+    """Returns (ns per allocation, reuses within quarantine, repeats before wrap)."""
+    decode = {char: digit for digit, char in enumerate(ALPHABET)}
+    order: Deque[str] = deque()
+    released: Dict[str, float] = {}
+    released_order: Deque[Tuple[float, str]] = deque()
+    reuses = repeats = 0
+    spent = 0
+    for index in range(codes):
+        clock.now = index / rate
+        started = time.perf_counter_ns()
+        code = allocate()
+        spent += time.perf_counter_ns() - started
+        while released_order and clock.now - released_order[0][0] >= quarantine:
+            stamp, old = released_order.popleft()
+            if released.get(old) == stamp:
+                del released[old]
+        if code in released:
+            reuses += 1
+        if seen is not None:
+            value = 0
+            for char in code:
+                value = value * len(ALPHABET) + decode[char]
+            byte, bit = divmod(value, 8)
+            if seen[byte] >> bit & 1:
+                repeats += 1
+            seen[byte] |= 1 << bit
+        registry[code] = index
+        order.append(code)
+        if len(order) > live:
+            old = order.popleft()
+            del registry[old]
+            release(old)
+            released[old] = clock.now
+            released_order.append((clock.now, old))
+    return spent / codes, reuses, repeats
+
+
+def wrap_check(allocations: int) -> Tuple[int, int, Dict[str, int]]:
+    """Tiny space (4^3 codes) with 16 live lobbies closed in random order and a
+    40s quarantine, one creation per second: returns (live hits, quarantine hits, stats)."""
+    clock = VirtualClock()
+    allocator = LobbyCodeAllocator(alphabet="ABCD", length=3, quarantine=40.0, clock=clock)
+    registry: Dict[str, int] = {}
+    released: Dict[str, float] = {}
+    live_hits = quarantine_hits = 0
+    for index in range(allocations):
+        clock.now = float(index)
+        code = allocator.allocate(registry.__contains__)
+        live_hits += code in registry
+        quarantine_hits += clock.now - released.get(code, -1e9) < allocator.quarantine
+        registry[code] = index
+        if len(registry) > 16:
+            old = random.choice(list(registry))
+            del registry[old]
+            allocator.release(old)
+            released[old] = clock.now
+    return live_hits, quarantine_hits, allocator.stats()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--codes", type=int, default=2_000_000)
+    parser.add_argument("--live", type=int, default=50_000)
+    parser.add_argument("--rate", type=float, default=100.0, help="lobbies created per second")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    quarantine = LobbyCodeAllocator.QUARANTINE_SECONDS
+    print(
+        f"{args.codes} codes, {args.live} live, {args.rate:g}/s, "
+        f"quarantine {quarantine:g}s ({quarantine * args.rate:.0f} creations)"
+    )
+
+    registry: Dict[str, int] = {}
+    clock = VirtualClock()
+    ns, reuses, _ = churn(
+        random_allocator(registry), lambda code: None, registry, clock, args.codes, args.live, args.rate, quarantine
+    )
+    print(f"random       {ns:>7.0f} ns/alloc  {reuses:>6} reused within quarantine")
+
+    registry = {}
+    clock = VirtualClock()
+    allocator = LobbyCodeAllocator(clock=clock)
+    seen = bytearray(allocator.space // 8 + 1)
+    ns, reuses, repeats = churn(
+        lambda: allocator.allocate(registry.__contains__),
+        allocator.release,
+        registry,
+        clock,
+        args.codes,
+        args.live,
+        args.rate,
+        quarantine,
+        seen,
+    )
+    print(f"permutation  {ns:>7.0f} ns/alloc  {reuses:>6} reused within quarantine  {repeats} repeats")
+
+    live_hits, quarantine_hits, stats = wrap_check(20_000)
+    print(
+        f"wrap check   {stats['cycles']} cycles, {stats['skipped']} skipped, "
+        f"{live_hits} live hits, {quarantine_hits} quarantine hits"
+    )
+    if reuses or repeats or live_hits or quarantine_hits:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
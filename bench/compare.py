@@ -0,0 +1,74 @@
+"""Compare two ``bench.micro`` runs and flag regressions.
+
+    python -m bench.compare BASELINE.json CANDIDATE.json [--threshold 0.15] [--min-delta-us 1.0]
+
+Rows are matched on (case, size, pool) and compared by median time (or the
+fastest call with ``--metric minUs``, steadier on a busy machine). A row is
+a regression when the candidate is slower by more than ``--threshold`` (as a
+fraction) and by at least ``--min-delta-us``, which keeps sub-microsecond noise
+out. Exits with status 1 when any regression is found, so it can gate CI.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+Key = Tuple[str, int, str]
+
+
+def load(path: str) -> Tuple[Dict[str, object], Dict[Key, Dict[str, object]]]:
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    rows = {(row["case"], row["size"], row["pool"]): row for row in data["results"]}
+    return data.get("meta", {}), rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    parser.add_argument("--min-delta-us", type=float, default=1.0)
+    parser.add_argument("--metric", choices=["medianUs", "minUs", "p90Us"], default="medianUs")
+    parser.add_argument("--all", action="store_true", help="print unchanged rows too")
+    args = parser.parse_args()
+
+    base_meta, baseline = load(args.baseline)
+    cand_meta, candidate = load(args.candidate)
+    print(f"baseline  {base_meta.get('revision')} python {base_meta.get('python')}")
+    print(f"candidate {cand_meta.get('revision')} python {cand_meta.get('python')}")
+
+    regressions: List[str] = []
+    improvements = 0
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before = baseline[key][args.metric]
+        after = candidate[key][args.metric]
+        ratio = after / before if before else float("inf")
+        delta = after - before
+        if ratio - 1 > args.threshold and delta >= args.min_delta_us:
+            verdict = "REGRESSION"
+        elif 1 - ratio > args.threshold and -delta >= args.min_delta_us:
+            verdict = "faster"
+            improvements += 1
+        else:
+            verdict = ""
+        line = f"{key[0]:<32} {key[1]:>4} {key[2]:>8} {before:>12.1f} {after:>12.1f} {ratio:>7.2f}x  {verdict}"
+        if verdict == "REGRESSION":
+            regressions.append(line)
+        if verdict or args.all:
+            print(line)
+
+    missing = sorted(baseline.keys() - candidate.keys())
+    added = sorted(candidate.keys() - baseline.keys())
+    if missing:
+        print(f"{len(missing)} rows only in baseline, e.g. {missing[0]}")
+    if added:
+        print(f"{len(added)} rows only in candidate, e.g. {added[0]}")
+    print(f"{len(regressions)} regressions, {improvements} improvements above {args.threshold:.0%}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""CPU versus bandwidth of response compression at typical lobby sizes.
+
+    python -m bench.compression [--repeat 300]
+
+For in-game and meeting views of ``/api/player``, the lobby ``/api/state``
+snapshot and the in-game spectator board, prints the JSON size, then bytes and
+microseconds per body for each codec. For the spectator board, the only body
+shared by every viewer of a version, it also prints the cost of serving it from
+``CompressedBodyCache`` once it has been compressed for that version.
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, Dict, List, Tuple
+
+from app import CompressedBodyCache, GameState, compress_body
+
+SIZES = [5, 10, 15, 30]
+CODECS = [("gzip", 1), ("gzip", 6), ("gzip", 9), ("deflate", 6)]
+
+
+def build_lobby(size: int) -> Tuple[GameState, str]:
+    lobby = GameState(code="BENCH")
+    lobby.config["required_players"] = 2
+    lobby.config["impostors"] = 2 if size >= 7 else 1
+    players = [lobby.add_player(f"Jogador {i:02d}") for i in range(size)]
+    for player in players:
+        lobby.toggle_ready(player.player_id, True)
+    viewer = next(p for p in players if p.player_id != lobby.leader_id)
+    return lobby, viewer.player_id
+
+
+def bodies(size: int) -> Dict[str, bytes]:
+    lobby, viewer = build_lobby(size)
+    encode = lambda payload: json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    result = {"state": encode(lobby.lobby_snapshot(viewer))}
+    assert lobby.start_game().get("ok")
+    players = list(lobby.players.values())
+    impostor = next(p for p in players if p.role == "impostor")
+    for victim in [p for p in players if p.role == "crewmate"][: size // 4]:
+        impostor.kill_cooldown_end = 0.0
+        lobby.impostor_kill(impostor.player_id, victim.player_id)
+    crewmate = next(p for p in players if p.role == "crewmate" and p.alive)
+    result["in_game"] = encode(lobby.player_view(crewmate.player_id))
+    result["spectator"] = lobby.spectator_view()[1]
+    lobby.call_emergency_meeting(crewmate.player_id)
+    result["meeting"] = encode(lobby.player_view(crewmate.player_id))
+    return result
+
+
+def timed(fn: Callable[[], bytes], repeat: int) -> Tuple[float, int]:
+    output = fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6, len(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+
+    header = f"{'payload':<10}{'players':>8}{'json':>8}"
+    header += "".join(f"{f'{name}-{level}':>18}" for name, level in CODECS)
+    header += f"{'cached':>12}"
+    print(header)
+    for size in SIZES:
+        for label, body in bodies(size).items():
+            cells: List[str] = []
+            for name, level in CODECS:
+                micros, length = timed(lambda: compress_body(body, name, level), args.repeat)
+                cells.append(f"{length:>8}B {micros:>6.1f}us")
+            cached = f"{'-':>12}"
+            if label == "spectator":
+                cache = CompressedBodyCache()
+                cache.get_or_compress("BENCH", 1, "gzip", body)
+                micros, _ = timed(lambda: cache.get_or_compress("BENCH", 1, "gzip", body), args.repeat)
+                cached = f"{micros:>10.1f}us"
+            print(f"{label:<10}{size:>8}{len(body):>8}" + "".join(cells) + cached)
+
+
+if __name__ == "__main__":
+    main()
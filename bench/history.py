@@ -0,0 +1,111 @@
+"""Write throughput and query latency of the game history store.
+
+    python -m bench.history [--games 20000]
+
+Plays one real game to check what ``_end_game_locked`` hands to the store, then
+fills a temporary database with synthetic games of similar shape, reporting the
+cost of ``record`` on the request path, the background write rate and the time
+taken by the operator analytics as the table grows.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Dict
+
+import app as app_module
+from app import GameState
+from history import GameHistoryStore
+
+
+def real_game_record(store: GameHistoryStore) -> None:
+    app_module.history_store = store
+    try:
+        lobby = GameState(code="BENCH")
+        lobby.config["impostors"] = 1
+        players = [lobby.add_player(f"Jogador {i}") for i in range(6)]
+        for player in players:
+            lobby.toggle_ready(player.player_id, True)
+        assert lobby.start_game().get("ok")
+        impostor = next(p for p in players if p.role == "impostor")
+        victim = next(p for p in players if p.role == "crewmate")
+        impostor.kill_cooldown_end = 0.0
+        lobby.impostor_kill(impostor.player_id, victim.player_id)
+        reporter = next(p for p in players if p.role == "crewmate" and p.alive)
+        lobby.start_meeting(reporter.player_id, victim.player_id)
+        lobby.meeting["voting_starts_at"] = 0.0
+        for player in players:
+            if player.alive:
+                lobby.cast_vote(player.player_id, impostor.player_id)
+        assert lobby.status == "ended", lobby.status
+    finally:
+        app_module.history_store = None
+
+
+def synthetic_record(rng: random.Random, index: int) -> Dict[str, object]:
+    players = rng.randint(5, 15)
+    impostors = rng.choice([1, 2, 2, 3])
+    started = 1_700_000_000 + index * 900.0
+    duration = rng.uniform(240, 1500)
+    deaths = []
+    for _ in range(rng.randint(0, players - impostors - 1)):
+        died = rng.uniform(0, duration)
+        latency = rng.expovariate(1 / 60) if rng.random() < 0.8 else None
+        deaths.append(("kill", died, latency))
+    if rng.random() < 0.1:
+        deaths.append(("left", rng.uniform(0, duration), None))
+    tasks = []
+    for _ in range((players - impostors) * 5):
+        completed = rng.uniform(0, duration) if rng.random() < 0.75 else None
+        tasks.append((rng.choice(["common", "long", "fast"]), completed))
+    return {
+        "code": f"G{index:05d}",
+        "round": 1,
+        "startedAt": started,
+        "endedAt": started + duration,
+        "winner": rng.choice(["impostor", "crewmates"]),
+        "reason": "tasks",
+        "players": players,
+        "impostors": impostors,
+        "endInfo": {"winner": "crewmates", "reason": "tasks"},
+        "deaths": deaths,
+        "tasks": tasks,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=20000)
+    parser.add_argument("--steps", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = GameHistoryStore(os.path.join(directory, "history.sqlite3"), max_pending=args.games + 1)
+        real_game_record(store)
+        store.flush()
+        print("real game:", store.analytics()["gameLength"])
+
+        rng = random.Random(7)
+        records = [synthetic_record(rng, i) for i in range(args.games)]
+        chunk = max(1, args.games // args.steps)
+        print(f"{'games':>8} {'record us':>10} {'write games/s':>14} {'analytics ms':>13}")
+        for start in range(0, args.games, chunk):
+            batch = records[start:start + chunk]
+            started = time.perf_counter()
+            for record in batch:
+                store.record(record)
+            queued = time.perf_counter()
+            store.flush()
+            written = time.perf_counter()
+            analytics = store.analytics()
+            print(
+                f"{store.written:>8} {(queued - started) / len(batch) * 1e6:>10.1f}"
+                f" {len(batch) / (written - started):>14.0f} {analytics['queryMs']:>13.2f}"
+            )
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Per-poll cost of ``player_view`` as lobbies grow, with and without large-lobby mode.
+
+    python -m bench.large_lobby [--repeat 200]
+
+Prints microseconds and JSON bytes per poll for each viewer class, then the
+log-log growth exponent between the smallest and largest lobby: an exponent
+below 1 means per-poll cost grows sublinearly with lobby size.
+"""
+
+import argparse
+import json
+import math
+import time
+from typing import Dict, List, Tuple
+
+from app import GameState
+
+SIZES = [8, 16, 32, 64, 128, 256, 300]
+
+
+def build_lobby(size: int, large_lobby: bool) -> GameState:
+    lobby = GameState(code="BENCH")
+    lobby.config["large_lobby"] = large_lobby
+    lobby.config["required_players"] = 2
+    lobby.config["impostors"] = 2
+    players = [lobby.add_player(f"Jogador {i:03d}") for i in range(size)]
+    for player in players:
+        lobby.toggle_ready(player.player_id, True)
+    result = lobby.start_game()
+    assert result.get("ok"), result
+
+    impostor = next(p for p in players if p.role == "impostor")
+    victims = [p for p in players if p.role == "crewmate" and p.special_role != "medic"]
+    for victim in victims[: size // 3]:
+        impostor.kill_cooldown_end = 0.0
+        lobby.impostor_kill(impostor.player_id, victim.player_id)
+    return lobby
+
+
+def viewers(lobby: GameState) -> Dict[str, str]:
+    players = list(lobby.players.values())
+    picks = {
+        "crewmate": next(p for p in players if p.role == "crewmate" and p.alive and not p.special_role),
+        "impostor": next(p for p in players if p.role == "impostor"),
+        "medic": next(p for p in players if p.special_role == "medic"),
+        "dead": next(p for p in players if not p.alive),
+    }
+    return {label: player.player_id for label, player in picks.items()}
+
+
+def measure(lobby: GameState, player_id: str, repeat: int) -> Tuple[float, int]:
+    payload = lobby.player_view(player_id)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        lobby.player_view(player_id)
+    elapsed = time.perf_counter() - started
+    return elapsed / repeat * 1e6, len(json.dumps(payload))
+
+
+def run(large_lobby: bool, repeat: int) -> Dict[str, List[Tuple[int, float, int]]]:
+    results: Dict[str, List[Tuple[int, float, int]]] = {}
+    for size in SIZES:
+        lobby = build_lobby(size, large_lobby)
+        ids = viewers(lobby)
+        for label, player_id in ids.items():
+            results.setdefault(label, []).append((size, *measure(lobby, player_id, repeat)))
+        caller = ids["crewmate"]
+        lobby.call_emergency_meeting(caller)
+        results.setdefault("meeting", []).append((size, *measure(lobby, caller, repeat)))
+    return results
+
+
+def growth_exponent(series: List[Tuple[int, float, int]]) -> float:
+    (small_n, small_us, _), (big_n, big_us, _) = series[0], series[-1]
+    return math.log(big_us / small_us) / math.log(big_n / small_n)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    for large_lobby in (False, True):
+        print(f"\nlarge_lobby={large_lobby}")
+        print(f"{'viewer':<10}" + "".join(f"{size:>14}" for size in SIZES) + f"{'exponent':>10}")
+        for label, series in run(large_lobby, args.repeat).items():
+            cells = "".join(f"{us:>7.1f}us/{kb / 1024:>4.1f}K" for _, us, kb in series)
+            print(f"{label:<10}{cells}{growth_exponent(series):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""RAM cost of idle lobbies and of each extra player, for instance sizing.
+
+    python -m bench.memory [--lobbies 10000] [--players 10]
+
+Creates ``--lobbies`` lobbies with only their host through ``LobbyManager``
+and reports traced bytes per lobby, then fills 10% of them up to
+``--players`` players and reports bytes per added player. The deep-size
+estimate served by ``/api/admin/memory`` is printed next to the traced figures
+so the two can be compared (it counts shared strings per lobby, so it runs
+higher), along with its per-component split.
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from app import LobbyManager
+
+
+def traced() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lobbies", type=int, default=10000)
+    parser.add_argument("--players", type=int, default=10)
+    args = parser.parse_args()
+
+    manager = LobbyManager()
+    tracemalloc.start()
+    before = traced()
+    started = time.perf_counter()
+    lobbies = [manager.create_lobby("Anfitriao")[0] for _ in range(args.lobbies)]
+    elapsed = time.perf_counter() - started
+    per_lobby = (traced() - before) / args.lobbies
+    print(f"{args.lobbies} idle lobbies in {elapsed:.1f}s")
+    print(f"  traced bytes per lobby:     {per_lobby:>10.0f}")
+    estimate = manager.memory_stats(sample=1000)
+    print(f"  deep-size bytes per lobby:  {estimate['bytesPerLobby']:>10}")
+
+    filled = lobbies[: max(1, args.lobbies // 10)]
+    added = len(filled) * (args.players - 1)
+    before = traced()
+    for lobby in filled:
+        for index in range(1, args.players):
+            lobby.add_player(f"Jogador {index:02d}")
+    per_player = (traced() - before) / added if added else 0.0
+    print(f"{added} players added to {len(filled)} lobbies")
+    print(f"  traced bytes per player:    {per_player:>10.0f}")
+    tracemalloc.stop()
+
+    estimate = manager.memory_stats(sample=1000)
+    print(f"  deep-size bytes per player: {estimate['bytesPerPlayer']:>10}")
+    print("deep-size split over all lobbies (MiB):")
+    for name, size in sorted(estimate["components"].items(), key=lambda item: -item[1]):
+        print(f"  {name:<14} {size / 2**20:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Microbenchmarks for every GameState operation across lobby sizes and task pools.
+
+    python -m bench.micro [--output bench/results/run.json] [--filter player_view]
+                          [--sizes 2,15,300] [--pools default,1000] [--min-time 0.05]
+
+Each case times one operation on a lobby of ``size`` players (lobbies above the
+regular limit run in large-lobby mode). Operations that change state get a
+fresh lobby for every call; read-only ones are called repeatedly on one.
+Pool-sensitive cases also run with synthetic task pools of N templates per
+category. Results are written as JSON; compare two runs with
+``python -m bench.compare``.
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app import GameState
+
+REGULAR_SIZES = [2, 5, 10, GameState.CONFIG_LIMITS["required_players"]["max"]]
+LARGE_SIZES = [50, 150, GameState.LARGE_LOBBY_MAX_PLAYERS]
+POOLS = ["default", "100", "1000", "5000"]
+
+Operation = Callable[[], object]
+# (size, pool) -> operation ready to call, or None when the case does not apply.
+Prepare = Callable[[int, str], Optional[Operation]]
+
+
+def synthetic_pool(templates: int) -> Dict[str, List[object]]:
+    return {
+        category: [
+            {"name": f"Tarefa {category} {index:05d}", "max_occurrences": 1 + index % 3}
+            for index in range(templates)
+        ]
+        for category in ("common", "long", "fast")
+    }
+
+
+def new_lobby(size: int, pool: str) -> Tuple[GameState, List[str]]:
+    random.seed(size)
+    lobby = GameState(code="MICRO")
+    lobby.config["large_lobby"] = size > REGULAR_SIZES[-1]
+    lobby.config["required_players"] = 2
+    lobby.config["impostors"] = 1 if size < 7 else 2
+    if pool != "default":
+        lobby.task_pool = synthetic_pool(int(pool))
+        lobby._refresh_task_templates()
+    ids = [lobby.add_player(f"Jogador {index:03d}").player_id for index in range(size)]
+    for player_id in ids:
+        lobby.toggle_ready(player_id, True)
+    return lobby, ids
+
+
+def started_lobby(size: int, pool: str, kills: int = 0) -> GameState:
+    lobby, _ = new_lobby(size, pool)
+    assert lobby.start_game().get("ok")
+    impostor = next(p for p in lobby.players.values() if p.role == "impostor")
+    victims = [p for p in lobby.players.values() if p.role == "crewmate" and p.special_role != "medic"]
+    for victim in victims[:kills]:
+        impostor.kill_cooldown_end = 0.0
+        lobby.impostor_kill(impostor.player_id, victim.player_id)
+    return lobby
+
+
+def meeting_lobby(size: int, pool: str, kills: int = 0) -> GameState:
+    lobby = started_lobby(size, pool, kills)
+    caller = next(p for p in lobby.players.values() if p.alive)
+    assert lobby.call_emergency_meeting(caller.player_id).get("ok")
+    lobby.meeting["voting_starts_at"] = 0.0
+    return lobby
+
+
+def pick_viewer(lobby: GameState, kind: str) -> Optional[str]:
+    for player in lobby.players.values():
+        if kind == "dead" and not player.alive:
+            return player.player_id
+        if not player.alive:
+            continue
+        if kind == "impostor" and player.role == "impostor":
+            return player.player_id
+        if kind == "medic" and player.special_role == "medic":
+            return player.player_id
+        if kind == "crewmate" and player.role == "crewmate" and not player.special_role:
+            return player.player_id
+    return None
+
+
+def prepare_add_player(size: int, pool: str) -> Operation:
+    lobby, _ = new_lobby(size - 1, pool)
+    return lambda: lobby.add_player("Recem chegado")
+
+
+def prepare_start_game(size: int, pool: str) -> Operation:
+    lobby, _ = new_lobby(size, pool)
+    return lobby.start_game
+
+
+def prepare_build_tasks(size: int, pool: str) -> Operation:
+    lobby = started_lobby(size, pool)
+
+    def build() -> object:
+        lobby._reset_task_usage()
+        return lobby._build_tasks()
+
+    return build
+
+
+def prepare_player_view(kind: str, meeting: bool) -> Prepare:
+    def prepare(size: int, pool: str) -> Optional[Operation]:
+        if size < 5:
+            return None
+        kills = max(1, size // 4) if kind == "dead" else 0
+        lobby = meeting_lobby(size, pool, kills) if meeting else started_lobby(size, pool, kills)
+        viewer = pick_viewer(lobby, kind)
+        if viewer is None or lobby.status in {"lobby", "ended"}:
+            return None
+        return lambda: lobby.player_view(viewer)
+
+    return prepare
+
+
+def prepare_lobby_snapshot(size: int, pool: str) -> Operation:
+    lobby, ids = new_lobby(size, pool)
+    return lambda: lobby.lobby_snapshot(ids[-1])
+
+
+def prepare_mark_task(size: int, pool: str) -> Operation:
+    lobby = started_lobby(size, pool)
+    player = next(p for p in lobby.players.values() if p.role == "crewmate")
+    task = next(task for items in player.tasks.values() for task in items)
+    state = {"done": False}
+
+    def toggle() -> object:
+        state["done"] = not state["done"]
+        return lobby.mark_task(player.player_id, task.task_id, state["done"])
+
+    return toggle
+
+
+def prepare_cast_vote(size: int, pool: str) -> Operation:
+    # Re-voting overwrites the ballot, so one voter can vote repeatedly without
+    # resolving the meeting.
+    lobby = meeting_lobby(size, pool)
+    voter = next(iter(lobby._alive_ids))
+    return lambda: lobby.cast_vote(voter, GameState.SKIP_VOTE)
+
+
+def prepare_resolve_meeting(size: int, pool: str) -> Operation:
+    lobby = meeting_lobby(size, pool)
+    alive = sorted(lobby._alive_ids)
+    for index, voter in enumerate(alive[:-1]):
+        lobby.meeting["votes"][voter] = alive[index % 3] if size > 3 else GameState.SKIP_VOTE
+
+    def resolve() -> None:
+        with lobby._lock:
+            lobby._resolve_meeting_locked()
+
+    return resolve
+
+
+def prepare_impostor_kill(size: int, pool: str) -> Operation:
+    lobby = started_lobby(size, pool)
+    impostor = next(p for p in lobby.players.values() if p.role == "impostor")
+    victim = next(p for p in lobby.players.values() if p.role == "crewmate")
+    impostor.kill_cooldown_end = 0.0
+    return lambda: lobby.impostor_kill(impostor.player_id, victim.player_id)
+
+
+def prepare_remove_player(in_game: bool) -> Prepare:
+    def prepare(size: int, pool: str) -> Operation:
+        if in_game:
+            lobby = started_lobby(size, pool)
+            leaver = next(p for p in lobby.players.values() if p.role == "crewmate").player_id
+        else:
+            lobby, ids = new_lobby(size, pool)
+            leaver = ids[-1]
+        return lambda: lobby.remove_player(leaver)
+
+    return prepare
+
+
+# name -> (prepare, reusable, pool sensitive)
+CASES: Dict[str, Tuple[Prepare, bool, bool]] = {
+    "add_player": (prepare_add_player, False, False),
+    "start_game": (prepare_start_game, False, True),
+    "_build_tasks": (prepare_build_tasks, True, True),
+    "lobby_snapshot": (prepare_lobby_snapshot, True, False),
+    "mark_task": (prepare_mark_task, True, True),
+    "cast_vote": (prepare_cast_vote, True, False),
+    "_resolve_meeting_locked": (prepare_resolve_meeting, False, False),
+    "impostor_kill": (prepare_impostor_kill, False, False),
+    "remove_player.lobby": (prepare_remove_player(False), False, False),
+    "remove_player.in_game": (prepare_remove_player(True), False, False),
+}
+for _kind in ("crewmate", "impostor", "medic", "dead"):
+    CASES[f"player_view.{_kind}.in_game"] = (prepare_player_view(_kind, False), True, True)
+    CASES[f"player_view.{_kind}.meeting"] = (prepare_player_view(_kind, True), True, False)
+
+
+def measure(
+    prepare: Prepare, reusable: bool, size: int, pool: str, min_time: float, max_calls: int, min_calls: int = 3
+) -> Optional[Dict[str, object]]:
+    operation = prepare(size, pool)
+    if operation is None:
+        return None
+    samples: List[float] = []
+    total = 0.0
+    # As in timeit: collections triggered by earlier setup would land on random calls.
+    gc.collect()
+    gc.disable()
+    try:
+        while len(samples) < min_calls or (total < min_time and len(samples) < max_calls):
+            if samples and not reusable:
+                operation = prepare(size, pool)
+            started = time.perf_counter()
+            operation()
+            elapsed = time.perf_counter() - started
+            samples.append(elapsed)
+            total += elapsed
+    finally:
+        gc.enable()
+    samples.sort()
+    return {
+        "calls": len(samples),
+        "medianUs": round(samples[len(samples) // 2] * 1e6, 3),
+        "minUs": round(samples[0] * 1e6, 3),
+        "p90Us": round(samples[min(len(samples) - 1, int(len(samples) * 0.9))] * 1e6, 3),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--filter", default="")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in REGULAR_SIZES + LARGE_SIZES))
+    parser.add_argument("--pools", default=",".join(POOLS))
+    parser.add_argument("--min-time", type=float, default=0.05)
+    parser.add_argument("--max-calls", type=int, default=2000)
+    parser.add_argument("--max-fresh-calls", type=int, default=50)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    pools = [pool for pool in args.pools.split(",") if pool]
+    results: List[Dict[str, object]] = []
+    started = time.perf_counter()
+    for name, (prepare, reusable, pool_sensitive) in CASES.items():
+        if args.filter not in name:
+            continue
+        for pool in pools if pool_sensitive else pools[:1]:
+            for size in sizes:
+                max_calls = args.max_calls if reusable else args.max_fresh_calls
+                row = measure(prepare, reusable, size, pool, args.min_time, max_calls)
+                if row is None:
+                    continue
+                results.append({"case": name, "size": size, "pool": pool, **row})
+                print(f"{name:<32} {size:>4} {pool:>8} {row['medianUs']:>12.1f} us  ({row['calls']} calls)")
+
+    output = args.output or os.path.join(
+        "bench", "results", datetime.datetime.now().strftime("micro-%Y%m%d-%H%M%S.json")
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(
+            {
+                "meta": {
+                    "revision": git_revision(),
+                    "python": sys.version.split()[0],
+                    "platform": platform.platform(),
+                    "createdAt": time.time(),
+                    "minTime": args.min_time,
+                },
+                "results": results,
+            },
+            handle,
+            indent=1,
+        )
+    print(f"{len(results)} results in {time.perf_counter() - started:.0f}s -> {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Requests and bytes a player's browser spends reloading the lobby and game pages.
+
+    python -m bench.reconnect [--players 8]
+
+A reconnect is the page itself, the stylesheet and script it links, its first
+API call and the avatar images that call references. Three clients are
+modelled on the Flask test client:
+
+- ``cold``: empty cache.
+- ``http``: warm HTTP cache. Responses marked immutable are reused without a
+  request; everything else is revalidated with its ETag.
+- ``sw``: the service worker answers the shell pages and built assets from
+  its cache. The API call still goes out, plus the browser's update check of
+  ``/sw.js``.
+
+Both asset layouts are measured: the source files (what runs without
+``python assets.py``) and the build. The build is run first if missing.
+"""
+
+import argparse
+import gzip
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+import app as app_module
+import assets
+from app import app
+
+ASSET_RE = re.compile(r'(?:href|src)="(/static/[^"]+)"')
+AVATAR_RE = re.compile(r'"avatar":\s*"([^"]+)"')
+
+
+def response_bytes(response) -> int:
+    headers = sum(len(key) + len(value) + 4 for key, value in response.headers.items())
+    return headers + len(response.get_data())
+
+
+class Browser:
+    def __init__(self, client, mode: str) -> None:
+        self.client = client
+        self.mode = mode
+        # url -> (etag, immutable)
+        self.cache: Dict[str, Tuple[Optional[str], bool]] = {}
+        self.requests = 0
+        self.bytes = 0
+
+    def get(self, url: str, api: bool = False) -> Optional[str]:
+        cached = self.cache.get(url)
+        from_worker = url in app_module.SERVICE_WORKER_SHELL or url.startswith(app_module.BUILT_ASSET_PREFIX)
+        if self.mode == "sw" and not api and from_worker:
+            if cached is not None:
+                return None
+        elif self.mode != "cold" and cached is not None and cached[1]:
+            return None
+        headers = {"Accept-Encoding": "gzip"}
+        if self.mode != "cold" and not api and cached is not None and cached[0]:
+            headers["If-None-Match"] = cached[0]
+        response = self.client.get(url, headers=headers)
+        self.requests += 1
+        self.bytes += response_bytes(response)
+        if response.status_code == 200 and not api:
+            etag = response.headers.get("ETag")
+            self.cache[url] = (etag, "immutable" in (response.headers.get("Cache-Control") or ""))
+        text = None
+        if response.status_code == 200:
+            body = response.get_data()
+            if response.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            text = body.decode("utf-8")
+        response.close()
+        return text
+
+    def reconnect(self, page: str, api_url: str) -> None:
+        if self.mode == "sw" and app_module.ASSETS.built:
+            self.get("/sw.js", api=True)
+        html = self.get(page)
+        if html is None:
+            html = self.client.get(page).get_data(as_text=True)
+        for url in ASSET_RE.findall(html):
+            self.get(url)
+        payload = self.get(api_url, api=True) or ""
+        # One request per file however many avatars share the sprite.
+        for url in sorted({url.split("#", 1)[0] for url in AVATAR_RE.findall(payload)}):
+            self.get(url)
+
+
+def use_manifest(manifest: assets.Manifest) -> None:
+    names = [os.path.basename(url.split("#", 1)[-1]).rsplit(".", 1)[0] for url in app_module.AVATAR_POOL]
+    app_module.ASSETS = manifest
+    app_module.AVATAR_POOL[:] = [manifest.avatar(name) for name in names]
+
+
+def session(players: int) -> List[object]:
+    clients = [app.test_client() for _ in range(players)]
+    clients[0].post("/create", data={"name": "Jogador 00"})
+    code = clients[0].get("/api/state").get_json()["code"]
+    for index, client in enumerate(clients[1:], start=1):
+        client.post("/join", data={"name": f"Jogador {index:02d}", "code": code})
+    return clients
+
+
+def measure(players: int) -> List[Tuple[str, str, int, int]]:
+    rows = []
+    clients = session(players)
+    lobby = app_module.lobby_manager.get_lobby(clients[0].get("/api/state").get_json()["code"])
+    lobby.config["impostors"] = 1
+    # Lobby page: every seated player's avatar. Game page: the roster shown in a meeting.
+    pages = [("/lobby", "/api/state"), ("/game", "/api/player")]
+    for page, api_url in pages:
+        if page == "/game" and lobby.status == "lobby":
+            for client in clients:
+                client.post("/api/ready", json={"ready": True})
+            assert clients[0].post("/api/start").get_json().get("ok")
+            caller = next(c for c in clients if c.get("/api/player").get_json().get("alive"))
+            caller.post("/api/meeting/emergency")
+        for mode in ("cold", "http", "sw"):
+            browser = Browser(clients[0], mode)
+            browser.reconnect(page, api_url)
+            if mode != "cold":
+                browser.requests = browser.bytes = 0
+                browser.reconnect(page, api_url)
+            rows.append((page, mode, browser.requests, browser.bytes))
+    app_module.lobby_manager.discard_lobby(lobby.code)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=8)
+    args = parser.parse_args()
+
+    built = app_module.ASSETS
+    if not built.built:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        built = assets.build(os.path.join(root, "static"), os.path.join(root, "templates"))
+        print(f"built assets {built.version}")
+    for label, manifest in (("source", assets.Manifest()), ("built", built)):
+        use_manifest(manifest)
+        for page, mode, requests, size in measure(args.players):
+            if label == "source" and mode == "sw":
+                continue
+            print(f"{label:<7} {page:<7} {mode:<5} {requests:>3} requests {size:>8} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Throughput of the state layer across 1..N threads.
+
+    python -m bench.scaling [--max-threads 8] [--seconds 2] [--players 10]
+
+Each thread loops over the hot request mix (player views and task toggles) on
+a started game. In ``disjoint`` mode every thread has its own lobby, which is
+what per-lobby locking should let scale with cores on a free-threaded build;
+in ``shared`` mode all threads hit one lobby and serialise on its lock, which
+bounds the contended case. Speedup is relative to one thread in the same mode.
+With the GIL on, expect about 1.0x everywhere.
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from typing import List
+
+from app import GameState
+from bench.stress import gil_enabled
+
+
+def started_lobby(code: str, players: int) -> GameState:
+    lobby = GameState(code=code)
+    lobby.config["required_players"] = 2
+    lobby.config["impostors"] = 1 if players < 7 else 2
+    for index in range(players):
+        player = lobby.add_player(f"Jogador {index:02d}")
+        lobby.toggle_ready(player.player_id, True)
+    assert lobby.start_game().get("ok")
+    return lobby
+
+
+def hammer(lobby: GameState, seed: int, deadline: float, counts: List[int], slot: int) -> None:
+    rng = random.Random(seed)
+    crew = [p for p in lobby.players.values() if p.role == "crewmate"]
+    ids = list(lobby.players)
+    done = 0
+    while time.perf_counter() < deadline:
+        for _ in range(50):
+            if rng.random() < 0.7:
+                lobby.player_view(rng.choice(ids))
+            else:
+                player = rng.choice(crew)
+                task = rng.choice([task for group in player.tasks.values() for task in group])
+                # Toggle back and forth so the game never ends mid-run.
+                lobby.mark_task(player.player_id, task.task_id, not task.done)
+        done += 50
+    counts[slot] = done
+
+
+def run(mode: str, threads: int, seconds: float, players: int) -> float:
+    shared = started_lobby("SHARE", players) if mode == "shared" else None
+    lobbies = [shared or started_lobby(f"L{index:04d}", players) for index in range(threads)]
+    counts = [0] * threads
+    deadline = time.perf_counter() + seconds
+    workers = [
+        threading.Thread(target=hammer, args=(lobbies[index], index, deadline, counts, index))
+        for index in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--players", type=int, default=10)
+    args = parser.parse_args()
+
+    gil = gil_enabled()
+    print(f"python {sys.version.split()[0]}, GIL {'unknown' if gil is None else 'on' if gil else 'off'}")
+    counts = sorted({2 ** power for power in range(args.max_threads.bit_length())} | {args.max_threads})
+    for mode in ("disjoint", "shared"):
+        baseline = 0.0
+        for threads in counts:
+            rate = run(mode, threads, args.seconds, args.players)
+            baseline = baseline or rate
+            print(f"{mode:<9} {threads:>3} threads {rate:>12.0f} ops/s  {rate / baseline:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""Concurrent games on one shared LobbyManager, checked for lost updates and races.
+
+    python -m bench.stress [--threads 8] [--ops 5000] [--seed 1]
+
+Every thread plays random players through the manager and lobby APIs the
+routes use (join, leave, ready, start, views, tasks, kills, meetings, votes,
+resets), so joins race discards, kills race meetings and so on. After each
+action the touched lobby's invariants are checked under its lock; at the end
+the manager aggregates are compared with a recount, and no closed lobby may
+still be registered or hold players. Meant for free-threaded builds (where
+``sys._is_gil_enabled()`` is False) but runs, serialised, on any interpreter.
+Exits with status 1 on any violation.
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from app import GameState, LobbyManager
+from simulate import lobby_invariant_violation
+
+ACTION_WEIGHTS = {
+    "join": 6,
+    "leave": 3,
+    "ready": 8,
+    "start": 4,
+    "view": 25,
+    "task": 25,
+    "kill": 6,
+    "report": 3,
+    "emergency": 2,
+    "vote": 12,
+    "sabotage": 1,
+    "reset": 3,
+    "forward": 2,
+}
+
+
+class Stress:
+    def __init__(self, lobbies: int) -> None:
+        self.manager = LobbyManager()
+        self.target_lobbies = lobbies
+        self._lock = threading.Lock()
+        self._codes: List[str] = []
+        self.seen: List[GameState] = []
+        self.violations: List[str] = []
+        self.ops: Counter = Counter()
+        self.seats: List[Tuple[GameState, str]] = []
+
+    def _note(self, message: str) -> None:
+        with self._lock:
+            if len(self.violations) < 50:
+                self.violations.append(message)
+
+    def _create(self, name: str) -> Tuple[GameState, str]:
+        lobby, host = self.manager.create_lobby(name)
+        with lobby._lock:
+            lobby.config["required_players"] = 3
+            lobby.config["impostors"] = 1
+        with self._lock:
+            self._codes.append(lobby.code)
+            self.seen.append(lobby)
+        return lobby, host.player_id
+
+    def _pick_code(self, rng: random.Random) -> Optional[str]:
+        with self._lock:
+            self._codes = [code for code in self._codes if self.manager.get_lobby(code)]
+            if len(self._codes) < self.target_lobbies:
+                return None
+            return rng.choice(self._codes)
+
+    def _check(self, lobby: GameState, action: str) -> None:
+        with lobby._lock:
+            violation = lobby_invariant_violation(lobby)
+            if lobby.closed and any(not player.left_game for player in lobby.players.values()):
+                violation = violation or "closed lobby still holds players"
+        if violation:
+            self._note(f"{lobby.code} after {action}: {violation}")
+
+    def worker(self, index: int, seed: int, ops: int) -> None:
+        rng = random.Random(seed * 1000 + index)
+        # (lobby, player id) this thread plays; only the owner ever removes one.
+        seats: List[Tuple[GameState, str]] = []
+        actions = list(ACTION_WEIGHTS)
+        weights = [ACTION_WEIGHTS[action] for action in actions]
+        counts: Counter = Counter()
+        for step in range(ops):
+            action = rng.choices(actions, weights=weights)[0]
+            if action == "join" or not seats:
+                name = f"T{index}-{step}"
+                code = self._pick_code(rng)
+                if code is None:
+                    seats.append(self._create(name))
+                    counts["create"] += 1
+                    continue
+                lobby, player, error = self.manager.join_lobby(code, name)
+                if lobby is not None and player is not None:
+                    seats.append((lobby, player.player_id))
+                counts["join"] += 1
+                continue
+
+            lobby, player_id = seats[rng.randrange(len(seats))]
+            player = lobby.players.get(player_id)
+            if action == "leave":
+                self.manager.remove_player(lobby.code, player_id)
+                seats.remove((lobby, player_id))
+            elif player is None or player.left_game:
+                seats.remove((lobby, player_id))
+                continue
+            elif action == "ready":
+                lobby.toggle_ready(player_id, True)
+            elif action == "start":
+                lobby.start_game()
+            elif action == "view":
+                lobby.push_view(player_id)
+            elif action == "task":
+                tasks = [task for group in list(player.tasks.values()) for task in list(group)]
+                if tasks:
+                    task = rng.choice(tasks)
+                    lobby.mark_task(player_id, task.task_id, rng.random() > 0.1)
+            elif action == "kill":
+                targets = [p.player_id for p in list(lobby.players.values()) if p.alive]
+                if targets:
+                    lobby.impostor_kill(player_id, rng.choice(targets))
+            elif action == "report":
+                bodies = [p.player_id for p in list(lobby.players.values()) if not p.alive]
+                if bodies:
+                    lobby.start_meeting(player_id, rng.choice(bodies))
+            elif action == "emergency":
+                lobby.call_emergency_meeting(player_id)
+            elif action == "vote":
+                choices = [p.player_id for p in list(lobby.players.values()) if p.alive]
+                lobby.cast_vote(player_id, rng.choice(choices + [GameState.SKIP_VOTE]))
+            elif action == "sabotage":
+                lobby.impostor_sabotage(player_id)
+            elif action == "reset":
+                if lobby.status == "ended":
+                    lobby.reset_to_lobby()
+            else:
+                # Stand-in for waiting: open voting and clear cooldowns now.
+                with lobby._lock:
+                    if lobby.meeting:
+                        lobby.meeting["voting_starts_at"] = 0.0
+                    for other in lobby.players.values():
+                        other.kill_cooldown_end = 0.0
+                    lobby.comms_sabotage_end = 0.0
+            counts[action] += 1
+            self._check(lobby, action)
+        with self._lock:
+            self.ops.update(counts)
+            self.seats.extend(seats)
+
+    def final_checks(self) -> None:
+        with self.manager._lock:
+            registered = dict(self.manager._lobbies)
+        for lobby in self.seen:
+            if lobby.closed and registered.get(lobby.code) is lobby:
+                self._note(f"{lobby.code}: closed but still registered")
+            if not lobby.closed and registered.get(lobby.code) is not lobby:
+                self._note(f"{lobby.code}: dropped from the registry without being closed")
+            self._check(lobby, "end")
+        for lobby, player_id in self.seats:
+            player = lobby.players.get(player_id)
+            if player is not None and not player.left_game and registered.get(lobby.code) is not lobby:
+                self._note(f"{lobby.code}: player {player_id} joined a lobby that is no longer registered")
+        stats = self.manager.admin_stats()
+        statuses: Counter = Counter()
+        players = 0
+        for lobby in registered.values():
+            with lobby._lock:
+                statuses[lobby.status] += 1
+                players += sum(1 for player in lobby.players.values() if not player.left_game)
+        if stats["lobbies"] != len(registered):
+            self._note(f"aggregate lobbies {stats['lobbies']} != {len(registered)} registered")
+        if stats["lobbiesByStatus"] != {status: count for status, count in statuses.items() if count}:
+            self._note(f"aggregate statuses {stats['lobbiesByStatus']} != recount {dict(statuses)}")
+        if stats["playersOnline"] != players:
+            self._note(f"aggregate playersOnline {stats['playersOnline']} != recount {players}")
+
+
+def gil_enabled() -> Optional[bool]:
+    check = getattr(sys, "_is_gil_enabled", None)
+    return check() if check else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=5000, help="actions per thread")
+    parser.add_argument("--lobbies", type=int, default=4, help="open lobbies kept around to join")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--switch-interval", type=float, default=1e-5, help="GIL builds: switch threads this often (s)"
+    )
+    args = parser.parse_args()
+
+    gil = gil_enabled()
+    if gil is not False:
+        # With a GIL, frequent switches are what lets interleavings show up at all.
+        sys.setswitchinterval(args.switch_interval)
+    print(f"python {sys.version.split()[0]}, GIL {'unknown' if gil is None else 'on' if gil else 'off'}")
+    stress = Stress(args.lobbies)
+    threads = [
+        threading.Thread(target=stress.worker, args=(index, args.seed, args.ops), name=f"stress-{index}")
+        for index in range(args.threads)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stress.final_checks()
+
+    total = sum(stress.ops.values())
+    print(f"{total} actions on {len(stress.seen)} lobbies in {elapsed:.1f}s ({total / elapsed:.0f}/s)")
+    print("  " + ", ".join(f"{action} {count}" for action, count in stress.ops.most_common()))
+    for message in stress.violations:
+        print(f"VIOLATION {message}")
+    if stress.violations:
+        sys.exit(1)
+    print("no violations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Bytes on the wire per game per player: JSON versus the compact format.
+
+    python -m bench.wire_size [--games 50] [--seed 1]
+
+Replays simulated games (see ``simulate.py``) and, after every step, has each
+player poll ``/api/player`` once. Each player keeps its own string table state
+the way game.js does, and every compact body is decoded and checked against
+the JSON payload.
+"""
+
+import argparse
+import json
+from typing import Dict, Tuple
+
+import wire
+from app import GameState
+from simulate import GameSimulator, _install_clock
+
+
+class WireSizeSimulator(GameSimulator):
+    def __init__(self, seed: int, clock) -> None:
+        super().__init__(seed, clock)
+        self.json_bytes = 0
+        self.compact_bytes = 0
+        self.polls = 0
+        self.players = 0
+        self._tables: Dict[str, Tuple[str, list]] = {}
+
+    def run_game(self, game_index: int):
+        self._tables = {}
+        return super().run_game(game_index)
+
+    def _step(self, lobby: GameState, player_id: str) -> None:
+        super()._step(lobby, player_id)
+        self.players = max(self.players, len(lobby.players))
+        for pid in list(lobby.players):
+            payload = lobby.player_view(pid)
+            payload.pop("pollAfterMs", None)
+            self.json_bytes += len(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+            table_id, strings = self._tables.get(pid, ("", []))
+            body = lobby.wire_strings.encode(pid, payload, table_id, len(strings))
+            self.compact_bytes += len(body)
+            self.polls += 1
+
+            envelope, _ = wire.decode(body)
+            if envelope[0] != table_id or envelope[1] == 0:
+                strings = []
+            strings = strings[: envelope[1]] + envelope[2]
+            decoded, _ = wire.decode(envelope[3], strings)
+            if decoded != json.loads(json.dumps(payload)):
+                raise AssertionError(f"seed={self.seed}: compact round trip mismatch for {pid}")
+            self._tables[pid] = (envelope[0], strings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    clock = _install_clock()
+    json_total = compact_total = polls = player_games = 0
+    for offset in range(args.games):
+        simulator = WireSizeSimulator(args.seed + offset, clock)
+        simulator.run_game(offset)
+        json_total += simulator.json_bytes
+        compact_total += simulator.compact_bytes
+        polls += simulator.polls
+        player_games += simulator.players
+
+    print(f"games={args.games} polls={polls} player-games={player_games}")
+    print(f"{'format':<10}{'bytes/poll':>14}{'bytes/game/player':>20}")
+    for label, total in (("json", json_total), ("compact", compact_total)):
+        print(f"{label:<10}{total / polls:>14.0f}{total / player_games:>20.0f}")
+    print(f"compact/json = {compact_total / json_total:.2%}")
+
+
+if __name__ == "__main__":
+    main()
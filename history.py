@@ -0,0 +1,258 @@
+"""Append-only history of finished games, with aggregate queries for operators.
+
+Games are queued by ``GameHistoryStore.record`` (cheap, called under the lobby
+lock) and written in batches by a background thread, so request handlers never
+wait on disk. Per-game rows are never updated; analytics run as SQL aggregates
+over narrow, indexed tables on their own read connection (WAL mode), so they do
+not block the writer either. The task completion curve, which would otherwise
+scan every task ever assigned, is rolled up by the writer as it goes.
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL,
+    round INTEGER NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    winner TEXT,
+    reason TEXT,
+    player_count INTEGER NOT NULL,
+    impostor_count INTEGER NOT NULL,
+    end_info TEXT
+);
+CREATE TABLE IF NOT EXISTS deaths (
+    game_id INTEGER NOT NULL,
+    cause TEXT NOT NULL,
+    died_after REAL NOT NULL,
+    report_latency REAL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    game_id INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    completed_after REAL
+);
+CREATE TABLE IF NOT EXISTS task_curve (
+    slot INTEGER PRIMARY KEY,
+    tasks INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_impostors ON games (impostor_count, winner);
+CREATE INDEX IF NOT EXISTS deaths_report ON deaths (cause, report_latency);
+"""
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class GameHistoryStore:
+    """Background writer plus read-side analytics over one SQLite file.
+
+    A record is a mapping with ``code``, ``round``, ``startedAt``, ``endedAt``,
+    ``winner``, ``reason``, ``players``, ``impostors``, ``endInfo``, plus
+    ``deaths`` as ``(cause, died_after, report_latency)`` and ``tasks`` as
+    ``(category, completed_after)``. Causes are ``kill`` or ``left`` (quit mid-game);
+    times are seconds since game start and the latency is seconds from death
+    to report (``None`` if never reported).
+    """
+
+    CURVE_BUCKET_SECONDS = 30
+    # task_curve slot for tasks never completed.
+    UNFINISHED_SLOT = -1
+
+    def __init__(self, path: str, batch_size: int = 64, max_pending: int = 10000) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Optional[Dict[str, object]]]" = queue.Queue(maxsize=max_pending)
+        self._read_lock = threading.Lock()
+        self.dropped = 0
+        self.failed = 0
+        self.written = 0
+        conn = _connect(path)
+        conn.executescript(SCHEMA)
+        conn.commit()
+        self._writer_conn = conn
+        self._reader_conn = _connect(path)
+        self._thread = threading.Thread(target=self._run, name="game-history", daemon=True)
+        self._thread.start()
+
+    def record(self, record: Dict[str, object]) -> bool:
+        """Queue a finished game; never blocks. Returns False when the queue is full."""
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._read_lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def flush(self) -> None:
+        """Block until every queued game has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        self._reader_conn.close()
+
+    def _run(self) -> None:
+        conn = self._writer_conn
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while item is not None and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+            records = [record for record in batch if record is not None]
+            try:
+                if records:
+                    self._write_batch(conn, records)
+            except sqlite3.Error:
+                with self._read_lock:
+                    self.failed += len(records)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if len(records) < len(batch):
+                conn.close()
+                return
+
+    def _write_batch(self, conn: sqlite3.Connection, records: List[Dict[str, object]]) -> None:
+        deaths: List[Tuple[int, str, float, Optional[float]]] = []
+        tasks: List[Tuple[int, str, Optional[float]]] = []
+        slots: Counter = Counter()
+        with conn:
+            for record in records:
+                cursor = conn.execute(
+                    "INSERT INTO games (code, round, started_at, ended_at, duration, winner, reason,"
+                    " player_count, impostor_count, end_info) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        record["code"],
+                        record["round"],
+                        record["startedAt"],
+                        record["endedAt"],
+                        max(0.0, record["endedAt"] - record["startedAt"]),
+                        record.get("winner"),
+                        record.get("reason"),
+                        record["players"],
+                        record["impostors"],
+                        json.dumps(record.get("endInfo"), separators=(",", ":")),
+                    ),
+                )
+                game_id = cursor.lastrowid
+                deaths.extend((game_id, *death) for death in record.get("deaths", ()))
+                for category, completed_after in record.get("tasks", ()):
+                    tasks.append((game_id, category, completed_after))
+                    if completed_after is None:
+                        slots[self.UNFINISHED_SLOT] += 1
+                    else:
+                        slots[int(completed_after // self.CURVE_BUCKET_SECONDS)] += 1
+            conn.executemany("INSERT INTO deaths VALUES (?, ?, ?, ?)", deaths)
+            conn.executemany("INSERT INTO tasks VALUES (?, ?, ?)", tasks)
+            conn.executemany(
+                "INSERT INTO task_curve (slot, tasks) VALUES (?, ?)"
+                " ON CONFLICT (slot) DO UPDATE SET tasks = tasks + excluded.tasks",
+                slots.items(),
+            )
+        self.written += len(records)
+
+    def analytics(self) -> Dict[str, object]:
+        started = time.perf_counter()
+        with self._read_lock:
+            conn = self._reader_conn
+            payload = {
+                "winRates": self._win_rates(conn),
+                "gameLength": self._game_length(conn),
+                "killToReport": self._kill_to_report(conn),
+                "taskCompletion": self._task_completion(conn),
+            }
+        payload["pending"] = self._queue.qsize()
+        payload["dropped"] = self.dropped
+        payload["failed"] = self.failed
+        payload["queryMs"] = round((time.perf_counter() - started) * 1000, 2)
+        return payload
+
+    @staticmethod
+    def _win_rates(conn: sqlite3.Connection) -> List[Dict[str, object]]:
+        rows = conn.execute(
+            "SELECT impostor_count, COUNT(*), SUM(winner = 'impostor') FROM games"
+            " GROUP BY impostor_count ORDER BY impostor_count"
+        ).fetchall()
+        return [
+            {
+                "impostors": impostors,
+                "games": games,
+                "impostorWins": impostor_wins,
+                "impostorWinRate": round(impostor_wins / games, 3),
+            }
+            for impostors, games, impostor_wins in rows
+        ]
+
+    @staticmethod
+    def _game_length(conn: sqlite3.Connection) -> Dict[str, object]:
+        games, average, shortest, longest = conn.execute(
+            "SELECT COUNT(*), AVG(duration), MIN(duration), MAX(duration) FROM games"
+        ).fetchone()
+        return {
+            "games": games,
+            "averageSeconds": round(average, 1) if average is not None else None,
+            "minSeconds": round(shortest, 1) if shortest is not None else None,
+            "maxSeconds": round(longest, 1) if longest is not None else None,
+        }
+
+    @staticmethod
+    def _kill_to_report(conn: sqlite3.Connection) -> Dict[str, object]:
+        kills, reported, average = conn.execute(
+            "SELECT COUNT(*), COUNT(report_latency), AVG(report_latency) FROM deaths WHERE cause = 'kill'"
+        ).fetchone()
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not reported:
+                return None
+            row = conn.execute(
+                "SELECT report_latency FROM deaths WHERE cause = 'kill' AND report_latency IS NOT NULL"
+                " ORDER BY report_latency LIMIT 1 OFFSET ?",
+                (min(reported - 1, int(fraction * reported)),),
+            ).fetchone()
+            return round(row[0], 1)
+
+        return {
+            "kills": kills,
+            "reported": reported,
+            "reportedRate": round(reported / kills, 3) if kills else None,
+            "averageSeconds": round(average, 1) if average is not None else None,
+            "p50Seconds": percentile(0.5),
+            "p90Seconds": percentile(0.9),
+        }
+
+    def _task_completion(self, conn: sqlite3.Connection) -> Dict[str, object]:
+        bucket = self.CURVE_BUCKET_SECONDS
+        rows = conn.execute("SELECT slot, tasks FROM task_curve ORDER BY slot").fetchall()
+        assigned = sum(count for _, count in rows)
+        curve = []
+        completed = 0
+        for slot, count in rows:
+            if slot == self.UNFINISHED_SLOT:
+                continue
+            completed += count
+            curve.append({"seconds": (slot + 1) * bucket, "completedRate": round(completed / assigned, 3)})
+        return {
+            "assigned": assigned,
+            "completed": completed,
+            "bucketSeconds": bucket,
+            "curve": curve,
+        }
@@ -0,0 +1,175 @@
+"""Memory diagnostics: approximate deep sizes and tracemalloc snapshot diffs."""
+
+import gc
+import os
+import sys
+import threading
+import tracemalloc
+from collections import deque
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Dict, List, Optional, Set
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Never walked into: shared by every lobby or not owned by the object at all.
+_OPAQUE = (type, ModuleType, FunctionType, MethodType, BuiltinFunctionType)
+_LEAVES = (str, bytes, bytearray, int, float, bool, complex, type(None))
+
+
+def deep_size(obj: object, seen: Optional[Set[int]] = None) -> int:
+    """Bytes reachable from ``obj`` per ``sys.getsizeof``, counting each object once.
+
+    Objects already in ``seen`` are skipped, so passing one set across calls
+    attributes shared objects to whichever component was measured first.
+    Classes, modules and callables (e.g. listeners) are not followed. Strings
+    and numbers shared with other objects (task names from the default pool,
+    small ints) are counted too, so this is an upper bound on what freeing
+    ``obj`` would return.
+    """
+    if seen is None:
+        seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        ident = id(item)
+        if ident in seen or isinstance(item, _OPAQUE):
+            continue
+        seen.add(ident)
+        size += sys.getsizeof(item)
+        if isinstance(item, _LEAVES):
+            continue
+        if isinstance(item, dict):
+            try:
+                stack.extend(item.keys())
+                stack.extend(item.values())
+            except RuntimeError:
+                # Resized by a thread holding another lock (e.g. a cache); skip its contents.
+                pass
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            try:
+                stack.extend(item)
+            except RuntimeError:
+                pass
+        else:
+            attributes = getattr(item, "__dict__", None)
+            if attributes is not None:
+                stack.append(attributes)
+            for klass in type(item).__mro__:
+                for slot in getattr(klass, "__slots__", ()):
+                    if hasattr(item, slot):
+                        stack.append(getattr(item, slot))
+    return size
+
+
+def process_memory() -> Dict[str, Optional[int]]:
+    rss = None
+    try:
+        with open("/proc/self/statm") as handle:
+            rss = int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    peak = None
+    if resource is not None:
+        # ru_maxrss is KiB on Linux, bytes on macOS.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform != "darwin":
+            peak *= 1024
+    traced, traced_peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (None, None)
+    return {
+        "rssBytes": rss,
+        "peakRssBytes": peak,
+        "gcObjects": len(gc.get_objects()),
+        "tracedBytes": traced,
+        "tracedPeakBytes": traced_peak,
+    }
+
+
+class TracemallocSession:
+    """Operator-driven tracemalloc: start, take a baseline, diff against it later.
+
+    Tracing slows allocations noticeably, so it only runs between ``start``
+    and ``stop``; the baseline is dropped when tracing stops.
+    """
+
+    GROUPS = ("lineno", "filename", "traceback")
+    MAX_FRAMES = 25
+    _FILTERS = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ]
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._owned = False
+
+    def start(self, frames: int = 1) -> Dict[str, object]:
+        with self._lock:
+            if tracemalloc.is_tracing():
+                return {"ok": False, "error": "O tracemalloc ja esta ativo."}
+            tracemalloc.start(max(1, min(frames, self.MAX_FRAMES)))
+            self._owned = True
+            self._baseline = None
+        return {"ok": True, **self.status()}
+
+    def stop(self) -> Dict[str, object]:
+        with self._lock:
+            if self._owned:
+                tracemalloc.stop()
+            self._owned = False
+            self._baseline = None
+        return {"ok": True, **self.status()}
+
+    def status(self) -> Dict[str, object]:
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "frames": tracemalloc.get_traceback_limit() if tracemalloc.is_tracing() else None,
+            "hasBaseline": self._baseline is not None,
+        }
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(self._FILTERS)
+
+    def mark(self) -> Dict[str, object]:
+        """Take the baseline later diffs compare against."""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                return {"ok": False, "error": "O tracemalloc nao esta ativo."}
+            self._baseline = self._snapshot()
+            size = sum(stat.size for stat in self._baseline.statistics("filename"))
+        return {"ok": True, "baselineBytes": size, **self.status()}
+
+    def diff(self, group: str = "lineno", limit: int = 20, rebase: bool = False) -> Dict[str, object]:
+        if group not in self.GROUPS:
+            return {"ok": False, "error": "Agrupamento invalido."}
+        with self._lock:
+            if not tracemalloc.is_tracing() or self._baseline is None:
+                return {"ok": False, "error": "Marca uma referencia antes de comparar."}
+            current = self._snapshot()
+            stats = current.compare_to(self._baseline, group)
+            if rebase:
+                self._baseline = current
+        limit = max(1, min(limit, 200))
+        rows: List[Dict[str, object]] = []
+        for stat in stats[:limit]:
+            rows.append(
+                {
+                    "where": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                    "sizeBytes": stat.size,
+                    "sizeDiffBytes": stat.size_diff,
+                    "count": stat.count,
+                    "countDiff": stat.count_diff,
+                }
+            )
+        return {
+            "ok": True,
+            "group": group,
+            "totalDiffBytes": sum(stat.size_diff for stat in stats),
+            "top": rows,
+        }
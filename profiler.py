@@ -0,0 +1,143 @@
+"""Low-overhead sampling profiler that can be switched on in production.
+
+Request threads tag themselves (route and lobby code) while a profile is
+running; a background thread then reads every tagged thread's stack through
+``sys._current_frames()`` at a fixed interval and counts folded stacks, so the
+request path only pays a dict write. The output is the "folded" text format
+read by flamegraph.pl, speedscope and inferno: ``frame;frame;frame count``.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Dict, List, Optional
+
+
+class SamplingProfiler:
+    MAX_DURATION = 300.0
+    MIN_INTERVAL = 0.001
+    MAX_INTERVAL = 1.0
+    TRUNCATED_FRAME = "[truncated]"
+
+    def __init__(self, max_stacks: int = 5000, max_depth: int = 48) -> None:
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+        self._tags: Dict[int, str] = {}
+        self._stacks: Counter = Counter()
+        self._labels: Dict[CodeType, str] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.active = False
+        self.interval = 0.01
+        self.started_at = 0.0
+        self.ends_at = 0.0
+        self.samples = 0
+        self.ticks = 0
+        self.truncated = 0
+        self.sampler_seconds = 0.0
+
+    def tag(self, route: str, lobby_code: Optional[str] = None) -> None:
+        """Label the calling thread's samples until ``untag``; becomes the root frames."""
+        label = route.replace(";", ",")
+        if lobby_code:
+            label += ";lobby " + lobby_code.replace(";", ",")
+        self._tags[threading.get_ident()] = label
+
+    def untag(self) -> None:
+        self._tags.pop(threading.get_ident(), None)
+
+    def start(self, duration: float, interval: float, reset: bool = True) -> Dict[str, object]:
+        with self._lock:
+            if self.active:
+                return {"ok": False, "error": "O perfil ja esta a correr."}
+            if reset:
+                self._stacks.clear()
+                self.samples = 0
+                self.ticks = 0
+                self.truncated = 0
+                self.sampler_seconds = 0.0
+            self.interval = min(self.MAX_INTERVAL, max(self.MIN_INTERVAL, interval))
+            self.started_at = time.time()
+            self.ends_at = self.started_at + min(self.MAX_DURATION, max(1.0, duration))
+            self._stop.clear()
+            self.active = True
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+        return {"ok": True, **self.status()}
+
+    def stop(self) -> Dict[str, object]:
+        self._stop.set()
+        thread = self._thread
+        if thread and thread is not threading.current_thread():
+            thread.join()
+        return {"ok": True, **self.status()}
+
+    def status(self) -> Dict[str, object]:
+        with self._lock:
+            elapsed = (min(time.time(), self.ends_at) if self.active else self.ends_at) - self.started_at
+            return {
+                "active": self.active,
+                "intervalMs": round(self.interval * 1000, 2),
+                "startedAt": self.started_at or None,
+                "endsAt": self.ends_at or None,
+                "samples": self.samples,
+                "ticks": self.ticks,
+                "stacks": len(self._stacks),
+                "truncated": self.truncated,
+                # Sampler CPU share of wall time while running; a proxy for overhead.
+                "overhead": round(self.sampler_seconds / elapsed, 4) if elapsed > 0 else 0.0,
+            }
+
+    def folded(self) -> str:
+        with self._lock:
+            items = self._stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.wait(self.interval) and time.time() < self.ends_at:
+                started = time.perf_counter()
+                self._sample()
+                self.sampler_seconds += time.perf_counter() - started
+        finally:
+            with self._lock:
+                self.active = False
+                self.ends_at = min(self.ends_at, time.time())
+                self._tags.clear()
+
+    def _sample(self) -> None:
+        frames = sys._current_frames()
+        stacks: List[str] = []
+        for ident, label in list(self._tags.items()):
+            frame = frames.get(ident)
+            if frame is not None:
+                stacks.append(f"{label};{self._fold(frame)}")
+        with self._lock:
+            self.ticks += 1
+            for stack in stacks:
+                self.samples += 1
+                if stack not in self._stacks and len(self._stacks) >= self.max_stacks:
+                    self.truncated += 1
+                    stack = stack.split(";", 1)[0] + ";" + self.TRUNCATED_FRAME
+                self._stacks[stack] += 1
+
+    def _fold(self, frame: Optional[FrameType]) -> str:
+        labels: List[str] = []
+        while frame is not None and len(labels) < self.max_depth:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                path = code.co_filename
+                where = os.path.join(os.path.basename(os.path.dirname(path)), os.path.basename(path))
+                label = f"{code.co_name} ({where}:{code.co_firstlineno})"
+                self._labels[code] = label
+            labels.append(label)
+            frame = frame.f_back
+        if frame is not None:
+            labels.append(self.TRUNCATED_FRAME)
+        labels.reverse()
+        return ";".join(labels)
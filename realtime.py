@@ -0,0 +1,558 @@
+﻿"""WebSocket channel for game actions and state pushes, plus spectator SSE.
+
+Runs a small RFC 6455 server on its own asyncio loop (stdlib only, no broker)
+next to the WSGI app. Players authenticate with their Flask session cookie,
+send action frames and receive acknowledgements; whenever a lobby changes,
+every connected player gets a compact diff of their own ``player_view`` so
+role-sensitive fields are filtered exactly like the polling API.
+
+Spectators open ``/spectate/<code>/events`` (Server-Sent Events) and all get
+the same ``GameState.spectator_view`` frame, built once per state version.
+
+Everything that takes a lobby or manager lock runs in worker threads
+(``asyncio.to_thread``), so a busy lobby never stalls the event loop or other
+lobbies' sockets. Pushes run as one task per lobby at a time, and a client's
+view is only rebuilt when the lobby version moved past the one it last got.
+The server pings every socket every ``PING_SECONDS`` and drops those that
+stay silent for ``PING_TIMEOUT_SECONDS``.
+
+Client frames (JSON text):
+    {"id": 7, "type": "vote", "target": "<player id>"}
+
+Server frames:
+    {"t": "ack", "id": 7, "r": {...action result...}}
+    {"t": "state", "v": <version>, "d": {<changed keys>}, "r": [<removed keys>]}
+    {"t": "chat", "m": [<meeting chat messages>], "c": <cursor>, "meetingId": "..."}
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import re
+import struct
+import threading
+import time
+from http.cookies import SimpleCookie
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from app import GameState, LobbyManager
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WS_PATH = "/ws"
+SPECTATE_PATH = re.compile(r"^/spectate/([A-Za-z0-9]{4,8})/events$")
+HANDSHAKE_LIMIT = 8192
+MAX_FRAME_BYTES = 64 * 1024
+MAX_WRITE_BUFFER = 1024 * 1024
+TICK_SECONDS = 1.0
+KEEPALIVE_TICKS = 15
+PING_SECONDS = 20.0
+PING_TIMEOUT_SECONDS = 3 * PING_SECONDS
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def _accept_key(key: str) -> str:
+    digest = hashlib.sha1((key + WS_GUID).encode("ascii")).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def _encode_frame(opcode: int, payload: bytes) -> bytes:
+    header = bytearray([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        header.append(length)
+    elif length < 65536:
+        header.append(126)
+        header += struct.pack("!H", length)
+    else:
+        header.append(127)
+        header += struct.pack("!Q", length)
+    return bytes(header) + payload
+
+
+def _unmask(data: bytes, mask: bytes) -> bytes:
+    if not data:
+        return data
+    length = len(data)
+    key = (mask * (length // 4 + 1))[:length]
+    return (int.from_bytes(data, "big") ^ int.from_bytes(key, "big")).to_bytes(length, "big")
+
+
+def _board_frame(version: int, body: bytes) -> bytes:
+    # The cached JSON body is spliced in as-is; only the server time is fresh.
+    head = f'event: board\nid: {version}\ndata: {{"serverTime":{time.time():.3f},"view":'
+    return head.encode("ascii") + body + b"}\n\n"
+
+
+def diff_view(previous: Dict[str, object], current: Dict[str, object]) -> Tuple[Dict[str, object], List[str]]:
+    changed = {key: value for key, value in current.items() if previous.get(key) != value}
+    removed = [key for key in previous if key not in current]
+    return changed, removed
+
+
+class WebSocketConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.closed = False
+        # Any frame from the peer, pongs included, counts as a sign of life.
+        self.last_seen = time.monotonic()
+
+    async def recv(self) -> Optional[str]:
+        """Return the next text message, or ``None`` once the peer closes."""
+        fragments: List[bytes] = []
+        while True:
+            head = await self.reader.readexactly(2)
+            fin = head[0] & 0x80
+            opcode = head[0] & 0x0F
+            length = head[1] & 0x7F
+            if not head[1] & 0x80:
+                raise ProtocolError("client frames must be masked")
+            if length == 126:
+                (length,) = struct.unpack("!H", await self.reader.readexactly(2))
+            elif length == 127:
+                (length,) = struct.unpack("!Q", await self.reader.readexactly(8))
+            if length > MAX_FRAME_BYTES or sum(map(len, fragments)) + length > MAX_FRAME_BYTES:
+                raise ProtocolError("frame too large")
+            mask = await self.reader.readexactly(4)
+            data = _unmask(await self.reader.readexactly(length), mask)
+            self.last_seen = time.monotonic()
+
+            if opcode == OP_CLOSE:
+                self.close()
+                return None
+            if opcode == OP_PING:
+                self._write(OP_PONG, data)
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode not in (OP_TEXT, OP_CONTINUATION):
+                raise ProtocolError("unsupported opcode")
+            fragments.append(data)
+            if fin:
+                return b"".join(fragments).decode("utf-8")
+
+    def _write(self, opcode: int, payload: bytes) -> None:
+        if self.closed:
+            return
+        self.writer.write(_encode_frame(opcode, payload))
+
+    def ping(self) -> None:
+        self._write(OP_PING, b"")
+
+    def send_json(self, message: Dict[str, object]) -> bool:
+        """Queue a message; returns False (and closes) if the peer is not draining."""
+        if self.closed:
+            return False
+        if self.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            self.close()
+            return False
+        self._write(OP_TEXT, json.dumps(message, separators=(",", ":")).encode("utf-8"))
+        return True
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self._write(OP_CLOSE, b"")
+        self.closed = True
+        self.writer.close()
+
+
+class Client:
+    def __init__(self, connection: WebSocketConnection, lobby_code: str, player_id: str) -> None:
+        self.connection = connection
+        self.lobby_code = lobby_code
+        self.player_id = player_id
+        self.view: Dict[str, object] = {}
+        # Lobby version ``view`` was built from; -1 forces a full rebuild.
+        self.version = -1
+        self.chat_cursor = 0
+        # Set on the loop thread; the lobby's push task then sends a full view and chat.
+        self.resync = True
+
+
+class LobbyHub:
+    """Tracks connected players and spectators per lobby and pushes on change."""
+
+    def __init__(self, manager: LobbyManager, flask_app) -> None:
+        self.manager = manager
+        self.flask_app = flask_app
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients: Dict[str, Set[Client]] = {}
+        self._spectators: Dict[str, Set[asyncio.StreamWriter]] = {}
+        self._board_versions: Dict[str, int] = {}
+        self._dirty: Set[str] = set()
+        self._chat_dirty: Set[str] = set()
+        # Lobbies with a push task running; at most one per lobby keeps pushes in order.
+        self._flushing: Set[str] = set()
+        self.stats = {
+            "connections": 0,
+            "actions": 0,
+            "pushes": 0,
+            "chatPushes": 0,
+            "rejected": 0,
+            "spectators": 0,
+            "boardFrames": 0,
+            "timedOut": 0,
+        }
+
+    # Called from any thread, under the lobby lock: only hand off to the loop.
+    def notify(self, lobby: GameState) -> None:
+        loop = self.loop
+        if loop is None or (lobby.code not in self._clients and lobby.code not in self._spectators):
+            return
+        loop.call_soon_threadsafe(self._mark_dirty, lobby.code)
+
+    def notify_chat(self, lobby: GameState) -> None:
+        loop = self.loop
+        if loop is None or lobby.code not in self._clients:
+            return
+        loop.call_soon_threadsafe(self._mark_dirty, lobby.code, True)
+
+    def _mark_dirty(self, code: str, chat: bool = False) -> None:
+        (self._chat_dirty if chat else self._dirty).add(code)
+        if code not in self._flushing:
+            self._flushing.add(code)
+            self.loop.create_task(self._flush_lobby(code))
+
+    async def _flush_lobby(self, code: str) -> None:
+        try:
+            while code in self._dirty or code in self._chat_dirty:
+                chat = code in self._chat_dirty
+                self._dirty.discard(code)
+                self._chat_dirty.discard(code)
+                clients = list(self._clients.get(code, ()))
+                spectators = bool(self._spectators.get(code))
+                lobby, messages, board = await asyncio.to_thread(self._collect, code, clients, chat, spectators)
+                if lobby is None:
+                    for client in clients:
+                        client.connection.close()
+                    for writer in list(self._spectators.get(code, ())):
+                        writer.close()
+                    continue
+                for client, message in messages:
+                    if message["t"] == "error":
+                        client.connection.send_json(message)
+                        client.connection.close()
+                    elif client.connection.send_json(message):
+                        self.stats["chatPushes" if message["t"] == "chat" else "pushes"] += 1
+                if board is not None:
+                    self._push_board(code, *board)
+        finally:
+            self._flushing.discard(code)
+
+    def _collect(
+        self, code: str, clients: List[Client], chat: bool, spectators: bool
+    ) -> Tuple[Optional[GameState], List[Tuple[Client, Dict[str, object]]], Optional[Tuple[int, bytes]]]:
+        """Worker thread: build every message one lobby's push needs."""
+        lobby = self.manager.get_lobby(code)
+        if lobby is None:
+            return None, [], None
+        messages: List[Tuple[Client, Dict[str, object]]] = []
+        for client in clients:
+            resync = client.resync
+            if resync:
+                client.resync = False
+                client.view = {}
+                client.version = -1
+                client.chat_cursor = 0
+            if client.version != lobby.version:
+                message = self._state_message(lobby, client)
+                if message is not None:
+                    messages.append((client, message))
+            if chat or resync:
+                message = self._chat_message(lobby, client)
+                if message is not None:
+                    messages.append((client, message))
+        board = lobby.spectator_view() if spectators else None
+        return lobby, messages, board
+
+    def _push_board(self, code: str, version: int, body: bytes) -> None:
+        if self._board_versions.get(code) == version:
+            return
+        self._board_versions[code] = version
+        # One frame per version, written to every spectator of the lobby.
+        frame = _board_frame(version, body)
+        self.stats["boardFrames"] += 1
+        for writer in list(self._spectators.get(code, ())):
+            self._write_event(code, writer, frame)
+
+    def _write_event(self, code: str, writer: asyncio.StreamWriter, frame: bytes) -> None:
+        if writer.is_closing() or writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            writer.close()
+            self._spectators.get(code, set()).discard(writer)
+            return
+        writer.write(frame)
+
+    def _state_message(self, lobby: GameState, client: Client) -> Optional[Dict[str, object]]:
+        version, view = lobby.push_view(client.player_id)
+        if not view.get("ok"):
+            # The loop thread closes the socket after sending this.
+            return {"t": "error", "error": view.get("error")}
+        client.version = version
+        changed, removed = diff_view(client.view, view)
+        if not changed and not removed:
+            return None
+        client.view = view
+        message: Dict[str, object] = {"t": "state", "v": version, "d": changed}
+        if removed:
+            message["r"] = removed
+        return message
+
+    def _chat_message(self, lobby: GameState, client: Client) -> Optional[Dict[str, object]]:
+        # Only the messages past the client's cursor; never rebuilds the view.
+        result = lobby.chat_since(client.player_id, client.chat_cursor)
+        if not result.get("ok"):
+            return None
+        client.chat_cursor = result["cursor"]
+        if not result["messages"]:
+            return None
+        return {"t": "chat", "m": result["messages"], "c": result["cursor"], "meetingId": result["meetingId"]}
+
+    def _authenticate(self, headers: Dict[str, str]) -> Optional[Tuple[str, str]]:
+        cookie_name = self.flask_app.config["SESSION_COOKIE_NAME"]
+        cookie = SimpleCookie()
+        try:
+            cookie.load(headers.get("cookie", ""))
+        except Exception:
+            return None
+        morsel = cookie.get(cookie_name)
+        if morsel is None:
+            return None
+        serializer = self.flask_app.session_interface.get_signing_serializer(self.flask_app)
+        if serializer is None:
+            return None
+        max_age = int(self.flask_app.permanent_session_lifetime.total_seconds())
+        try:
+            data = serializer.loads(morsel.value, max_age=max_age)
+        except Exception:
+            return None
+        code, player_id = data.get("lobby_code"), data.get("player_id")
+        if not code or not player_id:
+            return None
+        return code, player_id
+
+    def _reject(self, writer: asyncio.StreamWriter, status: str) -> None:
+        self.stats["rejected"] += 1
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode("ascii"))
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str]]]:
+        try:
+            raw = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            return None
+        lines = raw.decode("latin-1").split("\r\n")
+        parts = lines[0].split(" ")
+        if len(parts) < 3:
+            return None
+        headers: Dict[str, str] = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        return parts[0], urlsplit(parts[1]).path, headers
+
+    def _handshake(self, writer: asyncio.StreamWriter, headers: Dict[str, str]) -> Optional[Tuple[str, str]]:
+        reject = lambda status: self._reject(writer, status)
+        key = headers.get("sec-websocket-key")
+        if headers.get("upgrade", "").lower() != "websocket" or not key:
+            reject("400 Bad Request")
+            return None
+        # Cookies ride along on cross-site sockets too; only accept our own pages.
+        origin = headers.get("origin")
+        host = headers.get("host", "")
+        if origin and urlsplit(origin).hostname != urlsplit(f"//{host}").hostname:
+            reject("403 Forbidden")
+            return None
+        identity = self._authenticate(headers)
+        if identity is None:
+            reject("401 Unauthorized")
+            return None
+        writer.write(
+            (
+                "HTTP/1.1 101 Switching Protocols\r\n"
+                "Upgrade: websocket\r\n"
+                "Connection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {_accept_key(key)}\r\n\r\n"
+            ).encode("ascii")
+        )
+        return identity
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        request = await self._read_request(reader)
+        if request is None:
+            writer.close()
+            return
+        method, path, headers = request
+        spectate = SPECTATE_PATH.match(path)
+        if method != "GET" or (path != WS_PATH and not spectate):
+            self._reject(writer, "404 Not Found")
+            writer.close()
+            return
+        if spectate:
+            await self._serve_board(reader, writer, spectate.group(1).upper())
+            return
+        identity = self._handshake(writer, headers)
+        if identity is None:
+            writer.close()
+            return
+        code, player_id = identity
+        connection = WebSocketConnection(reader, writer)
+        lobby = await asyncio.to_thread(self._seated_lobby, code, player_id)
+        if lobby is None:
+            connection.send_json({"t": "error", "error": "Jogador nao encontrado."})
+            connection.close()
+            return
+
+        client = Client(connection, lobby.code, player_id)
+        self._clients.setdefault(lobby.code, set()).add(client)
+        self.stats["connections"] += 1
+        try:
+            self._mark_dirty(lobby.code)
+            while not connection.closed:
+                text = await connection.recv()
+                if text is None:
+                    break
+                await self._handle_message(client, text)
+        except (asyncio.IncompleteReadError, ConnectionError, ProtocolError, UnicodeDecodeError):
+            pass
+        finally:
+            connection.close()
+            clients = self._clients.get(client.lobby_code)
+            if clients is not None:
+                clients.discard(client)
+                if not clients:
+                    self._clients.pop(client.lobby_code, None)
+
+    def _seated_lobby(self, code: str, player_id: str) -> Optional[GameState]:
+        lobby = self.manager.get_lobby(code)
+        if lobby is None or lobby.current_player(player_id) is None:
+            return None
+        return lobby
+
+    async def _serve_board(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, code: str) -> None:
+        lobby = await asyncio.to_thread(self.manager.get_lobby, code)
+        if lobby is None:
+            self._reject(writer, "404 Not Found")
+            writer.close()
+            return
+        writer.write(
+            (
+                "HTTP/1.1 200 OK\r\n"
+                "Content-Type: text/event-stream\r\n"
+                "Cache-Control: no-cache\r\n"
+                "Access-Control-Allow-Origin: *\r\n"
+                "Connection: keep-alive\r\n\r\n"
+                "retry: 3000\n\n"
+            ).encode("ascii")
+        )
+        spectators = self._spectators.setdefault(code, set())
+        spectators.add(writer)
+        self.stats["spectators"] += 1
+        version, body = await asyncio.to_thread(lobby.spectator_view)
+        self._write_event(code, writer, _board_frame(version, body))
+        try:
+            # Spectators never send anything; wait for the connection to drop.
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            spectators.discard(writer)
+            if not spectators and self._spectators.get(code) is spectators:
+                self._spectators.pop(code, None)
+                self._board_versions.pop(code, None)
+
+    async def _handle_message(self, client: Client, text: str) -> None:
+        try:
+            message = json.loads(text)
+        except ValueError:
+            client.connection.send_json({"t": "error", "error": "Mensagem invalida."})
+            return
+        if not isinstance(message, dict):
+            client.connection.send_json({"t": "error", "error": "Mensagem invalida."})
+            return
+        if message.get("type") == "sync":
+            client.resync = True
+            self._mark_dirty(client.lobby_code)
+            return
+        result = await asyncio.to_thread(self._apply, client, message)
+        if result is None:
+            client.connection.close()
+            return
+        self.stats["actions"] += 1
+        client.connection.send_json({"t": "ack", "id": message.get("id"), "r": result})
+
+    def _apply(self, client: Client, message: Dict[str, object]) -> Optional[Dict[str, object]]:
+        lobby = self.manager.get_lobby(client.lobby_code)
+        if lobby is None:
+            return None
+        return lobby.apply_action(client.player_id, message)
+
+    async def _ticker(self) -> None:
+        ticks = 0
+        last_ping = time.monotonic()
+        while True:
+            await asyncio.sleep(TICK_SECONDS)
+            ticks += 1
+            gone = await asyncio.to_thread(self._tick_lobbies, set(self._clients) | set(self._spectators))
+            for code in gone:
+                self._mark_dirty(code)
+            if ticks % KEEPALIVE_TICKS == 0:
+                for code, writers in list(self._spectators.items()):
+                    for writer in list(writers):
+                        self._write_event(code, writer, b": keepalive\n\n")
+            now = time.monotonic()
+            if now - last_ping >= PING_SECONDS:
+                last_ping = now
+                self._ping_clients(now)
+
+    def _tick_lobbies(self, codes: Set[str]) -> List[str]:
+        """Worker thread: expire timed state; returns the codes whose lobby is gone."""
+        gone = []
+        for code in codes:
+            lobby = self.manager.get_lobby(code)
+            if lobby is None:
+                gone.append(code)
+            else:
+                lobby.tick()
+        return gone
+
+    def _ping_clients(self, now: float) -> None:
+        for clients in list(self._clients.values()):
+            for client in list(clients):
+                connection = client.connection
+                if now - connection.last_seen > PING_TIMEOUT_SECONDS:
+                    self.stats["timedOut"] += 1
+                    connection.close()
+                else:
+                    connection.ping()
+
+    async def serve(self, host: str, port: int) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.manager.add_listener(self.notify)
+        self.manager.add_chat_listener(self.notify_chat)
+        server = await asyncio.start_server(self.handle, host, port, limit=HANDSHAKE_LIMIT)
+        async with server:
+            await asyncio.gather(server.serve_forever(), self._ticker())
+
+
+def start_in_thread(manager: LobbyManager, flask_app, host: str, port: int) -> LobbyHub:
+    """Run the WebSocket hub on its own event loop in a daemon thread."""
+    hub = LobbyHub(manager, flask_app)
+    thread = threading.Thread(
+        target=asyncio.run, args=(hub.serve(host, port),), name="realtime", daemon=True
+    )
+    thread.start()
+    return hub
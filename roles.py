@@ -0,0 +1,179 @@
+"""Role plugins: everything a role adds on top of the core game rules.
+
+A role declares hooks (assignment, task completion, periodic expiry, view
+and poll-deadline contributions) plus the actions and player lists it owns.
+``GameState.start_game`` deals the base roles, gives each registered special
+role to ``count`` players of its ``base`` role, and then builds per-lobby
+dispatch tables from the roles actually dealt, so a poll only runs the hooks
+of the viewer's own roles. Every hook runs under the lobby lock and receives
+the ``GameState`` as ``lobby`` and reads the time from ``lobby.now()``, so a
+simulated clock reaches roles too.
+
+Per-player role data lives in ``Player.role_state``, which is cleared when the
+player's roles are.
+"""
+
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from app import GameState, Player, TaskItem
+
+# (lobby, player id, action) -> result dict
+ActionHandler = Callable[["GameState", str, Dict[str, object]], Dict[str, object]]
+# (lobby, player, cursor, query) -> {"ok": True, "items": [...], "nextCursor": ...} or an error
+ListHandler = Callable[["GameState", "Player", int, str], Dict[str, object]]
+
+
+class Role:
+    name = ""
+    # Special roles are given to players already dealt ``base``; base roles leave it None.
+    base: Optional[str] = None
+    count = 1
+    # Action type / player_list kind -> method name on the role.
+    actions: Dict[str, str] = {}
+    lists: Dict[str, str] = {}
+
+    def assign(self, lobby: "GameState", player: "Player") -> None:
+        pass
+
+    def on_task_complete(self, lobby: "GameState", player: "Player", task: "TaskItem") -> None:
+        pass
+
+    def tick(self, lobby: "GameState", player: "Player") -> None:
+        pass
+
+    def view(self, lobby: "GameState", player: "Player", payload: Dict[str, object]) -> None:
+        pass
+
+    def deadlines(self, lobby: "GameState", player: "Player") -> List[float]:
+        # Times at which the role changes server state on its own; plain
+        # countdowns are rendered by the client from absolute times in the view.
+        return []
+
+    def implements(self, hook: str) -> bool:
+        return getattr(type(self), hook) is not getattr(Role, hook)
+
+
+ROLES: Dict[str, Role] = {}
+ACTIONS: Dict[str, ActionHandler] = {}
+LISTS: Dict[str, ListHandler] = {}
+
+
+def register(role: Role) -> Role:
+    ROLES[role.name] = role
+    for kind, method in role.actions.items():
+        ACTIONS[kind] = getattr(role, method)
+    for kind, method in role.lists.items():
+        LISTS[kind] = getattr(role, method)
+    return role
+
+
+def special_roles() -> List[Role]:
+    return [role for role in ROLES.values() if role.base]
+
+
+class ImpostorRole(Role):
+    name = "impostor"
+    actions = {"kill": "kill", "sabotage": "sabotage"}
+    lists = {"killTargets": "kill_targets"}
+
+    def assign(self, lobby: "GameState", player: "Player") -> None:
+        player.kill_cooldown_end = lobby.now()
+
+    def view(self, lobby: "GameState", player: "Player", payload: Dict[str, object]) -> None:
+        targets, next_cursor = lobby._kill_targets_locked(player.player_id)
+        if targets:
+            payload["killTargets"] = targets
+        if lobby._large_lobby():
+            payload["killTargetsNext"] = next_cursor
+
+    def kill(self, lobby: "GameState", player_id: str, action: Dict[str, object]) -> Dict[str, object]:
+        return lobby._impostor_kill_locked(player_id, str(action.get("targetId") or ""))
+
+    def sabotage(self, lobby: "GameState", player_id: str, action: Dict[str, object]) -> Dict[str, object]:
+        return lobby._impostor_sabotage_locked(player_id)
+
+    def kill_targets(self, lobby: "GameState", player: "Player", cursor: int, query: str) -> Dict[str, object]:
+        if player.role != self.name or lobby.status != "in_game":
+            return {"ok": False, "error": "Apenas o impostor pode ver os alvos."}
+        items, next_cursor = lobby._kill_targets_locked(player.player_id, cursor, query)
+        return {"ok": True, "items": items, "nextCursor": next_cursor}
+
+
+class MedicRole(Role):
+    """Crewmate who unlocks a short look at everyone's vitals with each completed task."""
+
+    name = "medic"
+    base = "crewmate"
+    actions = {"vitals": "activate_vitals"}
+    lists = {"vitals": "vitals_page"}
+
+    def assign(self, lobby: "GameState", player: "Player") -> None:
+        player.role_state.update({"vitals_until": 0.0, "vitals_ready": True, "completed": set()})
+
+    def on_task_complete(self, lobby: "GameState", player: "Player", task: "TaskItem") -> None:
+        completed = player.role_state["completed"]
+        if task.task_id not in completed:
+            completed.add(task.task_id)
+            player.role_state["vitals_ready"] = True
+
+    def tick(self, lobby: "GameState", player: "Player") -> None:
+        if player.role_state["vitals_until"] and lobby.now() >= player.role_state["vitals_until"]:
+            player.role_state["vitals_until"] = 0.0
+            lobby._touch_locked()
+
+    def _status(self, lobby: "GameState", player: "Player", now: float) -> Dict[str, object]:
+        until = player.role_state["vitals_until"]
+        return {
+            "active": until > now,
+            "until": until or None,
+            "ready": player.role_state["vitals_ready"],
+            "duration": lobby.medic_vitals_duration,
+        }
+
+    def view(self, lobby: "GameState", player: "Player", payload: Dict[str, object]) -> None:
+        # Read only: ``tick`` expires the window before views are built.
+        medic_payload = self._status(lobby, player, lobby.now())
+        if medic_payload["active"]:
+            medic_payload.update(lobby._vitals_payload_locked())
+        payload["medicVitals"] = medic_payload
+
+    def activate_vitals(self, lobby: "GameState", player_id: str, action: Dict[str, object]) -> Dict[str, object]:
+        player = lobby.players.get(player_id)
+        if not player:
+            return {"ok": False, "error": "Jogador nao encontrado."}
+        if lobby.status != "in_game":
+            return {"ok": False, "error": "As vitals so estao disponiveis durante a ronda."}
+        if player.special_role != self.name:
+            return {"ok": False, "error": "Apenas o medico pode usar este botao."}
+        if player.left_game:
+            return {"ok": False, "error": "Jogador nao esta ativo."}
+
+        self.tick(lobby, player)
+        now = lobby.now()
+        status = self._status(lobby, player, now)
+        if status["active"]:
+            return {"ok": True, **status, **lobby._vitals_payload_locked()}
+        if not status["ready"]:
+            return {
+                "ok": False,
+                "error": "Completa uma nova tarefa para desbloquear novamente as vitals.",
+                **status,
+            }
+
+        player.role_state["vitals_ready"] = False
+        player.role_state["vitals_until"] = now + lobby.medic_vitals_duration
+        lobby._touch_locked()
+        return {"ok": True, **self._status(lobby, player, now), **lobby._vitals_payload_locked()}
+
+    def vitals_page(self, lobby: "GameState", player: "Player", cursor: int, query: str) -> Dict[str, object]:
+        if player.special_role != self.name:
+            return {"ok": False, "error": "As vitals nao estao ativas."}
+        if player.role_state["vitals_until"] <= lobby.now():
+            return {"ok": False, "error": "As vitals nao estao ativas."}
+        items, next_cursor = lobby._collect_vitals_locked(cursor)
+        return {"ok": True, "items": items, "nextCursor": next_cursor}
+
+
+register(ImpostorRole())
+register(MedicRole())
@@ -1,8 +1,20 @@
 from waitress import serve
-from app import app
+from app import app, enable_history, lobby_manager
 import os
 
+import realtime
+
 if __name__ == "__main__":
     # Bind to the port provided by the platform (e.g., Render sets $PORT)
     port = int(os.environ.get("PORT") or os.environ.get("RENDER_INTERNAL_PORT", 5000))
+    # WebSocket channel runs on its own port; set WS_PORT=0 to disable it.
+    ws_port = int(os.environ.get("WS_PORT", port + 1))
+    if ws_port:
+        realtime.start_in_thread(lobby_manager, app, "0.0.0.0", ws_port)
+        app.config["WS_PORT"] = ws_port
+    # Finished games are appended to this SQLite file; set HISTORY_DB= to disable.
+    # app.py already opened it at import if HISTORY_DB is set; this adds the default.
+    history_db = os.environ.get("HISTORY_DB", "game_history.sqlite3")
+    if history_db:
+        enable_history(history_db)
     serve(app, host="0.0.0.0", port=port)
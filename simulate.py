@@ -0,0 +1,295 @@
+"""Headless game simulator for GameState throughput and invariant checks.
+
+Drives ``GameState`` directly (no HTTP, no Flask) with seeded random players
+and a virtual clock, checking invariants after every operation. Games are
+spread across a ``multiprocessing`` pool and the run reports GameState
+operations per second per core.
+
+    python simulate.py --games 100000 --workers 8 --seed 1
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import app
+from app import GameState
+
+
+class SimClock:
+    """Stand-in for the ``time`` module so meetings and cooldowns elapse instantly."""
+
+    localtime = staticmethod(time.localtime)
+    strftime = staticmethod(time.strftime)
+
+    def __init__(self, start: float) -> None:
+        self.now = start
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def lobby_invariant_violation(lobby: GameState) -> Optional[str]:
+    """First broken invariant of ``lobby``, or None. The caller holds ``lobby._lock``."""
+    total, completed = lobby._task_totals_unlocked()
+    if completed > total:
+        return f"progress {completed}/{total}"
+    if (total, completed) != lobby._recount_task_totals_unlocked():
+        return f"task counters {total}/{completed} drifted from a full recount"
+    alive = {p.player_id for p in lobby.players.values() if p.alive and not p.left_game}
+    if alive != lobby._alive_ids:
+        return "alive index out of sync"
+    if lobby.revealed_progress > 1.0:
+        return f"revealed progress {lobby.revealed_progress}"
+    if lobby.status == "ended" and lobby.end_info is None:
+        return "ended without end_info"
+    if lobby.meeting:
+        for voter_id in lobby.meeting["votes"]:
+            voter = lobby.players.get(voter_id)
+            if not voter or not voter.alive:
+                return f"dead or missing player {voter_id} has a vote"
+    return None
+
+
+class InvariantError(AssertionError):
+    pass
+
+
+@dataclass
+class ChunkResult:
+    games: int = 0
+    operations: int = 0
+    elapsed: float = 0.0
+    op_counts: Counter = field(default_factory=Counter)
+    # Calls that returned {"ok": True}; only names returning result dicts appear.
+    op_ok: Counter = field(default_factory=Counter)
+    op_seconds: Dict[str, float] = field(default_factory=dict)
+    winners: Counter = field(default_factory=Counter)
+    failures: List[Tuple[int, str]] = field(default_factory=list)
+
+
+class GameSimulator:
+    MAX_STEPS = 600
+    # Relative weights of the random in-game actions.
+    ACTION_WEIGHTS = {
+        "view": 40,
+        "task": 25,
+        "kill": 6,
+        "report": 4,
+        "emergency": 2,
+        "vote": 20,
+        "sabotage": 3,
+        "vitals": 3,
+        "leave": 1,
+        "wait": 8,
+    }
+
+    def __init__(self, seed: int, clock: SimClock) -> None:
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.op_counts: Counter = Counter()
+        self.op_ok: Counter = Counter()
+        self.op_seconds: Dict[str, float] = {}
+        self.lobby: Optional[GameState] = None
+        self._end_info: Optional[Dict[str, object]] = None
+
+    def _call(self, name: str, fn: Callable[..., object], *args: object) -> object:
+        started = time.perf_counter()
+        result = fn(*args)
+        self.op_seconds[name] = self.op_seconds.get(name, 0.0) + time.perf_counter() - started
+        self.op_counts[name] += 1
+        if isinstance(result, dict):
+            self.op_ok[name] += bool(result.get("ok"))
+        self._check_invariants(name)
+        return result
+
+    def _fail(self, message: str) -> None:
+        raise InvariantError(f"seed={self.seed}: {message}")
+
+    def _check_invariants(self, op: str) -> None:
+        lobby = self.lobby
+        if lobby is None:
+            return
+        with lobby._lock:
+            violation = lobby_invariant_violation(lobby)
+            if violation:
+                self._fail(f"after {op}: {violation}")
+            if lobby.status == "ended":
+                if self._end_info is None:
+                    self._end_info = lobby.end_info
+                elif lobby.end_info is not self._end_info:
+                    self._fail(f"after {op}: end_info replaced ({self._end_info} -> {lobby.end_info})")
+            elif self._end_info is not None:
+                self._fail(f"after {op}: status {lobby.status} after game ended")
+
+    def run_game(self, game_index: int) -> Optional[str]:
+        random.seed(self.seed)
+        self._end_info = None
+        lobby = GameState(code=f"S{game_index % 10000:04d}")
+        self.lobby = lobby
+        player_count = self.rng.randint(3, 10)
+        lobby.config["impostors"] = 1 if player_count < 7 else 2
+        lobby.config["large_lobby"] = self.rng.random() < 0.25
+        lobby.config["required_players"] = min(player_count, GameState.CONFIG_LIMITS["required_players"]["max"])
+
+        players = [self._call("add_player", lobby.add_player, f"P{i}") for i in range(player_count)]
+        for player in players:
+            self._call("toggle_ready", lobby.toggle_ready, player.player_id, True)
+        started = self._call("start_game", lobby.start_game)
+        if not started.get("ok"):
+            self._fail(f"start_game failed: {started}")
+
+        ids = [player.player_id for player in players]
+        for _ in range(self.MAX_STEPS):
+            if lobby.status == "ended":
+                break
+            self._step(lobby, self.rng.choice(ids))
+        winner = lobby.end_info.get("winner") if lobby.end_info else None
+        self._end_info = None
+        self._call("reset_to_lobby", lobby.reset_to_lobby)
+        self.lobby = None
+        return winner
+
+    def _step(self, lobby: GameState, player_id: str) -> None:
+        rng = self.rng
+        actions = list(self.ACTION_WEIGHTS)
+        action = rng.choices(actions, weights=[self.ACTION_WEIGHTS[a] for a in actions])[0]
+        player = lobby.players.get(player_id)
+        if player is None:
+            return
+
+        if action == "view":
+            self._call("player_view", lobby.player_view, player_id)
+        elif action == "task":
+            tasks = [task for group in player.tasks.values() for task in group]
+            if tasks:
+                task = rng.choice(tasks)
+                done = not task.done if rng.random() < 0.1 else True
+                self._call("mark_task", lobby.mark_task, player_id, task.task_id, done)
+        elif action == "kill":
+            targets = [p.player_id for p in lobby.players.values() if p.alive and not p.left_game]
+            if targets:
+                self._call("impostor_kill", lobby.impostor_kill, player_id, rng.choice(targets))
+        elif action == "report":
+            bodies = [p.player_id for p in lobby.players.values() if not p.alive]
+            if bodies:
+                self._call("start_meeting", lobby.start_meeting, player_id, rng.choice(bodies))
+        elif action == "emergency":
+            self._call("call_emergency_meeting", lobby.call_emergency_meeting, player_id)
+        elif action == "vote":
+            if lobby.status != "meeting" or not lobby.meeting:
+                return
+            if lobby.meeting["voting_starts_at"] > self.clock.time():
+                self.clock.advance(GameState.MEETING_VOTE_DELAY)
+            choices = [p.player_id for p in lobby.players.values() if p.alive and not p.left_game]
+            target = rng.choice(choices + [GameState.SKIP_VOTE])
+            was_alive = player.alive
+            result = self._call("cast_vote", lobby.cast_vote, player_id, target)
+            if not was_alive and result.get("ok"):
+                self._fail(f"dead player {player_id} voted")
+        elif action == "sabotage":
+            self._call("impostor_sabotage", lobby.impostor_sabotage, player_id)
+        elif action == "vitals":
+            self._call("medic_activate_vitals", lobby.medic_activate_vitals, player_id)
+        elif action == "leave":
+            self._call("remove_player", lobby.remove_player, player_id)
+        else:
+            self.clock.advance(rng.uniform(1, 30))
+
+
+def _install_clock() -> SimClock:
+    clock = SimClock(start=1_700_000_000.0)
+    # Roles read the time through GameState.now(), so this reaches them too.
+    app.time = clock
+    return clock
+
+
+def run_chunk(args: Tuple[int, int]) -> ChunkResult:
+    first_seed, count = args
+    clock = _install_clock()
+    result = ChunkResult()
+    started = time.perf_counter()
+    for offset in range(count):
+        seed = first_seed + offset
+        simulator = GameSimulator(seed, clock)
+        try:
+            winner = simulator.run_game(offset)
+        except InvariantError as exc:
+            result.failures.append((seed, str(exc)))
+        else:
+            result.winners[winner or "none"] += 1
+        result.games += 1
+        result.op_counts.update(simulator.op_counts)
+        result.op_ok.update(simulator.op_ok)
+        for name, seconds in simulator.op_seconds.items():
+            result.op_seconds[name] = result.op_seconds.get(name, 0.0) + seconds
+    result.elapsed = time.perf_counter() - started
+    result.operations = sum(result.op_counts.values())
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk", type=int, default=250, help="games per pool task")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    chunks = [
+        (args.seed + start, min(args.chunk, args.games - start))
+        for start in range(0, args.games, args.chunk)
+    ]
+    wall_started = time.perf_counter()
+    if args.workers <= 1:
+        results = [run_chunk(chunk) for chunk in chunks]
+    else:
+        with multiprocessing.Pool(args.workers) as pool:
+            results = pool.map(run_chunk, chunks)
+    wall = time.perf_counter() - wall_started
+
+    total = ChunkResult()
+    for chunk in results:
+        total.games += chunk.games
+        total.operations += chunk.operations
+        total.elapsed += chunk.elapsed
+        total.op_counts.update(chunk.op_counts)
+        total.op_ok.update(chunk.op_ok)
+        total.winners.update(chunk.winners)
+        total.failures.extend(chunk.failures)
+        for name, seconds in chunk.op_seconds.items():
+            total.op_seconds[name] = total.op_seconds.get(name, 0.0) + seconds
+
+    op_time = sum(total.op_seconds.values())
+    per_core = total.operations / op_time if op_time else 0.0
+    harness_per_core = total.operations / total.elapsed if total.elapsed else 0.0
+    print(f"games={total.games} workers={args.workers} wall={wall:.2f}s")
+    print(
+        f"operations={total.operations} ops/s/core={per_core:,.0f} "
+        f"(with harness {harness_per_core:,.0f}) ops/s total={total.operations / wall:,.0f}"
+    )
+    print(f"winners={dict(total.winners)}")
+    print(f"{'operation':<24}{'calls':>12}{'ok':>12}{'us/call':>12}")
+    for name, calls in total.op_counts.most_common():
+        micros = total.op_seconds.get(name, 0.0) / calls * 1e6
+        print(f"{name:<24}{calls:>12}{total.op_ok.get(name, ''):>12}{micros:>12.2f}")
+    if total.failures:
+        print(f"{len(total.failures)} invariant violation(s):", file=sys.stderr)
+        for seed, message in total.failures[:20]:
+            print(f"  {message}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+const lobbiesEl = document.getElementById("admin-lobbies");
+const playersEl = document.getElementById("admin-players");
+const rateEl = document.getElementById("admin-rate");
+const gamesEl = document.getElementById("admin-games");
+const byStatusEl = document.getElementById("admin-by-status");
+const endReasonsEl = document.getElementById("admin-end-reasons");
+const admissionEl = document.getElementById("admin-admission");
+const rowsEl = document.getElementById("admin-lobby-rows");
+const prevBtn = document.getElementById("admin-prev");
+const nextBtn = document.getElementById("admin-next");
+const pageEl = document.getElementById("admin-page");
+const historyEl = document.getElementById("admin-history");
+const historyLengthEl = document.getElementById("admin-history-length");
+const historyReportsEl = document.getElementById("admin-history-reports");
+const historyRowsEl = document.getElementById("admin-history-rows");
+const historyCurveEl = document.getElementById("admin-history-curve");
+
+const REFRESH_INTERVAL = 5000;
+const PAGE_SIZE = 50;
+const HISTORY_REFRESH_INTERVAL = 60000;
+
+let sortKey = "idle";
+let descending = false;
+let cursor = 0;
+let nextCursor = null;
+
+function describeCounts(counts) {
+    const entries = Object.keys(counts || {}).map(function (key) {
+        return key + ": " + counts[key];
+    });
+    return entries.length ? entries.join(", ") : "-";
+}
+
+function fetchStats() {
+    return fetch("/api/admin/stats")
+        .then(function (response) {
+            return response.json();
+        })
+        .then(function (data) {
+            if (!data.ok) {
+                throw new Error(data.error || "Erro ao carregar estatisticas.");
+            }
+            lobbiesEl.textContent = data.lobbies;
+            playersEl.textContent = data.playersOnline;
+            rateEl.textContent = data.startedThisMinute + " / " + data.endedThisMinute;
+            gamesEl.textContent = data.gamesStarted + " / " + data.gamesEnded;
+            byStatusEl.textContent = "Por estado: " + describeCounts(data.lobbiesByStatus);
+            endReasonsEl.textContent = "Fins de jogo: " + describeCounts(data.endReasons);
+            if (data.admission) {
+                admissionEl.textContent =
+                    "Pedidos rejeitados (429): " + data.admission.shed + " de " +
+                    (data.admission.shed + data.admission.admitted) + " - " +
+                    describeCounts(data.admission.shedByReason);
+            }
+        });
+}
+
+function renderRows(items) {
+    rowsEl.innerHTML = "";
+    items.forEach(function (lobby) {
+        const row = document.createElement("tr");
+        const meeting = lobby.meeting
+            ? lobby.meeting.type + " (" + Math.max(0, lobby.meeting.endsAt - Math.floor(Date.now() / 1000)) + "s)"
+            : "-";
+        [lobby.code, lobby.status, lobby.playerCount, lobby.round, lobby.idleSeconds + "s", meeting].forEach(
+            function (value) {
+                const cell = document.createElement("td");
+                cell.textContent = value;
+                row.appendChild(cell);
+            }
+        );
+        rowsEl.appendChild(row);
+    });
+}
+
+function fetchLobbies() {
+    const params = new URLSearchParams({
+        sort: sortKey,
+        order: descending ? "desc" : "asc",
+        cursor: String(cursor),
+        limit: String(PAGE_SIZE)
+    });
+    return fetch("/api/admin/lobbies?" + params.toString())
+        .then(function (response) {
+            return response.json();
+        })
+        .then(function (data) {
+            if (!data.ok) {
+                throw new Error(data.error || "Erro ao carregar lobbies.");
+            }
+            nextCursor = data.nextCursor;
+            renderRows(data.items);
+            const last = Math.min(cursor + data.items.length, data.total);
+            pageEl.textContent = data.total ? cursor + 1 + "-" + last + " de " + data.total : "Sem lobbies.";
+            prevBtn.disabled = cursor === 0;
+            nextBtn.disabled = nextCursor === null;
+        });
+}
+
+function describeSeconds(value) {
+    return value === null || value === undefined ? "-" : value + "s";
+}
+
+function renderHistory(data) {
+    const length = data.gameLength;
+    historyLengthEl.textContent =
+        length.games + " jogos, duracao media " + describeSeconds(length.averageSeconds) +
+        " (min " + describeSeconds(length.minSeconds) + ", max " + describeSeconds(length.maxSeconds) + ").";
+    const reports = data.killToReport;
+    historyReportsEl.textContent =
+        "Mortes reportadas: " + reports.reported + " de " + reports.kills +
+        ", tempo ate report media " + describeSeconds(reports.averageSeconds) +
+        ", p50 " + describeSeconds(reports.p50Seconds) + ", p90 " + describeSeconds(reports.p90Seconds) + ".";
+    historyRowsEl.innerHTML = "";
+    data.winRates.forEach(function (entry) {
+        const row = document.createElement("tr");
+        [entry.impostors, entry.games, Math.round(entry.impostorWinRate * 100) + "%"].forEach(function (value) {
+            const cell = document.createElement("td");
+            cell.textContent = value;
+            row.appendChild(cell);
+        });
+        historyRowsEl.appendChild(row);
+    });
+    const curve = data.taskCompletion.curve.map(function (point) {
+        return point.seconds + "s: " + Math.round(point.completedRate * 100) + "%";
+    });
+    historyCurveEl.textContent = "Tarefas concluidas ao longo do jogo: " + (curve.length ? curve.join(", ") : "-");
+    historyEl.classList.remove("hidden");
+}
+
+function fetchHistory() {
+    fetch("/api/admin/history")
+        .then(function (response) {
+            return response.json();
+        })
+        .then(function (data) {
+            if (data.ok) {
+                renderHistory(data);
+            }
+        })
+        .catch(function (error) {
+            console.error(error);
+        })
+        .finally(function () {
+            setTimeout(fetchHistory, HISTORY_REFRESH_INTERVAL);
+        });
+}
+
+function refresh() {
+    Promise.all([fetchStats(), fetchLobbies()])
+        .catch(function (error) {
+            console.error(error);
+        })
+        .finally(function () {
+            setTimeout(refresh, REFRESH_INTERVAL);
+        });
+}
+
+function setup() {
+    document.querySelectorAll(".admin-table th[data-sort]").forEach(function (header) {
+        header.addEventListener("click", function () {
+            const key = header.dataset.sort;
+            descending = key === sortKey ? !descending : false;
+            sortKey = key;
+            cursor = 0;
+            fetchLobbies().catch(console.error);
+        });
+    });
+    prevBtn.addEventListener("click", function () {
+        cursor = Math.max(0, cursor - PAGE_SIZE);
+        fetchLobbies().catch(console.error);
+    });
+    nextBtn.addEventListener("click", function () {
+        if (nextCursor !== null) {
+            cursor = nextCursor;
+            fetchLobbies().catch(console.error);
+        }
+    });
+    refresh();
+    fetchHistory();
+}
+
+window.addEventListener("DOMContentLoaded", setup);
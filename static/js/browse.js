@@ -0,0 +1,113 @@
+const browseList = document.getElementById("browse-list");
+const browseEmpty = document.getElementById("browse-empty");
+const browseMore = document.getElementById("browse-more");
+const browseSort = document.getElementById("browse-sort");
+const joinCodeInput = document.getElementById("join-code");
+const joinNameInput = document.getElementById("join-name");
+
+const BROWSE_POLL_INTERVAL = 5000;
+const BROWSE_PAGE_SIZE = 20;
+
+let browseCursor = null;
+let browseTimer = null;
+// Extra pages the user asked for; polling only refreshes the first one.
+let browsePages = 1;
+
+function fetchLobbies(cursor) {
+    const params = new URLSearchParams({ sort: browseSort.value, limit: String(BROWSE_PAGE_SIZE) });
+    if (cursor) {
+        params.set("cursor", cursor);
+    }
+    // "no-cache" revalidates with the stored ETag, so unchanged pages cost a 304.
+    return fetch("/api/lobbies?" + params.toString(), { cache: "no-cache" }).then(function (response) {
+        return response.json().then(function (data) {
+            if (!response.ok || !data.ok) {
+                throw new Error(data.error || "Nao foi possivel carregar os lobbies.");
+            }
+            return data;
+        });
+    });
+}
+
+function lobbyEntry(item) {
+    const li = document.createElement("li");
+    const info = document.createElement("div");
+    info.classList.add("player-info");
+    const code = document.createElement("span");
+    code.classList.add("player-name");
+    code.textContent = item.code;
+    const details = document.createElement("span");
+    details.classList.add("muted", "small");
+    details.textContent = item.playerCount + "/" + item.capacity + " jogadores" + (item.host ? " - " + item.host : "");
+    info.appendChild(code);
+    info.appendChild(details);
+    const button = document.createElement("button");
+    button.type = "button";
+    button.classList.add("ghost", "small");
+    button.textContent = "Escolher";
+    button.addEventListener("click", function () {
+        joinCodeInput.value = item.code;
+        joinNameInput.focus();
+    });
+    li.appendChild(info);
+    li.appendChild(button);
+    return li;
+}
+
+function renderLobbies(items, append) {
+    if (!append) {
+        browseList.innerHTML = "";
+    }
+    items.forEach(function (item) {
+        browseList.appendChild(lobbyEntry(item));
+    });
+    browseEmpty.classList.toggle("hidden", browseList.children.length > 0);
+    browseMore.classList.toggle("hidden", !browseCursor);
+}
+
+function refreshLobbies() {
+    if (browsePages > 1) {
+        return;
+    }
+    fetchLobbies(null)
+        .then(function (data) {
+            browseCursor = data.nextCursor;
+            renderLobbies(data.items, false);
+        })
+        .catch(function (error) {
+            console.error(error);
+        });
+}
+
+function scheduleBrowse() {
+    clearInterval(browseTimer);
+    browseTimer = setInterval(function () {
+        if (!document.hidden) {
+            refreshLobbies();
+        }
+    }, BROWSE_POLL_INTERVAL);
+}
+
+if (browseList && browseSort) {
+    browseMore.addEventListener("click", function () {
+        browseMore.disabled = true;
+        fetchLobbies(browseCursor)
+            .then(function (data) {
+                browsePages += 1;
+                browseCursor = data.nextCursor;
+                renderLobbies(data.items, true);
+            })
+            .catch(function (error) {
+                console.error(error);
+            })
+            .finally(function () {
+                browseMore.disabled = false;
+            });
+    });
+    browseSort.addEventListener("change", function () {
+        browsePages = 1;
+        refreshLobbies();
+    });
+    refreshLobbies();
+    scheduleBrowse();
+}
@@ -25,6 +25,11 @@ const gameOverOverlay = document.getElementById("game-over-overlay");
 const gameOverTitleEl = document.getElementById("game-over-title");
 const gameOverTextEl = document.getElementById("game-over-text");
 const gameOverResetBtn = document.getElementById("game-over-reset");
+const gameReportEl = document.getElementById("game-report");
+const gameReportHeadlineEl = document.getElementById("game-report-headline");
+const gameReportPlayersEl = document.getElementById("game-report-players");
+const gameReportKillsEl = document.getElementById("game-report-kills");
+const gameReportMeetingsEl = document.getElementById("game-report-meetings");
 const impostorRevealEl = document.getElementById("impostor-reveal");
 const impostorRevealContent = impostorRevealEl ? impostorRevealEl.querySelector(".reveal-content") : null;
 const deathNoteEl = document.getElementById("death-note");
@@ -47,15 +52,29 @@ const medicPanel = document.getElementById("medic-panel");
 const medicVitalsEl = document.getElementById("medic-vitals");
 const medicActivateBtn = document.getElementById("medic-activate-btn");
 const medicStatusEl = document.getElementById("medic-status");
+const chatLogEl = document.getElementById("meeting-chat-log");
+const chatForm = document.getElementById("meeting-chat-form");
+const chatInput = document.getElementById("meeting-chat-input");
 
 const POLL_INTERVAL = 4000;
+const ACTION_BATCH_DELAY = 120;
+const ACTION_RETRY_DELAY = 800;
+const SOCKET_RETRY_MIN = 1000;
+const SOCKET_RETRY_MAX = 15000;
+const WIRE_MIMETYPE = "application/vnd.msgpack";
+const WIRE_REF_EXT = 1;
 const SKIP_VOTE = "skip";
 const PROGRESS_FLASH_CLASS = "progress-flash";
+const CHAT_POLL_INTERVAL = 1500;
+const CLOCK_SAMPLES = 5;
+const CLOCK_RESYNC_INTERVAL = 10 * 60 * 1000;
 
 let pollTimer = null;
-let killCountdownTimer = null;
-let meetingCountdownTimer = null;
-let killRemaining = 0;
+// Deadlines are server epoch seconds; one timer renders every countdown from them.
+let countdownTimer = null;
+let clockOffsetMs = 0;
+let killReadyAt = 0;
+let meetingEndsAt = 0;
 let isImpostor = false;
 let isAlive = true;
 let currentStatus = "lobby";
@@ -67,20 +86,40 @@ let isFetching = false;
 let fetchPending = false;
 let isLeader = false;
 let killTargets = [];
+let killTargetsNext = null;
 let deadPlayersList = [];
+let deadPlayersNext = null;
+let meetingExtraPlayers = [];
+let meetingExtraNext = null;
 let reportableBodies = [];
 let votingLocked = false;
-let votingRemaining = 0;
-let meetingVoteCountdownTimer = null;
+let votingStartsAt = 0;
 let currentMeetingData = null;
 let specialRole = null;
 let isMedic = false;
-let commsCountdownTimer = null;
-let currentCommsRemaining = 0;
 let commsActive = false;
 let commsInProgress = false;
-let commsGlobalRemaining = 0;
-let medicAutoRefreshTimer = null;
+let commsEndsAt = 0;
+let medicVitalsUntil = 0;
+let medicSummaryText = "";
+let lastMedicData = null;
+let lastPlayerView = null;
+let nextPollMs = POLL_INTERVAL;
+let pendingActions = [];
+let actionFlushTimer = null;
+let socket = null;
+let socketReady = false;
+let socketView = null;
+let socketActionId = 0;
+let socketPending = {};
+let socketRetryMs = SOCKET_RETRY_MIN;
+let gameReportLoaded = false;
+let chatCursor = 0;
+let chatPollTimer = null;
+let chatFetching = false;
+let wireTableId = "";
+let wireStrings = [];
+const wireTextDecoder = window.TextDecoder ? new TextDecoder() : null;
 
 function translateRole(role, special) {
     if (role === "impostor") {
@@ -160,12 +199,52 @@ function renderTasks(tasks) {
     renderTaskGroup(tasksFastEl, tasks && tasks.fast);
 }
 
+function retryAfterDelay(response) {
+    const seconds = parseFloat(response.headers.get("Retry-After"));
+    return isNaN(seconds) ? POLL_INTERVAL : Math.max(ACTION_RETRY_DELAY, seconds * 1000);
+}
+
 function parseJsonSafe(response) {
     return response.json().catch(function () {
         return {};
     });
 }
 
+function fetchPlayerList(kind, cursor) {
+    const url = "/api/players?kind=" + encodeURIComponent(kind) + "&cursor=" + cursor;
+    return fetch(url)
+        .then(parseJsonSafe)
+        .then(function (data) {
+            if (!data || !data.ok) {
+                throw new Error(data && data.error ? data.error : "Nao foi possivel carregar a lista.");
+            }
+            return data;
+        });
+}
+
+function appendLoadMore(container, kind, cursor, onLoaded) {
+    if (!container || typeof cursor !== "number") {
+        return;
+    }
+    const btn = document.createElement("button");
+    btn.type = "button";
+    btn.classList.add("ghost", "small", "load-more");
+    btn.textContent = "Ver mais";
+    btn.addEventListener("click", function () {
+        btn.disabled = true;
+        fetchPlayerList(kind, cursor)
+            .then(function (data) {
+                onLoaded(Array.isArray(data.items) ? data.items : [], data.nextCursor);
+            })
+            .catch(function (error) {
+                console.error(error);
+                alert(error.message);
+                btn.disabled = false;
+            });
+    });
+    container.appendChild(btn);
+}
+
 function applyProgress(progress) {
     if (!progressBarEl || !progressLabelEl) {
         return;
@@ -222,7 +301,7 @@ function updateKillUI() {
         return;
     }
     impostorToolsEl.classList.remove("hidden");
-    const remaining = Math.max(0, killRemaining);
+    const remaining = secondsUntil(killReadyAt);
     const availableTargets = Array.isArray(killTargets) ? killTargets.length : 0;
     if (killBtn) {
         killBtn.disabled = remaining > 0 || availableTargets === 0;
@@ -241,25 +320,100 @@ function updateKillUI() {
     updateSabotageStatus();
 }
 
-function startKillCountdown() {
-    stopKillCountdown();
-    if (killRemaining <= 0) {
-        return;
+function serverNow() {
+    return (Date.now() + clockOffsetMs) / 1000;
+}
+
+function secondsUntil(deadline) {
+    return deadline ? Math.max(0, Math.ceil(deadline - serverNow())) : 0;
+}
+
+function sampleClock() {
+    const sentAt = Date.now();
+    const started = performance.now();
+    return fetch("/api/time", { cache: "no-store" })
+        .then(function (response) {
+            return response.json();
+        })
+        .then(function (data) {
+            const roundTrip = performance.now() - started;
+            return { roundTrip: roundTrip, offset: data.serverTime * 1000 - (sentAt + roundTrip / 2) };
+        });
+}
+
+function syncClock() {
+    // NTP-style: the sample with the shortest round trip has the smallest error bound.
+    const samples = [];
+    let chain = Promise.resolve();
+    for (let index = 0; index < CLOCK_SAMPLES; index += 1) {
+        chain = chain.then(sampleClock).then(
+            function (sample) {
+                samples.push(sample);
+            },
+            function (error) {
+                console.error(error);
+            }
+        );
     }
-    killCountdownTimer = setInterval(function () {
-        if (killRemaining > 0) {
-            killRemaining -= 1;
-            updateKillUI();
+    return chain.then(function () {
+        if (!samples.length) {
+            return;
+        }
+        samples.sort(function (a, b) {
+            return a.roundTrip - b.roundTrip;
+        });
+        clockOffsetMs = samples[0].offset;
+        tickCountdowns();
+    });
+}
+
+function renderCountdowns() {
+    updateKillUI();
+    if (meetingTimerEl && meetingEndsAt) {
+        meetingTimerEl.textContent = secondsUntil(meetingEndsAt) + "s";
+    }
+    if (votingLocked) {
+        if (secondsUntil(votingStartsAt) > 0) {
+            renderVotingLock();
         } else {
-            stopKillCountdown();
+            stopVotingDelay();
+            if (currentMeetingData) {
+                renderMeetingOptions(currentMeetingData);
+                renderMeetingStatus(currentMeetingData);
+            }
+        }
+    }
+    if (commsInProgress && secondsUntil(commsEndsAt) <= 0) {
+        commsInProgress = false;
+        commsEndsAt = 0;
+        hideCommsOverlay();
+        if (lastPlayerView) {
+            renderCallButtons(lastPlayerView);
         }
-    }, 1000);
+    } else if (commsActive && commsCountdownEl) {
+        commsCountdownEl.textContent = secondsUntil(commsEndsAt);
+    }
+    if (medicVitalsUntil) {
+        if (secondsUntil(medicVitalsUntil) > 0) {
+            renderMedicStatus();
+        } else {
+            renderMedicPanel(lastMedicData);
+        }
+    }
 }
 
-function stopKillCountdown() {
-    if (killCountdownTimer) {
-        clearInterval(killCountdownTimer);
-        killCountdownTimer = null;
+function tickCountdowns() {
+    renderCountdowns();
+    const pending = [killReadyAt, votingStartsAt, meetingEndsAt, commsEndsAt, medicVitalsUntil].some(
+        function (deadline) {
+            return secondsUntil(deadline) > 0;
+        }
+    );
+    if (pending && !countdownTimer) {
+        countdownTimer = setInterval(tickCountdowns, 1000);
+    } else if (!pending && countdownTimer) {
+        clearInterval(countdownTimer);
+        countdownTimer = null;
     }
 }
 
@@ -278,43 +432,29 @@ function playImpostorReveal() {
 
 function stopVotingDelay() {
     votingLocked = false;
-    votingRemaining = 0;
-    if (meetingVoteCountdownTimer) {
-        clearInterval(meetingVoteCountdownTimer);
-        meetingVoteCountdownTimer = null;
-    }
+    votingStartsAt = 0;
     if (meetingOverlay) {
         meetingOverlay.classList.remove("intro-phase");
     }
 }
 
-function startVotingDelay(seconds) {
-    stopVotingDelay();
-    if (!seconds || seconds <= 0) {
+function startVotingDelay(startsAt) {
+    votingStartsAt = typeof startsAt === "number" ? startsAt : 0;
+    votingLocked = secondsUntil(votingStartsAt) > 0;
+    if (!votingLocked) {
+        stopVotingDelay();
         return;
     }
-    votingLocked = true;
-    votingRemaining = seconds;
     if (meetingOverlay) {
         meetingOverlay.classList.add("intro-phase");
     }
+    renderVotingLock();
+}
+
+function renderVotingLock() {
     if (meetingLockEl) {
-        meetingLockEl.textContent = "Votacoes iniciam em " + votingRemaining + "s";
+        meetingLockEl.textContent = "Votacoes iniciam em " + secondsUntil(votingStartsAt) + "s";
     }
-    meetingVoteCountdownTimer = setInterval(function () {
-        if (votingRemaining > 0) {
-            votingRemaining -= 1;
-            if (meetingLockEl) {
-                meetingLockEl.textContent = "Votacoes iniciam em " + votingRemaining + "s";
-            }
-        } else {
-            stopVotingDelay();
-            if (currentMeetingData) {
-                renderMeetingOptions(currentMeetingData);
-                renderMeetingStatus(currentMeetingData);
-            }
-        }
-    }, 1000);
 }
 
 function renderMeetingDeceased(meeting) {
@@ -397,8 +537,8 @@ function renderMeetingStatus(meeting) {
         }
     }
     if (meetingLockEl) {
-        if (votingLocked && votingRemaining > 0) {
-            meetingLockEl.textContent = "Votacoes iniciam em " + votingRemaining + "s";
+        if (votingLocked) {
+            renderVotingLock();
         } else {
             meetingLockEl.textContent = "";
         }
@@ -410,10 +550,17 @@ function renderMeetingStatus(meeting) {
         meetingFeedbackEl.textContent = "";
         return;
     }
-    if (votingLocked && votingRemaining > 0) {
+    if (votingLocked) {
         meetingFeedbackEl.textContent = "Aguardem antes de votar.";
         return;
     }
+    if (typeof meeting.aliveCount === "number" && typeof meeting.votedCount === "number") {
+        meetingFeedbackEl.textContent =
+            meeting.votedCount >= meeting.aliveCount
+                ? "Todos ja votaram."
+                : "Votaram " + meeting.votedCount + " de " + meeting.aliveCount + ".";
+        return;
+    }
     const pending = meeting.alivePlayers.filter(function (player) {
         return !player.hasVoted;
     });
@@ -434,7 +581,16 @@ function renderMeetingOptions(meeting) {
     meetingOptionsEl.innerHTML = "";
     const myVote = meeting ? meeting.myVote : null;
     const disabled = !isAlive || votingLocked;
-    const alivePlayers = meeting && meeting.alivePlayers ? meeting.alivePlayers : [];
+    const firstPage = meeting && meeting.alivePlayers ? meeting.alivePlayers : [];
+    const shownIds = new Set(firstPage.map(function (player) {
+        return player.id;
+    }));
+    const alivePlayers = firstPage.concat(meetingExtraPlayers.filter(function (player) {
+        return !shownIds.has(player.id);
+    }));
+    const nextCursor = meetingExtraPlayers.length > 0
+        ? meetingExtraNext
+        : (meeting ? meeting.alivePlayersNext : null);
 
     for (let i = 0; i < alivePlayers.length; i += 1) {
         const player = alivePlayers[i];
@@ -477,6 +633,11 @@ function renderMeetingOptions(meeting) {
         btn.appendChild(option);
         meetingOptionsEl.appendChild(btn);
     }
+    appendLoadMore(meetingOptionsEl, "alivePlayers", nextCursor, function (items, next) {
+        meetingExtraPlayers = meetingExtraPlayers.concat(items);
+        meetingExtraNext = next;
+        renderMeetingOptions(currentMeetingData);
+    });
 
     const skipBtn = document.createElement("button");
     skipBtn.type = "button";
@@ -492,27 +653,15 @@ function renderMeetingOptions(meeting) {
     meetingOptionsEl.appendChild(skipBtn);
 }
 
-function startMeetingCountdown(seconds) {
-    stopMeetingCountdown();
-    let remaining = Math.max(0, seconds);
-    const update = function () {
-        if (meetingTimerEl) {
-            meetingTimerEl.textContent = remaining + "s";
-        }
-        if (remaining <= 0) {
-            stopMeetingCountdown();
-        }
-        remaining -= 1;
-    };
-    update();
-    meetingCountdownTimer = setInterval(update, 1000);
+function startMeetingCountdown(endsAt) {
+    meetingEndsAt = typeof endsAt === "number" ? endsAt : 0;
+    if (meetingTimerEl) {
+        meetingTimerEl.textContent = secondsUntil(meetingEndsAt) + "s";
+    }
 }
 
 function stopMeetingCountdown() {
-    if (meetingCountdownTimer) {
-        clearInterval(meetingCountdownTimer);
-        meetingCountdownTimer = null;
-    }
+    meetingEndsAt = 0;
 }
 
 function closeKillModal() {
@@ -555,6 +704,11 @@ function renderKillOptions() {
         });
         killOptionsEl.appendChild(btn);
     });
+    appendLoadMore(killOptionsEl, "killTargets", killTargetsNext, function (items, next) {
+        killTargets = killTargets.concat(items);
+        killTargetsNext = next;
+        renderKillOptions();
+    });
 }
 
 function openKillModal() {
@@ -580,27 +734,19 @@ function performKill(targetId) {
     if (killBtn) {
         killBtn.disabled = true;
     }
-    fetch("/api/impostor/kill", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ targetId: targetId })
-    })
-        .then(parseJsonSafe)
+    queueAction({ type: "kill", targetId: targetId })
         .then(function (data) {
             if (!data || !data.ok) {
                 const msg = data && data.error ? data.error : "Nao podes matar neste momento.";
                 throw new Error(msg);
             }
-            killRemaining = typeof data.cooldown === "number" ? data.cooldown : killRemaining;
-            closeKillModal();
-            updateKillUI();
-            if (killRemaining > 0) {
-                startKillCountdown();
+            if (typeof data.killReadyAt === "number") {
+                killReadyAt = data.killReadyAt;
             }
+            closeKillModal();
+            tickCountdowns();
             if (data.gameOver) {
                 showGameOver(data.gameOver);
-            } else {
-                fetchPlayer();
             }
         })
         .catch(function (error) {
@@ -691,6 +837,14 @@ function renderReportOptions() {
         }
         reportOptionsEl.appendChild(btn);
     });
+    appendLoadMore(reportOptionsEl, "deadPlayers", deadPlayersNext, function (items, next) {
+        deadPlayersList = deadPlayersList.concat(items);
+        deadPlayersNext = next;
+        reportableBodies = deadPlayersList.filter(function (body) {
+            return body && !body.reported;
+        });
+        renderReportOptions();
+    });
     if (reportFeedbackEl) {
         if (!hasReportable) {
             reportFeedbackEl.textContent = "Todos os corpos ja foram reportados.";
@@ -712,28 +866,14 @@ function updateSabotageStatus() {
     }
     if (commsInProgress) {
         sabotageStatusEl.textContent =
-            "Comunicacoes voltam em " + Math.max(0, commsGlobalRemaining) + "s";
+            "Comunicacoes voltam em " + secondsUntil(commsEndsAt) + "s";
     } else {
         sabotageStatusEl.textContent = "Comunicacoes disponiveis.";
     }
 }
 
-function stopCommsCountdown() {
-    if (commsCountdownTimer) {
-        clearInterval(commsCountdownTimer);
-        commsCountdownTimer = null;
-    }
-}
-
 function hideCommsOverlay() {
-    const wasActive = commsActive;
-    stopCommsCountdown();
     commsActive = false;
-    currentCommsRemaining = 0;
-    if (wasActive) {
-        commsInProgress = false;
-        commsGlobalRemaining = 0;
-    }
     if (commsOverlay) {
         commsOverlay.classList.add("hidden");
     }
@@ -744,57 +884,24 @@ function hideCommsOverlay() {
     updateKillUI();
 }
 
-function showCommsOverlay(remainingSeconds) {
-    const seconds = Math.max(0, parseInt(remainingSeconds, 10) || 0);
-    if (seconds <= 0) {
-        hideCommsOverlay();
-        return;
-    }
+function showCommsOverlay() {
     commsActive = true;
-    currentCommsRemaining = seconds;
-    commsInProgress = true;
-    commsGlobalRemaining = seconds;
     if (commsCountdownEl) {
-        commsCountdownEl.textContent = seconds;
+        commsCountdownEl.textContent = secondsUntil(commsEndsAt);
     }
     if (commsOverlay) {
         commsOverlay.classList.remove("hidden");
     }
-    stopCommsCountdown();
-    commsCountdownTimer = setInterval(function () {
-        currentCommsRemaining = Math.max(0, currentCommsRemaining - 1);
-        commsGlobalRemaining = currentCommsRemaining;
-        if (commsCountdownEl) {
-            commsCountdownEl.textContent = Math.max(0, currentCommsRemaining);
-        }
-        updateSabotageStatus();
-        if (currentCommsRemaining <= 0) {
-            hideCommsOverlay();
-        }
-    }, 1000);
     updateSabotageStatus();
     updateKillUI();
 }
 
-function clearMedicAutoRefresh() {
-    if (medicAutoRefreshTimer) {
-        clearTimeout(medicAutoRefreshTimer);
-        medicAutoRefreshTimer = null;
+function renderMedicStatus() {
+    if (medicStatusEl) {
+        medicStatusEl.textContent = "Visiveis por " + secondsUntil(medicVitalsUntil) + "s" + medicSummaryText;
     }
 }
 
-function scheduleMedicAutoRefresh(seconds) {
-    clearMedicAutoRefresh();
-    const ms = Math.max(0, parseInt(seconds, 10) || 0) * 1000;
-    if (ms <= 0) {
-        return;
-    }
-    medicAutoRefreshTimer = setTimeout(function () {
-        medicAutoRefreshTimer = null;
-        fetchPlayer();
-    }, ms + 200);
-}
-
 function renderMedicPanel(medicData) {
     if (!medicPanel || !medicVitalsEl) {
         return;
@@ -808,15 +915,17 @@ function renderMedicPanel(medicData) {
         if (medicActivateBtn) {
             medicActivateBtn.disabled = true;
         }
-        clearMedicAutoRefresh();
+        medicVitalsUntil = 0;
         return;
     }
 
     const data = medicData || {};
+    lastMedicData = data;
     const duration = Math.max(1, parseInt(data.duration, 10) || 5);
-    const active = data.active === true;
+    // Expiry is rendered locally; the next state change brings the new flags.
+    const active = data.active === true && secondsUntil(data.until) > 0;
     const ready = data.ready === true;
-    const remaining = Math.max(0, parseInt(data.remaining, 10) || 0);
+    medicVitalsUntil = active ? data.until : 0;
     const vitals = Array.isArray(data.vitals) ? data.vitals.slice() : [];
 
     medicPanel.classList.remove("hidden");
@@ -865,13 +974,13 @@ function renderMedicPanel(medicData) {
                 li.appendChild(stateSpan);
                 medicVitalsEl.appendChild(li);
             });
-        if (medicStatusEl) {
-            medicStatusEl.textContent =
-                "Visiveis por " + Math.max(0, remaining) + "s";
-        }
-        scheduleMedicAutoRefresh(remaining);
+        medicSummaryText = data.vitalsSummary
+            ? " - Vivos " + data.vitalsSummary.alive +
+              ", Mortos " + data.vitalsSummary.dead +
+              ", Sairam " + data.vitalsSummary.left
+            : "";
+        renderMedicStatus();
     } else {
-        clearMedicAutoRefresh();
         const placeholder = document.createElement("li");
         placeholder.classList.add("muted");
         placeholder.textContent = ready
@@ -906,14 +1015,12 @@ function callEmergencyMeeting() {
         return;
     }
     emergencyBtn.disabled = true;
-    fetch("/api/meeting/emergency", { method: "POST" })
-        .then(parseJsonSafe)
+    queueAction({ type: "emergency" })
         .then(function (data) {
             if (!data || !data.ok) {
                 const msg = data && data.error ? data.error : "Nao foi possivel chamar reuniao.";
                 throw new Error(msg);
             }
-            fetchPlayer();
         })
         .catch(function (error) {
             console.error(error);
@@ -934,19 +1041,13 @@ function submitReport(bodyId) {
         reportFeedbackEl.classList.add("hidden");
         reportFeedbackEl.textContent = "";
     }
-    fetch("/api/report", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ bodyId: bodyId })
-    })
-        .then(parseJsonSafe)
+    queueAction({ type: "report", bodyId: bodyId })
         .then(function (data) {
             if (!data || !data.ok) {
                 const msg = data && data.error ? data.error : "Nao foi possivel chamar reuniao.";
                 throw new Error(msg);
             }
             closeReportModal();
-            fetchPlayer();
         })
         .catch(function (error) {
             console.error(error);
@@ -970,6 +1071,11 @@ function showMeeting(meeting) {
     }
     if (meeting && meeting.id !== lastMeetingId) {
         lastMeetingId = meeting.id;
+        if (chatLogEl) {
+            chatLogEl.innerHTML = "";
+        }
+        meetingExtraPlayers = [];
+        meetingExtraNext = null;
         if (meetingFeedbackEl) {
             meetingFeedbackEl.textContent = "";
         }
@@ -977,15 +1083,110 @@ function showMeeting(meeting) {
     }
     currentMeetingData = meeting || null;
     meetingOverlay.classList.remove("hidden");
-    renderMeetingOptions(meeting);
-    renderMeetingDeceased(meeting);
-    if (meeting && typeof meeting.votingStartsIn === "number") {
-        startVotingDelay(meeting.votingStartsIn);
+    if (meeting && typeof meeting.votingStartsAt === "number") {
+        startVotingDelay(meeting.votingStartsAt);
     } else {
         stopVotingDelay();
     }
+    renderMeetingOptions(meeting);
+    renderMeetingDeceased(meeting);
     renderMeetingStatus(meeting);
-    startMeetingCountdown(meeting ? meeting.endsIn || 0 : 0);
+    startMeetingCountdown(meeting ? meeting.endsAt : 0);
+    if (!socketReady) {
+        startChatPolling();
+    }
+}
+
+function appendChatMessages(messages) {
+    if (!chatLogEl || !messages.length) {
+        return;
+    }
+    messages.forEach(function (message) {
+        const li = document.createElement("li");
+        if (message.ghost) {
+            li.classList.add("ghost");
+        }
+        const name = document.createElement("span");
+        name.classList.add("chat-name");
+        name.textContent = message.name + ":";
+        li.appendChild(name);
+        li.appendChild(document.createTextNode(message.text));
+        chatLogEl.appendChild(li);
+    });
+    chatLogEl.scrollTop = chatLogEl.scrollHeight;
+}
+
+function applyChat(data) {
+    if (!data || typeof data.cursor !== "number" || data.cursor <= chatCursor) {
+        return;
+    }
+    // A reconnected socket replays the meeting from the start; skip what is shown.
+    const seen = chatCursor;
+    chatCursor = data.cursor;
+    appendChatMessages((Array.isArray(data.messages) ? data.messages : []).filter(function (message) {
+        return message.id > seen;
+    }));
+}
+
+function fetchChat() {
+    if (chatFetching || socketReady) {
+        return;
+    }
+    chatFetching = true;
+    fetch("/api/meeting/chat?after=" + chatCursor, { cache: "no-store" })
+        .then(function (response) {
+            return parseJsonSafe(response);
+        })
+        .then(function (data) {
+            if (data && data.ok) {
+                applyChat(data);
+            }
+        })
+        .catch(function (error) {
+            console.error(error);
+        })
+        .finally(function () {
+            chatFetching = false;
+        });
+}
+
+function startChatPolling() {
+    if (chatPollTimer) {
+        return;
+    }
+    fetchChat();
+    chatPollTimer = setInterval(fetchChat, CHAT_POLL_INTERVAL);
+}
+
+function stopChatPolling() {
+    if (chatPollTimer) {
+        clearInterval(chatPollTimer);
+        chatPollTimer = null;
+    }
+}
+
+function sendChat(event) {
+    event.preventDefault();
+    const text = chatInput.value.trim();
+    if (!text) {
+        return;
+    }
+    chatInput.value = "";
+    const sent = socketReady
+        ? sendSocketAction({ type: "chat", text: text })
+        : postWithRetry("/api/meeting/chat", JSON.stringify({ text: text }), 1).then(parseJsonSafe);
+    sent.then(function (data) {
+        if (!data || !data.ok) {
+            throw new Error(data && data.error ? data.error : "Nao foi possivel enviar a mensagem.");
+        }
+        fetchChat();
+    }).catch(function (error) {
+        console.error(error);
+        chatInput.value = text;
+        if (meetingFeedbackEl) {
+            meetingFeedbackEl.textContent = error.message;
+        }
+    });
 }
 
 function hideMeeting() {
@@ -999,6 +1200,7 @@ function hideMeeting() {
     }
     stopMeetingCountdown();
     stopVotingDelay();
+    stopChatPolling();
     lastMeetingId = null;
     currentMeetingData = null;
 }
@@ -1100,6 +1302,84 @@ function showGameOver(info) {
         gameOverTextEl.textContent = detail;
     }
     gameOverOverlay.classList.remove("hidden");
+    loadGameReport();
+}
+
+function formatElapsed(seconds) {
+    const total = Math.max(0, Math.round(seconds || 0));
+    const minutes = Math.floor(total / 60);
+    return minutes + "m" + String(total % 60).padStart(2, "0") + "s";
+}
+
+function reportRow(label, detail) {
+    const li = document.createElement("li");
+    const name = document.createElement("span");
+    name.textContent = label;
+    const extra = document.createElement("span");
+    extra.classList.add("muted");
+    extra.textContent = detail;
+    li.appendChild(name);
+    li.appendChild(extra);
+    return li;
+}
+
+const FATE_LABELS = { survived: "sobreviveu", killed: "morto", ejected: "expulso", left: "saiu" };
+const OUTCOME_LABELS = { ejected: "expulsao", skipped: "skip", no_elimination: "empate", no_votes: "sem votos" };
+
+function renderGameReport(report) {
+    const names = {};
+    report.players.forEach(function (player) {
+        names[player.id] = player.name;
+    });
+    const nameOf = function (id) {
+        return names[id] || "?";
+    };
+    gameReportHeadlineEl.textContent =
+        "Duracao " + formatElapsed(report.duration) +
+        (report.timeToFirstKill === null ? "" : " - primeira morte aos " + formatElapsed(report.timeToFirstKill));
+    gameReportPlayersEl.innerHTML = "";
+    report.players.forEach(function (player) {
+        const role = translateRole(player.role, player.specialRole);
+        const detail = player.role === "impostor"
+            ? player.kills + " mortes"
+            : player.tasksDone + "/" + player.tasksTotal + " tarefas";
+        gameReportPlayersEl.appendChild(reportRow(
+            player.name + " (" + role + ")",
+            detail + ", " + player.votesCast + " votos, " + (FATE_LABELS[player.fate] || player.fate)
+        ));
+    });
+    gameReportKillsEl.innerHTML = "";
+    report.kills.forEach(function (kill) {
+        gameReportKillsEl.appendChild(reportRow(nameOf(kill.killer) + " matou " + nameOf(kill.victim), formatElapsed(kill.at)));
+    });
+    gameReportMeetingsEl.innerHTML = "";
+    report.meetings.forEach(function (meeting, index) {
+        const outcome = meeting.ejected ? nameOf(meeting.ejected) + " expulso" : OUTCOME_LABELS[meeting.outcome] || meeting.outcome;
+        gameReportMeetingsEl.appendChild(reportRow(
+            "Reuniao " + (index + 1) + " - " + nameOf(meeting.caller),
+            meeting.votesCast + " votos, " + outcome
+        ));
+    });
+    gameReportEl.classList.remove("hidden");
+}
+
+function loadGameReport() {
+    if (!gameReportEl || gameReportLoaded) {
+        return;
+    }
+    gameReportLoaded = true;
+    fetch("/api/game/summary")
+        .then(parseJsonSafe)
+        .then(function (data) {
+            if (!data || !data.ok) {
+                throw new Error(data && data.error ? data.error : "Resumo indisponivel.");
+            }
+            renderGameReport(data);
+        })
+        .catch(function (error) {
+            console.error(error);
+            gameReportLoaded = false;
+        });
 }
 
 function hideGameOver() {
@@ -1107,29 +1387,26 @@ function hideGameOver() {
         return;
     }
     gameOverOverlay.classList.add("hidden");
+    gameReportLoaded = false;
+    if (gameReportEl) {
+        gameReportEl.classList.add("hidden");
+    }
 }
 
 function updateTaskStatus(taskId, done) {
-    return fetch("/api/tasks/complete", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ taskId: taskId, done: done })
-    })
-        .then(function (response) {
-            return parseJsonSafe(response).then(function (data) {
-                if (!response.ok || !data.ok) {
-                    const msg = data && data.error ? data.error : "Nao foi possivel marcar a tarefa.";
-                    throw new Error(msg);
-                }
-                if (data.progress) {
-                    applyProgress(data.progress);
-                }
-                if (data.gameOver) {
-                    showGameOver(data.gameOver);
-                }
-                return data;
-            });
-        });
+    return queueAction({ type: "mark_task", taskId: taskId, done: done }).then(function (data) {
+        if (!data || !data.ok) {
+            const msg = data && data.error ? data.error : "Nao foi possivel marcar a tarefa.";
+            throw new Error(msg);
+        }
+        if (data.progress) {
+            applyProgress(data.progress);
+        }
+        if (data.gameOver) {
+            showGameOver(data.gameOver);
+        }
+        return data;
+    });
 }
 
 function sendVote(target) {
@@ -1139,30 +1416,24 @@ function sendVote(target) {
     if (meetingFeedbackEl) {
         meetingFeedbackEl.textContent = "A enviar voto...";
     }
-    return fetch("/api/meeting/vote", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ target: target })
-    })
-        .then(function (response) {
-            return parseJsonSafe(response).then(function (data) {
-                if (!response.ok || !data.ok) {
-                    if (data && typeof data.delay === "number") {
-                        startVotingDelay(data.delay);
-                        if (meetingFeedbackEl) {
-                            meetingFeedbackEl.textContent =
-                                (data.error || "Ainda nao podes votar.") + " (" + data.delay + "s)";
-                        }
-                        return;
+    return queueAction({ type: "vote", target: target })
+        .then(function (data) {
+            if (!data || !data.ok) {
+                if (data && typeof data.votingStartsAt === "number") {
+                    startVotingDelay(data.votingStartsAt);
+                    tickCountdowns();
+                    if (meetingFeedbackEl) {
+                        meetingFeedbackEl.textContent =
+                            (data.error || "Ainda nao podes votar.") + " (" + secondsUntil(data.votingStartsAt) + "s)";
                     }
-                    const msg = data && data.error ? data.error : "Nao foi possivel votar.";
-                    throw new Error(msg);
-                }
-                if (meetingFeedbackEl) {
-                    meetingFeedbackEl.textContent = data.final ? "Reuniao encerrada." : "Voto registado.";
+                    return;
                 }
-                fetchPlayer();
-            });
+                const msg = data && data.error ? data.error : "Nao foi possivel votar.";
+                throw new Error(msg);
+            }
+            if (meetingFeedbackEl) {
+                meetingFeedbackEl.textContent = data.final ? "Reuniao encerrada." : "Voto registado.";
+            }
         })
         .catch(function (error) {
             console.error(error);
@@ -1195,14 +1466,12 @@ function activateMedicVitals() {
         return;
     }
     medicActivateBtn.disabled = true;
-    fetch("/api/medic/vitals", { method: "POST" })
-        .then(parseJsonSafe)
+    queueAction({ type: "vitals" })
         .then(function (data) {
             if (!data || !data.ok) {
                 const msg = data && data.error ? data.error : "Nao podes ver as vitals agora.";
                 throw new Error(msg);
             }
-            fetchPlayer();
         })
         .catch(function (error) {
             console.error(error);
@@ -1219,14 +1488,12 @@ function triggerSabotage() {
         return;
     }
     sabotageBtn.disabled = true;
-    fetch("/api/impostor/sabotage", { method: "POST" })
-        .then(parseJsonSafe)
+    queueAction({ type: "sabotage" })
         .then(function (data) {
             if (!data || !data.ok) {
                 const msg = data && data.error ? data.error : "Nao podes sabotar agora.";
                 throw new Error(msg);
             }
-            fetchPlayer();
         })
         .catch(function (error) {
             console.error(error);
@@ -1274,180 +1541,375 @@ function resetGame() {
         });
 }
 
-function fetchPlayer() {
-    if (isFetching) {
-        fetchPending = true;
+function queueAction(action) {
+    if (socketReady) {
+        return sendSocketAction(action);
+    }
+    return new Promise(function (resolve, reject) {
+        pendingActions.push({ action: action, resolve: resolve, reject: reject });
+        if (!actionFlushTimer) {
+            actionFlushTimer = setTimeout(flushActions, ACTION_BATCH_DELAY);
+        }
+    });
+}
+
+function newIdempotencyKey() {
+    if (window.crypto && typeof window.crypto.randomUUID === "function") {
+        return window.crypto.randomUUID();
+    }
+    return Date.now().toString(36) + "-" + Math.random().toString(36).slice(2);
+}
+
+function postWithRetry(url, body, retries) {
+    const key = newIdempotencyKey();
+    const attempt = function (remaining) {
+        return fetch(url, {
+            method: "POST",
+            headers: { "Content-Type": "application/json", "Idempotency-Key": key },
+            body: body
+        }).then(function (response) {
+            if (response.status !== 429 || remaining <= 0) {
+                return response;
+            }
+            return new Promise(function (resolve) {
+                setTimeout(resolve, retryAfterDelay(response));
+            }).then(function () {
+                return attempt(remaining - 1);
+            });
+        }, function (error) {
+            if (remaining <= 0) {
+                throw error;
+            }
+            return new Promise(function (resolve) {
+                setTimeout(resolve, ACTION_RETRY_DELAY);
+            }).then(function () {
+                return attempt(remaining - 1);
+            });
+        });
+    };
+    return attempt(retries);
+}
+
+function flushActions() {
+    actionFlushTimer = null;
+    const batch = pendingActions;
+    pendingActions = [];
+    if (batch.length === 0) {
         return;
     }
-    isFetching = true;
-    fetch("/api/player")
+    const body = JSON.stringify({
+        actions: batch.map(function (entry) {
+            return entry.action;
+        })
+    });
+    postWithRetry("/api/batch", body, 2)
         .then(function (response) {
             if (response.status === 404) {
                 window.location.href = "/";
-                return null;
+                throw new Error("Sessao expirada. Volta ao lobby.");
             }
-            return response.json();
+            return parseJsonSafe(response);
         })
         .then(function (data) {
-            if (!data) {
-                return;
-            }
-            if (!data.ok) {
-                throw new Error(data.error || "Erro ao carregar estado do jogador.");
-            }
-
-            currentStatus = data.status;
-            if (currentStatus === "lobby") {
-                impostorRevealShown = false;
-                lastSummaryId = null;
-                lastRevealedRatio = 0;
-                hideMeeting();
-                hideMeetingSummary();
-                hideGameOver();
-                hideCommsOverlay();
-                window.location.href = "/lobby";
-                return;
-            }
-
-            const role = data.role || "crewmate";
-            specialRole = data.specialRole || null;
-            isMedic = specialRole === "medic";
-            isImpostor = role === "impostor";
-            isAlive = data.alive !== false;
-            isLeader = data.isLeader === true;
-            if (leaderBadgeEl) {
-                leaderBadgeEl.classList.toggle("hidden", !isLeader);
-            }
-            if (resetBtn) {
-                resetBtn.classList.toggle("hidden", !isLeader);
-                resetBtn.disabled = !isLeader;
+            if (!data || !data.ok) {
+                throw new Error(data && data.error ? data.error : "Nao foi possivel executar a acao.");
             }
-            if (gameOverResetBtn) {
-                if (isLeader) {
-                    gameOverResetBtn.textContent = "Terminar jogo";
-                    gameOverResetBtn.disabled = false;
-                } else {
-                    gameOverResetBtn.textContent = "Aguardar lider";
-                    gameOverResetBtn.disabled = true;
+            if (data.player && data.player.ok) {
+                applyPlayerView(data.player);
+                if (!isFetching) {
+                    scheduleNextPoll(nextPollMs);
                 }
             }
+            const results = Array.isArray(data.results) ? data.results : [];
+            batch.forEach(function (entry, index) {
+                entry.resolve(results[index] || { ok: false, error: "Sem resposta do servidor." });
+            });
+        })
+        .catch(function (error) {
+            batch.forEach(function (entry) {
+                entry.reject(error);
+            });
+        });
+}
 
-            if (roleNameEl) {
-                roleNameEl.textContent = translateRole(role, specialRole);
-            }
-            if (roleCardEl) {
-                roleCardEl.classList.toggle("crewmate", role === "crewmate");
-                roleCardEl.classList.toggle("impostor", role === "impostor");
-                roleCardEl.classList.toggle("leader", isLeader);
-            }
-            if (roleHintEl) {
-                roleHintEl.textContent = roleHint(role, specialRole);
-            }
-
-            if (isImpostor && !impostorRevealShown && currentStatus !== "lobby") {
-                impostorRevealShown = true;
-                playImpostorReveal();
-            }
+function scheduleNextPoll(ms) {
+    if (pollTimer) {
+        clearTimeout(pollTimer);
+        pollTimer = null;
+    }
+    if (socketReady) {
+        return;
+    }
+    const delay = typeof ms === "number" && ms > 0 ? ms : POLL_INTERVAL;
+    pollTimer = setTimeout(function () {
+        pollTimer = null;
+        fetchPlayer();
+    }, delay);
+}
 
-            renderTasks(data.tasks || {});
-            renderMedicPanel(isMedic ? data.medicVitals : null);
+function sendSocketAction(action) {
+    return new Promise(function (resolve, reject) {
+        socketActionId += 1;
+        const id = socketActionId;
+        socketPending[id] = { resolve: resolve, reject: reject };
+        socket.send(JSON.stringify(Object.assign({ id: id }, action)));
+    });
+}
 
-            killTargets = Array.isArray(data.killTargets) ? data.killTargets : [];
-            if (!isImpostor) {
-                killTargets = [];
-            }
-            deadPlayersList = Array.isArray(data.deadPlayers) ? data.deadPlayers : [];
-            reportableBodies = deadPlayersList.filter(function (body) {
-                return body && !body.reported;
-            });
+function handleSocketMessage(event) {
+    let message = null;
+    try {
+        message = JSON.parse(event.data);
+    } catch (error) {
+        return;
+    }
+    if (message.t === "ack") {
+        const entry = socketPending[message.id];
+        if (entry) {
+            delete socketPending[message.id];
+            entry.resolve(message.r || { ok: false, error: "Sem resposta do servidor." });
+        }
+    } else if (message.t === "state") {
+        socketView = Object.assign({}, socketView || {}, message.d || {});
+        (message.r || []).forEach(function (key) {
+            delete socketView[key];
+        });
+        applyPlayerView(socketView);
+    } else if (message.t === "chat") {
+        applyChat({ cursor: message.c, messages: message.m });
+    } else if (message.t === "error") {
+        console.error(message.error);
+    }
+}
 
-            if (deathNoteEl) {
-                if (data.deathNote) {
-                    deathNoteEl.textContent = data.deathNote;
-                    deathNoteEl.classList.remove("hidden");
-                } else {
-                    deathNoteEl.textContent = "";
-                    deathNoteEl.classList.add("hidden");
-                }
-            }
-            if (roleCardEl) {
-                roleCardEl.classList.toggle("dead", !isAlive);
-            }
+function connectSocket() {
+    const url = window.GAME_WS_URL;
+    if (!url || !window.WebSocket) {
+        return;
+    }
+    socket = new WebSocket(url);
+    socket.addEventListener("open", function () {
+        socketReady = true;
+        socketView = null;
+        socketRetryMs = SOCKET_RETRY_MIN;
+        stopChatPolling();
+        scheduleNextPoll(0);
+    });
+    socket.addEventListener("message", handleSocketMessage);
+    socket.addEventListener("close", function () {
+        const wasReady = socketReady;
+        socketReady = false;
+        socket = null;
+        Object.keys(socketPending).forEach(function (id) {
+            socketPending[id].reject(new Error("Ligacao perdida. Tenta novamente."));
+        });
+        socketPending = {};
+        if (wasReady) {
+            fetchPlayer();
+        }
+        setTimeout(connectSocket, socketRetryMs);
+        socketRetryMs = Math.min(SOCKET_RETRY_MAX, socketRetryMs * 2);
+    });
+}
 
-            const commsData = data.commsSabotage || {};
-            const rawRemaining =
-                typeof commsData.remaining === "number"
-                    ? commsData.remaining
-                    : parseInt(commsData.remaining, 10);
-            const remainingSeconds = isNaN(rawRemaining) ? 0 : Math.max(0, rawRemaining);
-            const affectsPlayer = commsData.affectsPlayer === true;
-            const globalActive =
-                !!(commsData && commsData.active && remainingSeconds > 0);
-            commsInProgress = globalActive;
-            commsGlobalRemaining = globalActive ? remainingSeconds : 0;
-            if (affectsPlayer && globalActive) {
-                showCommsOverlay(remainingSeconds);
-            } else {
-                hideCommsOverlay();
-            }
-            updateSabotageStatus();
+function unpackWire(bytes, strings) {
+    const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    let pos = 0;
+    const readString = function (length) {
+        const value = wireTextDecoder.decode(bytes.subarray(pos, pos + length));
+        pos += length;
+        return value;
+    };
+    const readMap = function (length) {
+        const result = {};
+        for (let i = 0; i < length; i += 1) {
+            const key = next();
+            result[key] = next();
+        }
+        return result;
+    };
+    const readArray = function (length) {
+        const result = new Array(length);
+        for (let i = 0; i < length; i += 1) {
+            result[i] = next();
+        }
+        return result;
+    };
+    const readBin = function (length) {
+        const value = bytes.subarray(pos, pos + length);
+        pos += length;
+        return value;
+    };
+    const readRef = function (size) {
+        const type = view.getInt8(pos);
+        const index = size === 1 ? view.getUint8(pos + 1) : view.getUint16(pos + 1);
+        pos += 1 + size;
+        if (type !== WIRE_REF_EXT) {
+            throw new Error("Formato de resposta desconhecido.");
+        }
+        return strings[index];
+    };
+    const next = function () {
+        const tag = view.getUint8(pos);
+        pos += 1;
+        let value;
+        if (tag < 0x80) {
+            return tag;
+        }
+        if (tag >= 0xe0) {
+            return tag - 0x100;
+        }
+        if (tag <= 0x8f) {
+            return readMap(tag & 0x0f);
+        }
+        if (tag <= 0x9f) {
+            return readArray(tag & 0x0f);
+        }
+        if (tag <= 0xbf) {
+            return readString(tag & 0x1f);
+        }
+        switch (tag) {
+            case 0xc0:
+                return null;
+            case 0xc2:
+                return false;
+            case 0xc3:
+                return true;
+            case 0xc4:
+                value = view.getUint8(pos);
+                pos += 1;
+                return readBin(value);
+            case 0xc5:
+                value = view.getUint16(pos);
+                pos += 2;
+                return readBin(value);
+            case 0xc6:
+                value = view.getUint32(pos);
+                pos += 4;
+                return readBin(value);
+            case 0xcb:
+                value = view.getFloat64(pos);
+                pos += 8;
+                return value;
+            case 0xcc:
+                value = view.getUint8(pos);
+                pos += 1;
+                return value;
+            case 0xcd:
+                value = view.getUint16(pos);
+                pos += 2;
+                return value;
+            case 0xce:
+                value = view.getUint32(pos);
+                pos += 4;
+                return value;
+            case 0xcf:
+                value = view.getUint32(pos) * 4294967296 + view.getUint32(pos + 4);
+                pos += 8;
+                return value;
+            case 0xd2:
+                value = view.getInt32(pos);
+                pos += 4;
+                return value;
+            case 0xd3:
+                value = view.getInt32(pos) * 4294967296 + view.getUint32(pos + 4);
+                pos += 8;
+                return value;
+            case 0xd4:
+                return readRef(1);
+            case 0xd5:
+                return readRef(2);
+            case 0xd9:
+                value = view.getUint8(pos);
+                pos += 1;
+                return readString(value);
+            case 0xda:
+                value = view.getUint16(pos);
+                pos += 2;
+                return readString(value);
+            case 0xdb:
+                value = view.getUint32(pos);
+                pos += 4;
+                return readString(value);
+            case 0xdc:
+                value = view.getUint16(pos);
+                pos += 2;
+                return readArray(value);
+            case 0xdd:
+                value = view.getUint32(pos);
+                pos += 4;
+                return readArray(value);
+            case 0xde:
+                value = view.getUint16(pos);
+                pos += 2;
+                return readMap(value);
+            case 0xdf:
+                value = view.getUint32(pos);
+                pos += 4;
+                return readMap(value);
+            default:
+                throw new Error("Formato de resposta desconhecido.");
+        }
+    };
+    return next();
+}
 
-            const killValue =
-                typeof data.killRemaining === "number"
-                    ? data.killRemaining
-                    : parseInt(data.killRemaining, 10);
-            killRemaining = isNaN(killValue) ? 0 : killValue;
-            updateKillUI();
-            if (killRemaining > 0) {
-                startKillCountdown();
-            } else {
-                stopKillCountdown();
-            }
+function decodeWireResponse(buffer) {
+    const envelope = unpackWire(new Uint8Array(buffer), []);
+    const tableId = envelope[0];
+    const offset = envelope[1];
+    if (tableId !== wireTableId || offset === 0) {
+        wireTableId = tableId;
+        wireStrings = [];
+    }
+    wireStrings.length = offset;
+    wireStrings = wireStrings.concat(envelope[2]);
+    return unpackWire(envelope[3], wireStrings);
+}
 
-            if (data.progress) {
-                applyProgress(data.progress);
-            }
+function parsePlayerResponse(response) {
+    const contentType = response.headers.get("Content-Type") || "";
+    if (contentType.indexOf(WIRE_MIMETYPE) === 0) {
+        return response.arrayBuffer().then(decodeWireResponse);
+    }
+    return response.json();
+}
 
-            if (data.meeting) {
-                showMeeting(data.meeting);
-            } else {
-                hideMeeting();
-            }
+function playerViewUrl() {
+    return "/api/player?table=" + encodeURIComponent(wireTableId) + "&known=" + wireStrings.length;
+}
 
-            if (data.meetingSummary && data.meetingSummary.id !== lastSummaryId) {
-                lastSummaryId = data.meetingSummary.id;
-                showMeetingSummary(data.meetingSummary);
+function fetchPlayer() {
+    if (isFetching) {
+        fetchPending = true;
+        return;
+    }
+    isFetching = true;
+    const headers = wireTextDecoder ? { Accept: WIRE_MIMETYPE + ", application/json;q=0.5" } : {};
+    fetch(playerViewUrl(), { headers: headers })
+        .then(function (response) {
+            if (response.status === 404) {
+                window.location.href = "/";
+                return null;
             }
-
-            if (data.gameOver) {
-                showGameOver(data.gameOver);
-            } else {
-                hideGameOver();
+            if (response.status === 429) {
+                nextPollMs = retryAfterDelay(response);
+                return null;
             }
-
-            const cannotReport =
-                !isAlive || data.status !== "in_game" || !!data.meeting || !!data.gameOver;
-            if (reportBtn) {
-                reportBtn.disabled = cannotReport || commsActive;
+            return parsePlayerResponse(response);
+        })
+        .then(function (data) {
+            if (!data) {
+                return;
             }
-            if (emergencyBtn) {
-                const inGame = currentStatus === "in_game";
-                emergencyBtn.classList.toggle("hidden", !inGame);
-                const canEmergency =
-                    inGame &&
-                    data.emergencyAvailable &&
-                    isAlive &&
-                    !data.meeting &&
-                    !data.gameOver &&
-                    !commsActive;
-                emergencyBtn.textContent = data.emergencyAvailable
-                    ? "Chamar reuniao"
-                    : "Reuniao usada";
-                emergencyBtn.disabled = !canEmergency;
+            if (!data.ok) {
+                throw new Error(data.error || "Erro ao carregar estado do jogador.");
             }
+            applyPlayerView(data);
         })
         .catch(function (error) {
             console.error(error);
+            nextPollMs = POLL_INTERVAL;
             alert(error.message);
         })
         .finally(function () {
@@ -1455,13 +1917,162 @@ function fetchPlayer() {
             if (fetchPending) {
                 fetchPending = false;
                 fetchPlayer();
+                return;
             }
+            scheduleNextPoll(nextPollMs);
         });
 }
 
+function applyPlayerView(data) {
+    nextPollMs = typeof data.pollAfterMs === "number" ? data.pollAfterMs : POLL_INTERVAL;
+    currentStatus = data.status;
+    if (currentStatus === "lobby") {
+        impostorRevealShown = false;
+        lastSummaryId = null;
+        lastRevealedRatio = 0;
+        hideMeeting();
+        hideMeetingSummary();
+        hideGameOver();
+        hideCommsOverlay();
+        window.location.href = "/lobby";
+        return;
+    }
+
+    const role = data.role || "crewmate";
+    specialRole = data.specialRole || null;
+    isMedic = specialRole === "medic";
+    isImpostor = role === "impostor";
+    isAlive = data.alive !== false;
+    isLeader = data.isLeader === true;
+    if (leaderBadgeEl) {
+        leaderBadgeEl.classList.toggle("hidden", !isLeader);
+    }
+    if (resetBtn) {
+        resetBtn.classList.toggle("hidden", !isLeader);
+        resetBtn.disabled = !isLeader;
+    }
+    if (gameOverResetBtn) {
+        if (isLeader) {
+            gameOverResetBtn.textContent = "Terminar jogo";
+            gameOverResetBtn.disabled = false;
+        } else {
+            gameOverResetBtn.textContent = "Aguardar lider";
+            gameOverResetBtn.disabled = true;
+        }
+    }
+
+    if (roleNameEl) {
+        roleNameEl.textContent = translateRole(role, specialRole);
+    }
+    if (roleCardEl) {
+        roleCardEl.classList.toggle("crewmate", role === "crewmate");
+        roleCardEl.classList.toggle("impostor", role === "impostor");
+        roleCardEl.classList.toggle("leader", isLeader);
+    }
+    if (roleHintEl) {
+        roleHintEl.textContent = roleHint(role, specialRole);
+    }
+
+    if (isImpostor && !impostorRevealShown && currentStatus !== "lobby") {
+        impostorRevealShown = true;
+        playImpostorReveal();
+    }
+
+    renderTasks(data.tasks || {});
+    renderMedicPanel(isMedic ? data.medicVitals : null);
+
+    killTargets = Array.isArray(data.killTargets) ? data.killTargets : [];
+    killTargetsNext = typeof data.killTargetsNext === "number" ? data.killTargetsNext : null;
+    if (!isImpostor) {
+        killTargets = [];
+        killTargetsNext = null;
+    }
+    deadPlayersList = Array.isArray(data.deadPlayers) ? data.deadPlayers : [];
+    deadPlayersNext = typeof data.deadPlayersNext === "number" ? data.deadPlayersNext : null;
+    reportableBodies = deadPlayersList.filter(function (body) {
+        return body && !body.reported;
+    });
+
+    if (deathNoteEl) {
+        if (data.deathNote) {
+            deathNoteEl.textContent = data.deathNote;
+            deathNoteEl.classList.remove("hidden");
+        } else {
+            deathNoteEl.textContent = "";
+            deathNoteEl.classList.add("hidden");
+        }
+    }
+    if (roleCardEl) {
+        roleCardEl.classList.toggle("dead", !isAlive);
+    }
+
+    const commsData = data.commsSabotage || {};
+    commsEndsAt = commsData.active && typeof commsData.endsAt === "number" ? commsData.endsAt : 0;
+    commsInProgress = secondsUntil(commsEndsAt) > 0;
+    if (commsData.affectsPlayer === true && commsInProgress) {
+        showCommsOverlay();
+    } else {
+        hideCommsOverlay();
+    }
+    updateSabotageStatus();
+
+    killReadyAt = typeof data.killReadyAt === "number" ? data.killReadyAt : 0;
+    updateKillUI();
+
+    if (data.progress) {
+        applyProgress(data.progress);
+    }
+
+    if (data.meeting) {
+        showMeeting(data.meeting);
+    } else {
+        hideMeeting();
+    }
+
+    if (data.meetingSummary && data.meetingSummary.id !== lastSummaryId) {
+        lastSummaryId = data.meetingSummary.id;
+        showMeetingSummary(data.meetingSummary);
+    }
+
+    if (data.gameOver) {
+        showGameOver(data.gameOver);
+    } else {
+        hideGameOver();
+    }
+
+    lastPlayerView = data;
+    renderCallButtons(data);
+    tickCountdowns();
+}
+
+function renderCallButtons(data) {
+    const cannotReport =
+        !isAlive || data.status !== "in_game" || !!data.meeting || !!data.gameOver;
+    if (reportBtn) {
+        reportBtn.disabled = cannotReport || commsActive;
+    }
+    if (emergencyBtn) {
+        const inGame = currentStatus === "in_game";
+        emergencyBtn.classList.toggle("hidden", !inGame);
+        const canEmergency =
+            inGame &&
+            data.emergencyAvailable &&
+            isAlive &&
+            !data.meeting &&
+            !data.gameOver &&
+            !commsActive;
+        emergencyBtn.textContent = data.emergencyAvailable
+            ? "Chamar reuniao"
+            : "Reuniao usada";
+        emergencyBtn.disabled = !canEmergency;
+    }
+}
+
 function setup() {
     fetchPlayer();
-    pollTimer = setInterval(fetchPlayer, POLL_INTERVAL);
+    connectSocket();
+    syncClock();
+    setInterval(syncClock, CLOCK_RESYNC_INTERVAL);
 
     if (refreshBtn) {
         refreshBtn.addEventListener("click", fetchPlayer);
@@ -1492,6 +2103,9 @@ function setup() {
     if (gameOverResetBtn) {
         gameOverResetBtn.addEventListener("click", resetGame);
     }
+    if (chatForm && chatInput) {
+        chatForm.addEventListener("submit", sendChat);
+    }
     if (progressBarEl) {
         progressBarEl.addEventListener("animationend", function () {
             progressBarEl.classList.remove(PROGRESS_FLASH_CLASS);
@@ -10,9 +10,12 @@ const lobbyCodeLabel = document.getElementById("lobby-code");
 const configSection = document.getElementById("config-section");
 const requiredPlayersInput = document.getElementById("required-players-input");
 const killCooldownInput = document.getElementById("kill-cooldown-input");
+const largeLobbyInput = document.getElementById("large-lobby-input");
 const saveConfigBtn = document.getElementById("save-config-btn");
 const configFeedback = document.getElementById("config-feedback");
 
+const POLL_INTERVAL = 2500;
+
 let isReady = false;
 let pollingTimer = null;
 let leaderId = "";
@@ -53,7 +56,7 @@ function setConfigStatus(text, variant = "info") {
     configFeedback.classList.add(variant);
 }
 
-function renderPlayers(players) {
+function renderPlayers(players, totalPlayers, totalReady) {
     if (!playersList) {
         return;
     }
@@ -123,6 +126,15 @@ function renderPlayers(players) {
         }
     });
 
+    if (typeof totalReady === "number") {
+        readyCount = totalReady;
+    }
+    if (typeof totalPlayers === "number" && totalPlayers > players.length) {
+        const more = document.createElement("li");
+        more.classList.add("player-entry", "muted");
+        more.textContent = "e mais " + (totalPlayers - players.length) + " jogador(es).";
+        playersList.appendChild(more);
+    }
     readyCountLabel.textContent = readyCount.toString();
     readyBtn.textContent = isReady ? "Cancelar pronto" : "Estou pronto";
     readyBtn.classList.toggle("ghost", isReady);
@@ -137,6 +149,9 @@ function applyConfigControls(config = {}, limits = {}, locked = false) {
     const cooldownValue = typeof config.killCooldown === "number" ? config.killCooldown : parseInt(killCooldownInput.value || "0", 10);
     requiredPlayersInput.value = Number.isFinite(requiredValue) ? requiredValue : "";
     killCooldownInput.value = Number.isFinite(cooldownValue) ? cooldownValue : "";
+    if (largeLobbyInput && typeof config.largeLobby === "boolean") {
+        largeLobbyInput.checked = config.largeLobby;
+    }
 
     if (limits.requiredPlayers) {
         currentLimits.requiredPlayers = limits.requiredPlayers;
@@ -152,6 +167,9 @@ function applyConfigControls(config = {}, limits = {}, locked = false) {
     const disabled = !canManageLobby || locked;
     requiredPlayersInput.disabled = disabled;
     killCooldownInput.disabled = disabled;
+    if (largeLobbyInput) {
+        largeLobbyInput.disabled = disabled;
+    }
     if (saveConfigBtn) {
         saveConfigBtn.disabled = disabled;
         saveConfigBtn.classList.toggle("ghost", disabled);
@@ -179,6 +197,9 @@ async function saveConfig(event) {
         if (Number.isFinite(cooldownValue)) {
             payload.killCooldown = cooldownValue;
         }
+        if (largeLobbyInput) {
+            payload.largeLobby = largeLobbyInput.checked;
+        }
         const response = await fetch("/api/lobby/config", {
             method: "POST",
             headers: { "Content-Type": "application/json" },
@@ -219,13 +240,43 @@ async function kickPlayer(playerId) {
     }
 }
 
+function retryAfterDelay(response) {
+    const seconds = parseFloat(response.headers.get("Retry-After"));
+    return isNaN(seconds) ? POLL_INTERVAL : Math.max(POLL_INTERVAL / 2, seconds * 1000);
+}
+
+function scheduleNextPoll(ms) {
+    if (pollingTimer) {
+        clearTimeout(pollingTimer);
+    }
+    const delay = typeof ms === "number" && ms > 0 ? ms : POLL_INTERVAL;
+    pollingTimer = setTimeout(function () {
+        pollingTimer = null;
+        fetchState();
+    }, delay);
+}
+
 async function fetchState() {
+    let nextPollMs = POLL_INTERVAL;
     try {
         const response = await fetch("/api/state");
+        if (response.status === 404) {
+            // The page may come from the service worker cache after the session ended.
+            window.location.href = "/";
+            nextPollMs = 0;
+            return;
+        }
+        if (response.status === 429) {
+            nextPollMs = retryAfterDelay(response);
+            return;
+        }
         if (!response.ok) {
             throw new Error(`Erro ao carregar estado (${response.status})`);
         }
         const data = await response.json();
+        if (typeof data.pollAfterMs === "number") {
+            nextPollMs = data.pollAfterMs;
+        }
         const players = data.players || [];
         leaderId = data.leaderId || "";
 
@@ -250,7 +301,7 @@ async function fetchState() {
         amLeader = !!(me && me.leader);
         canManageLobby = amLeader && data.status === "lobby";
 
-        renderPlayers(players);
+        renderPlayers(players, data.playerCount, data.readyCount);
         applyConfigControls(data.config || {}, data.configLimits || currentLimits, data.status !== "lobby");
         if (!canManageLobby) {
             setConfigStatus("");
@@ -258,6 +309,7 @@ async function fetchState() {
 
         if (["in_game", "meeting", "ended"].includes(data.status)) {
             window.location.href = "/game";
+            nextPollMs = 0;
             return;
         }
 
@@ -286,6 +338,10 @@ async function fetchState() {
     } catch (error) {
         console.error(error);
         setMessage("Nao foi possivel obter o estado do lobby. A tentar de novo...", "error");
+    } finally {
+        if (nextPollMs > 0) {
+            scheduleNextPoll(nextPollMs);
+        }
     }
 }
 
@@ -330,7 +386,6 @@ async function startGame() {
 
 function setup() {
     fetchState();
-    pollingTimer = setInterval(fetchState, 2500);
     if (readyBtn) {
         readyBtn.addEventListener("click", toggleReady);
     }
@@ -0,0 +1,276 @@
+const spectatorCard = document.getElementById("spectator-card");
+const statusEl = document.getElementById("spectate-status");
+const roundEl = document.getElementById("spectate-round");
+const playersEl = document.getElementById("spectate-players");
+const aliveEl = document.getElementById("spectate-alive");
+const progressBarEl = document.getElementById("spectate-progress-bar");
+const progressLabelEl = document.getElementById("spectate-progress-label");
+const bannerEl = document.getElementById("spectate-banner");
+const meetingEl = document.getElementById("spectate-meeting");
+const meetingTitleEl = document.getElementById("spectate-meeting-title");
+const meetingInfoEl = document.getElementById("spectate-meeting-info");
+const meetingPlayersEl = document.getElementById("spectate-meeting-players");
+const summaryEl = document.getElementById("spectate-summary");
+const summaryTextEl = document.getElementById("spectate-summary-text");
+const summaryVotesEl = document.getElementById("spectate-summary-votes");
+const deadListEl = document.getElementById("spectate-dead");
+const deadMoreEl = document.getElementById("spectate-dead-more");
+
+const POLL_INTERVAL = 2500;
+const STATUS_LABELS = {
+    lobby: "Lobby",
+    in_game: "Em jogo",
+    meeting: "Reuniao",
+    ended: "Terminado"
+};
+
+const lobbyCode = spectatorCard ? spectatorCard.dataset.code : "";
+let board = null;
+let clockOffsetMs = 0;
+let countdownTimer = null;
+let pollTimer = null;
+let events = null;
+
+function serverNow() {
+    return Date.now() + clockOffsetMs;
+}
+
+function secondsUntil(epochSeconds) {
+    return Math.max(0, Math.ceil(epochSeconds - serverNow() / 1000));
+}
+
+function syncClock(serverTime) {
+    if (typeof serverTime === "number" && !isNaN(serverTime)) {
+        clockOffsetMs = serverTime * 1000 - Date.now();
+    }
+}
+
+function renderPlayerEntry(player, extraClass) {
+    const li = document.createElement("li");
+    li.classList.add("player-entry");
+    if (extraClass) {
+        li.classList.add(extraClass);
+    }
+    if (player.avatar) {
+        const avatar = document.createElement("img");
+        avatar.src = player.avatar;
+        avatar.alt = player.name || "Jogador";
+        avatar.classList.add("player-avatar");
+        li.appendChild(avatar);
+    }
+    const info = document.createElement("div");
+    info.classList.add("player-info");
+    const nameSpan = document.createElement("span");
+    nameSpan.classList.add("player-name");
+    nameSpan.textContent = player.name;
+    info.appendChild(nameSpan);
+    li.appendChild(info);
+    return li;
+}
+
+function renderProgress(progress) {
+    const total = progress && typeof progress.total === "number" ? progress.total : 0;
+    const revealed = progress && typeof progress.revealed === "number" ? progress.revealed : 0;
+    const ratio = Math.max(0, Math.min(1, revealed));
+    if (progressBarEl) {
+        progressBarEl.style.width = Math.round(ratio * 100) + "%";
+    }
+    if (progressLabelEl) {
+        progressLabelEl.textContent =
+            Math.round(ratio * total) + " de " + total + " tarefas reveladas.";
+    }
+}
+
+function renderMeeting(meeting) {
+    if (!meetingEl) {
+        return;
+    }
+    if (!meeting) {
+        meetingEl.classList.add("hidden");
+        return;
+    }
+    meetingEl.classList.remove("hidden");
+    const reporter = meeting.reporter ? meeting.reporter.name : "Alguem";
+    if (meeting.type === "emergency") {
+        meetingTitleEl.textContent = "Reuniao de emergencia chamada por " + reporter;
+    } else if (meeting.reportedBody) {
+        meetingTitleEl.textContent = reporter + " reportou o corpo de " + meeting.reportedBody.name;
+    } else {
+        meetingTitleEl.textContent = "Reuniao";
+    }
+    const voted = new Set(meeting.voted || []);
+    meetingPlayersEl.innerHTML = "";
+    (meeting.alivePlayers || []).forEach(function (player) {
+        meetingPlayersEl.appendChild(renderPlayerEntry(player, voted.has(player.id) ? "voted" : null));
+    });
+    renderMeetingCountdown();
+}
+
+function renderMeetingCountdown() {
+    const meeting = board ? board.meeting : null;
+    if (!meeting || !meetingInfoEl) {
+        return;
+    }
+    const votes = "Votaram " + (meeting.votedCount || 0) + " de " + (meeting.aliveCount || 0) + ".";
+    const votingIn = secondsUntil(meeting.votingStartsAt);
+    if (votingIn > 0) {
+        meetingInfoEl.textContent = "Votacao abre em " + votingIn + "s. " + votes;
+    } else {
+        meetingInfoEl.textContent = "Votacao termina em " + secondsUntil(meeting.endsAt) + "s. " + votes;
+    }
+}
+
+function describeSummary(summary) {
+    if (summary.outcome === "ejected" && summary.ejected) {
+        return summary.ejected.name + " foi expulso.";
+    }
+    if (summary.outcome === "skipped") {
+        return "A votacao terminou em skip.";
+    }
+    if (summary.outcome === "no_votes") {
+        return "Ninguem votou nesta reuniao.";
+    }
+    return "Reuniao terminada sem expulsao.";
+}
+
+function renderSummary(summary) {
+    if (!summaryEl) {
+        return;
+    }
+    if (!summary) {
+        summaryEl.classList.add("hidden");
+        return;
+    }
+    summaryEl.classList.remove("hidden");
+    summaryTextEl.textContent = describeSummary(summary);
+    summaryVotesEl.innerHTML = "";
+    (summary.votes || []).forEach(function (vote) {
+        const li = document.createElement("li");
+        const nameSpan = document.createElement("span");
+        nameSpan.textContent = vote.label;
+        const countSpan = document.createElement("span");
+        countSpan.classList.add("count");
+        countSpan.textContent = vote.count;
+        li.appendChild(nameSpan);
+        li.appendChild(countSpan);
+        summaryVotesEl.appendChild(li);
+    });
+}
+
+function renderDead(dead, total) {
+    if (!deadListEl) {
+        return;
+    }
+    deadListEl.innerHTML = "";
+    (dead || []).forEach(function (player) {
+        deadListEl.appendChild(renderPlayerEntry(player, null));
+    });
+    const hidden = (total || 0) - (dead || []).length;
+    if (deadMoreEl) {
+        deadMoreEl.textContent = hidden > 0 ? "e mais " + hidden + " jogador(es)." : "";
+        deadMoreEl.classList.toggle("hidden", hidden <= 0);
+    }
+}
+
+function renderBanner(data) {
+    if (!bannerEl) {
+        return;
+    }
+    let text = "";
+    if (data.gameOver) {
+        text = data.gameOver.message || "Jogo terminado.";
+    } else if (data.commsSabotage && data.commsSabotage.active) {
+        text = "Comunicacoes sabotadas! Voltam em " + secondsUntil(data.commsSabotage.endsAt) + "s.";
+    }
+    bannerEl.textContent = text;
+    bannerEl.classList.toggle("hidden", !text);
+}
+
+function applyBoard(data) {
+    if (!data || !data.ok) {
+        return;
+    }
+    if (board && typeof board.version === "number" && data.version < board.version) {
+        return;
+    }
+    board = data;
+    statusEl.textContent = STATUS_LABELS[data.status] || data.status;
+    roundEl.textContent = data.round;
+    playersEl.textContent = data.playerCount;
+    aliveEl.textContent = data.aliveCount;
+    renderProgress(data.progress);
+    renderMeeting(data.meeting);
+    renderSummary(data.meeting ? null : data.meetingSummary);
+    renderDead(data.deadPlayers, data.deadPlayersTotal);
+    renderBanner(data);
+}
+
+function tickCountdowns() {
+    if (!board) {
+        return;
+    }
+    renderMeetingCountdown();
+    renderBanner(board);
+}
+
+function fetchBoard() {
+    fetch("/api/spectate/" + encodeURIComponent(lobbyCode), { cache: "no-cache" })
+        .then(function (response) {
+            syncClock(parseFloat(response.headers.get("X-Server-Time")));
+            if (response.status === 404) {
+                window.location.href = "/";
+                return null;
+            }
+            return response.json();
+        })
+        .then(applyBoard)
+        .catch(function (error) {
+            console.error(error);
+        })
+        .finally(function () {
+            if (!events) {
+                pollTimer = setTimeout(fetchBoard, POLL_INTERVAL);
+            }
+        });
+}
+
+function connectEvents() {
+    const url = window.SPECTATE_EVENTS_URL;
+    if (!url || !window.EventSource) {
+        return;
+    }
+    events = new EventSource(url);
+    events.addEventListener("board", function (event) {
+        let message = null;
+        try {
+            message = JSON.parse(event.data);
+        } catch (error) {
+            return;
+        }
+        syncClock(message.serverTime);
+        applyBoard(message.view);
+    });
+    events.addEventListener("open", function () {
+        if (pollTimer) {
+            clearTimeout(pollTimer);
+            pollTimer = null;
+        }
+    });
+    events.addEventListener("error", function () {
+        if (events && events.readyState === EventSource.CLOSED) {
+            events = null;
+            fetchBoard();
+        }
+    });
+}
+
+function setup() {
+    if (!spectatorCard) {
+        return;
+    }
+    fetchBoard();
+    connectEvents();
+    countdownTimer = setInterval(tickCountdowns, 1000);
+}
+
+window.addEventListener("DOMContentLoaded", setup);
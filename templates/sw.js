@@ -0,0 +1,77 @@
+// App shell cache, rendered per build by /sw.js (see assets.py).
+const CACHE_PREFIX = "amongus-";
+const CACHE_NAME = CACHE_PREFIX + {{ version|tojson }};
+const PRECACHE = {{ precache|tojson }};
+const SHELL = {{ shell|tojson }};
+
+self.addEventListener("install", function (event) {
+    event.waitUntil(
+        caches
+            .open(CACHE_NAME)
+            .then(function (cache) {
+                return cache.addAll(PRECACHE);
+            })
+            .then(function () {
+                return self.skipWaiting();
+            })
+    );
+});
+
+self.addEventListener("activate", function (event) {
+    event.waitUntil(
+        caches
+            .keys()
+            .then(function (keys) {
+                return Promise.all(
+                    keys
+                        .filter(function (key) {
+                            return key.startsWith(CACHE_PREFIX) && key !== CACHE_NAME;
+                        })
+                        .map(function (key) {
+                            return caches.delete(key);
+                        })
+                );
+            })
+            .then(function () {
+                return self.clients.claim();
+            })
+    );
+});
+
+function fromCache(request, key) {
+    return caches.open(CACHE_NAME).then(function (cache) {
+        return cache.match(key).then(function (cached) {
+            if (cached) {
+                return cached;
+            }
+            return fetch(request).then(function (response) {
+                // Redirects mean the session is elsewhere (e.g. /game -> /lobby); keep asking the server.
+                if (response.ok && !response.redirected) {
+                    cache.put(key, response.clone());
+                }
+                return response;
+            });
+        });
+    });
+}
+
+self.addEventListener("fetch", function (event) {
+    const request = event.request;
+    if (request.method !== "GET") {
+        return;
+    }
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin || url.pathname.startsWith("/api/")) {
+        return;
+    }
+    if (request.mode === "navigate") {
+        // Shell pages poll the API on load and redirect if the cached page no longer applies.
+        if (SHELL.includes(url.pathname)) {
+            event.respondWith(fromCache(request, url.pathname));
+        }
+        return;
+    }
+    if (url.pathname.startsWith("/static/build/")) {
+        event.respondWith(fromCache(request, url.pathname));
+    }
+});
@@ -0,0 +1,40 @@
+import pytest
+
+import app
+
+
+@pytest.fixture
+def player_client(monkeypatch):
+    monkeypatch.setattr(app, "admission", app.AdmissionController())
+    client = app.app.test_client()
+    client.post("/create", data={"name": "Anfitriao"})
+    with client.session_transaction() as session:
+        code = session["lobby_code"]
+    yield client, app.lobby_manager.get_lobby(code)
+    app.lobby_manager.discard_lobby(code)
+
+
+def test_session_burst_is_shed_with_retry_after(player_client):
+    client, _ = player_client
+    statuses = [client.get("/api/state").status_code for _ in range(20)]
+    assert statuses[:15] == [200] * 15
+    response = client.get("/api/state")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert response.get_json()["retryAfterMs"] > 0
+    assert app.admission.stats()["shedByReason"]["session"] >= 1
+    assert client.get("/api/time").status_code == 200
+
+
+def test_full_request_gate_is_shed_and_released(player_client):
+    client, lobby = player_client
+    for _ in range(lobby.MAX_CONCURRENT_REQUESTS):
+        assert lobby.request_gate.acquire(blocking=False)
+    response = client.get("/api/state")
+    assert response.status_code == 429
+    assert app.admission.stats()["shedByReason"] == {"concurrency": 1}
+    for _ in range(lobby.MAX_CONCURRENT_REQUESTS):
+        lobby.request_gate.release()
+    assert client.get("/api/state").status_code == 200
+    # The admitted request gave its slot back on teardown.
+    assert all(lobby.request_gate.acquire(blocking=False) for _ in range(lobby.MAX_CONCURRENT_REQUESTS))
@@ -0,0 +1,37 @@
+from app import GameState, LobbyManager
+
+
+def fill(lobby: GameState, count: int) -> None:
+    for index in range(len(lobby.players), count):
+        player, error = lobby.join(f"Jogador {index:03d}")
+        assert error is None, error
+
+
+def test_join_stops_at_capacity():
+    manager = LobbyManager()
+    lobby, _ = manager.create_lobby("Jogador 000")
+    fill(lobby, GameState.MAX_PLAYERS)
+    player, error = lobby.join("Atrasado")
+    assert player is None
+    assert error == "O lobby esta cheio."
+
+
+def test_large_lobby_is_capped_and_cannot_shrink_below_its_players():
+    manager = LobbyManager()
+    lobby, host = manager.create_lobby("Jogador 000")
+    assert lobby.update_config(host.player_id, {"largeLobby": True})["ok"]
+    fill(lobby, GameState.LARGE_LOBBY_MAX_PLAYERS)
+    assert lobby.join("Atrasado") == (None, "O lobby esta cheio.")
+    result = lobby.update_config(host.player_id, {"largeLobby": False})
+    assert not result["ok"]
+    assert lobby.config["large_lobby"] is True
+
+
+def test_browser_lists_only_lobbies_with_free_seats():
+    manager = LobbyManager()
+    full, _ = manager.create_lobby("Jogador 000")
+    fill(full, GameState.MAX_PLAYERS)
+    open_lobby, _ = manager.create_lobby("Anfitriao")
+    items = manager.browse_lobbies()["items"]
+    assert [item["code"] for item in items] == [open_lobby.code]
+    assert items[0]["capacity"] == GameState.MAX_PLAYERS
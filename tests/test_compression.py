@@ -0,0 +1,27 @@
+import gzip
+
+import app as app_module
+from app import CompressedBodyCache
+
+
+def test_older_version_does_not_replace_newer_slot():
+    cache = CompressedBodyCache()
+    newer = b'{"version":2}' * 50
+    older = b'{"version":1}' * 50
+    cache.get_or_compress("ABCDE", 2, "gzip", newer)
+    cache.get_or_compress("ABCDE", 1, "gzip", older)
+    cache.get_or_compress("ABCDE", 2, "gzip", newer)
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["entries"] == 1
+
+
+def test_player_views_are_compressed_per_response():
+    client = app_module.app.test_client()
+    client.post("/create", data={"name": "Jogador 00"})
+    before = app_module.compressed_bodies.stats()["entries"]
+    for url in ("/api/state", "/api/player"):
+        response = client.get(url, headers={"Accept-Encoding": "gzip"})
+        if response.headers.get("Content-Encoding") == "gzip":
+            assert gzip.decompress(response.get_data())
+    assert app_module.compressed_bodies.stats()["entries"] == before
@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def history_enabled(env_value):
+    env = {key: value for key, value in os.environ.items() if key != "HISTORY_DB"}
+    if env_value is not None:
+        env["HISTORY_DB"] = env_value
+    # A fresh interpreter: importing app the way a WSGI server does (gunicorn app:app).
+    result = subprocess.run(
+        [sys.executable, "-c", "import app; print(app.history_store is not None)"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip() == "True"
+
+
+def test_history_db_enables_history_without_server_py(tmp_path):
+    assert history_enabled(str(tmp_path / "history.sqlite3"))
+    assert (tmp_path / "history.sqlite3").exists()
+
+
+def test_history_stays_off_without_history_db():
+    assert not history_enabled(None)
@@ -0,0 +1,61 @@
+from app import LobbyManager
+
+
+def test_task_win_is_counted_as_ended():
+    manager = LobbyManager()
+    lobby, host = manager.create_lobby("Jogador 00")
+    lobby.config["required_players"] = 2
+    lobby.config["impostors"] = 1
+    players = [host] + [lobby.join(f"Jogador {index:02d}")[0] for index in range(1, 5)]
+    for player in players:
+        lobby.toggle_ready(player.player_id, True)
+    assert lobby.start_game().get("ok")
+
+    result = {}
+    for player in players:
+        if player.role != "crewmate":
+            continue
+        for task in [task for group in player.tasks.values() for task in group]:
+            result = lobby.mark_task(player.player_id, task.task_id, True)
+    assert result["gameOver"]["reason"] == "tasks"
+    assert lobby.status == "ended"
+
+    stats = manager.admin_stats()
+    assert stats["gamesEnded"] == 1
+    assert stats["endReasons"].get("tasks") == 1
+    assert stats["lobbiesByStatus"] == {"ended": 1}
+    page = manager.admin_lobbies()
+    assert [item["status"] for item in page["items"]] == ["ended"]
+
+
+def test_departure_is_observed_after_it_applies():
+    manager = LobbyManager()
+    lobby, host = manager.create_lobby("Jogador 00")
+    lobby.config["required_players"] = 2
+    lobby.config["impostors"] = 1
+    players = [host] + [lobby.join(f"Jogador {index:02d}")[0] for index in range(1, 5)]
+    for player in players:
+        lobby.toggle_ready(player.player_id, True)
+    assert lobby.start_game().get("ok")
+    seen = []
+    lobby.add_listener(lambda changed: seen.append(changed._left_count))
+    crew = next(p for p in players if p.role == "crewmate")
+    with lobby._lock:
+        lobby._handle_player_departure_locked(crew)
+    assert seen == [1]
+
+
+def test_admin_lobbies_resorts_after_changes():
+    manager = LobbyManager()
+    lobbies = [manager.create_lobby(f"Jogador {index:02d}")[0] for index in range(3)]
+    first = manager.admin_lobbies(sort="players", descending=True)
+    assert first["total"] == 3
+    assert manager.admin_lobbies(sort="players", descending=True)["items"] == first["items"]
+    busiest = lobbies[1]
+    busiest.join("Jogador 10")
+    busiest.join("Jogador 11")
+    page = manager.admin_lobbies(sort="players", descending=True)
+    assert page["items"][0]["code"] == busiest.code
+    assert page["items"][0]["playerCount"] == 3
+    manager.discard_lobby(lobbies[0].code)
+    assert manager.admin_lobbies(sort="players")["total"] == 2
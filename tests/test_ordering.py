@@ -0,0 +1,43 @@
+from app import GameState
+
+NAMES = ["Zeca", "Ana", "Miguel", "Bia", "Carla", "Duarte"]
+
+
+def started_lobby(large: bool) -> GameState:
+    lobby = GameState(code="ORDEM")
+    lobby.config["required_players"] = 2
+    lobby.config["impostors"] = 1
+    lobby.config["large_lobby"] = large
+    for name in NAMES:
+        player = lobby.add_player(name)
+        lobby.toggle_ready(player.player_id, True)
+    assert lobby.start_game().get("ok")
+    return lobby
+
+
+def kill_in_reverse_join_order(lobby: GameState, impostor) -> None:
+    victims = [p for p in lobby.players.values() if p is not impostor][-2:]
+    with lobby._lock:
+        for victim in reversed(victims):
+            lobby._mark_player_dead_locked(victim, impostor)
+        lobby._touch_locked()
+
+
+def test_small_lobby_lists_players_in_join_order():
+    lobby = started_lobby(large=False)
+    impostor = next(p for p in lobby.players.values() if p.role == "impostor")
+    kill_in_reverse_join_order(lobby, impostor)
+    view = lobby.player_view(impostor.player_id)
+    joined = [p.name for p in lobby.players.values() if p is not impostor]
+    assert [t["name"] for t in view["killTargets"]] == joined[:-2]
+    assert [d["name"] for d in view["deadPlayers"]] == joined[-2:]
+
+
+def test_large_lobby_lists_by_name_and_recent_deaths_first():
+    lobby = started_lobby(large=True)
+    impostor = next(p for p in lobby.players.values() if p.role == "impostor")
+    kill_in_reverse_join_order(lobby, impostor)
+    view = lobby.player_view(impostor.player_id)
+    joined = [p.name for p in lobby.players.values() if p is not impostor]
+    assert [t["name"] for t in view["killTargets"]] == sorted(joined[:-2])
+    assert [d["name"] for d in view["deadPlayers"]] == joined[-2:]
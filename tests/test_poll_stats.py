@@ -0,0 +1,42 @@
+import types
+
+import app
+from app import GameState
+
+
+def poll_every(monkeypatch, lobby: GameState, status: str, interval: float, polls: int) -> None:
+    clock = types.SimpleNamespace(now=1000.0)
+    fake = types.SimpleNamespace(**{name: getattr(app.time, name) for name in dir(app.time) if not name.startswith("_")})
+    fake.time = lambda: clock.now
+    monkeypatch.setattr(app, "time", fake)
+    lobby.status = status
+    with lobby._lock:
+        for _ in range(polls):
+            lobby._recommended_poll_ms_locked("player", "viewer", [])
+            clock.now += interval
+
+
+def test_reduction_follows_measured_rate(monkeypatch):
+    lobby = GameState(code="POLLS")
+    poll_every(monkeypatch, lobby, "in_game", 8.0, 11)
+    player = lobby.poll_stats()["channels"]["player"]
+    assert player["requestsPerPlayerMinute"] == 7.5
+    assert player["baselinePerPlayerMinute"] == 15.0
+    assert player["reduction"] == 0.5
+
+
+def test_meeting_polls_count_against_baseline(monkeypatch):
+    lobby = GameState(code="POLLS")
+    poll_every(monkeypatch, lobby, "meeting", 2.0, 11)
+    player = lobby.poll_stats()["channels"]["player"]
+    assert player["requestsPerPlayerMinute"] == 30.0
+    assert player["reduction"] == -1.0
+
+
+def test_long_silence_is_not_counted_as_polling(monkeypatch):
+    lobby = GameState(code="POLLS")
+    poll_every(monkeypatch, lobby, "in_game", 600.0, 3)
+    player = lobby.poll_stats()["channels"]["player"]
+    assert player["requests"] == 3
+    assert player["requestsPerPlayerMinute"] is None
+    assert player["reduction"] == 0.0
@@ -0,0 +1,92 @@
+import base64
+import os
+import socket
+import time
+
+import pytest
+
+import realtime
+from app import app, lobby_manager
+
+
+@pytest.fixture(scope="module")
+def hub():
+    realtime.PING_SECONDS = 0.5
+    realtime.PING_TIMEOUT_SECONDS = 1.5
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    hub = realtime.start_in_thread(lobby_manager, app, "127.0.0.1", port)
+    for _ in range(50):
+        if hub.loop is not None:
+            break
+        time.sleep(0.05)
+    time.sleep(0.1)
+    hub.port = port
+    return hub
+
+
+def create_lobby():
+    client = app.test_client()
+    client.post("/create", data={"name": "Jogador 00"})
+    with client.session_transaction() as session:
+        return client, session["lobby_code"]
+
+
+def read_until(sock: socket.socket, marker: bytes) -> bytes:
+    data = b""
+    while marker not in data:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def test_busy_lobby_does_not_stall_other_lobbies(hub):
+    _, busy_code = create_lobby()
+    _, idle_code = create_lobby()
+    busy = lobby_manager.get_lobby(busy_code)
+    with busy._lock:
+        with socket.create_connection(("127.0.0.1", hub.port), timeout=3) as sock:
+            sock.sendall(f"GET /spectate/{idle_code}/events HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+            # A spectator of the busy lobby ties up a worker, not the loop.
+            with socket.create_connection(("127.0.0.1", hub.port), timeout=3) as blocked:
+                blocked.sendall(f"GET /spectate/{busy_code}/events HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+                assert b"event: board" in read_until(sock, b"}\n\n")
+
+
+def test_server_pings_idle_sockets(hub):
+    client, _ = create_lobby()
+    cookie = "session=" + client.get_cookie("session").value
+    with socket.create_connection(("127.0.0.1", hub.port), timeout=5) as sock:
+        key = base64.b64encode(os.urandom(16)).decode()
+        sock.sendall(
+            (
+                f"GET /ws HTTP/1.1\r\nHost: 127.0.0.1:{hub.port}\r\nUpgrade: websocket\r\n"
+                f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nCookie: {cookie}\r\n\r\n"
+            ).encode()
+        )
+        assert b" 101 " in read_until(sock, b"\r\n\r\n").split(b"\r\n")[0] + b" "
+        # Never answer: expect a ping, then the close once the timeout passes.
+        opcodes = set()
+        deadline = time.monotonic() + 4
+        data = b""
+        while time.monotonic() < deadline and realtime.OP_CLOSE not in opcodes:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+            while len(data) >= 2:
+                length, offset = data[1] & 0x7F, 2
+                if length == 126:
+                    if len(data) < 4:
+                        break
+                    length, offset = int.from_bytes(data[2:4], "big"), 4
+                if len(data) < offset + length:
+                    break
+                opcodes.add(data[0] & 0x0F)
+                data = data[offset + length:]
+        assert realtime.OP_PING in opcodes
+        assert realtime.OP_CLOSE in opcodes
+    assert hub.stats["timedOut"] >= 1
@@ -0,0 +1,37 @@
+import roles
+from app import GameState
+
+
+def started_lobby(players: int = 5) -> GameState:
+    lobby = GameState(code="ROLES")
+    lobby.config["required_players"] = 2
+    lobby.config["impostors"] = 1
+    for index in range(players):
+        player = lobby.add_player(f"Jogador {index:02d}")
+        lobby.toggle_ready(player.player_id, True)
+    assert lobby.start_game().get("ok")
+    return lobby
+
+
+def test_medic_view_does_not_expire_vitals():
+    lobby = started_lobby()
+    medic = next(p for p in lobby.players.values() if p.role == "crewmate")
+    roles.ROLES["medic"].assign(lobby, medic)
+    medic.role_state["vitals_until"] = lobby.now() - 1
+    version = lobby.version
+    payload = {}
+    roles.ROLES["medic"].view(lobby, medic, payload)
+    assert lobby.version == version
+    assert payload["medicVitals"]["active"] is False
+
+
+def test_poll_expires_medic_window():
+    lobby = started_lobby()
+    medic = next(p for p in lobby.players.values() if p.role == "crewmate")
+    roles.ROLES["medic"].assign(lobby, medic)
+    lobby._tick_roles.append((roles.ROLES["medic"], medic))
+    medic.role_state["vitals_until"] = lobby.now() - 1
+    version = lobby.version
+    lobby.tick()
+    assert medic.role_state["vitals_until"] == 0.0
+    assert lobby.version == version + 1
@@ -0,0 +1,12 @@
+import app
+import simulate
+
+
+def test_simulated_games_reach_kills(monkeypatch):
+    # run_chunk swaps app.time for its clock; monkeypatch puts the module back.
+    monkeypatch.setattr(app, "time", app.time)
+    result = simulate.run_chunk((1, 20))
+    assert not result.failures
+    assert result.op_ok["impostor_kill"] > 0
+    assert result.winners["impostor"] > 0
+    assert result.op_ok["medic_activate_vitals"] > 0
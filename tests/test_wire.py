@@ -0,0 +1,60 @@
+import json
+
+import wire
+from app import GameState
+
+
+def started_lobby(players: int = 6) -> GameState:
+    lobby = GameState(code="WIRE1")
+    lobby.config["required_players"] = 2
+    lobby.config["impostors"] = 1
+    for index in range(players):
+        player = lobby.add_player(f"Jogador {index:02d}")
+        lobby.toggle_ready(player.player_id, True)
+    assert lobby.start_game().get("ok")
+    return lobby
+
+
+def poll(lobby: GameState, player_id: str, table_id: str = "", strings=None):
+    strings = list(strings or [])
+    body = lobby.wire_strings.encode(player_id, lobby.player_view(player_id), table_id, len(strings))
+    envelope, _ = wire.decode(body)
+    if envelope[0] != table_id or envelope[1] == 0:
+        strings = []
+    strings = strings[: envelope[1]] + envelope[2]
+    view, _ = wire.decode(envelope[3], strings)
+    return envelope, strings, view
+
+
+def test_role_strings_do_not_reach_other_viewers():
+    lobby = started_lobby()
+    impostor = next(p for p in lobby.players.values() if p.role == "impostor")
+    crew = next(p for p in lobby.players.values() if p.role == "crewmate" and not p.special_role)
+
+    envelope, strings, _ = poll(lobby, crew.player_id)
+    table_id = envelope[0]
+    _, impostor_strings, _ = poll(lobby, impostor.player_id)
+    assert "killTargets" in impostor_strings and "impostor" in impostor_strings
+
+    envelope, strings, view = poll(lobby, crew.player_id, table_id, strings)
+    assert envelope[0] == table_id
+    for leaked in ("killTargets", "killTargetsNext", "medicVitals", "impostor"):
+        assert leaked not in envelope[2]
+        assert leaked not in strings
+    expected = json.loads(json.dumps(lobby.player_view(crew.player_id)))
+    # Poll backoff differs between consecutive polls.
+    view.pop("pollAfterMs", None)
+    expected.pop("pollAfterMs", None)
+    assert view == expected
+
+
+def test_round_start_resets_tables():
+    lobby = started_lobby()
+    player_id = next(iter(lobby.players))
+    envelope, strings, _ = poll(lobby, player_id)
+    lobby.reset_to_lobby()
+    for player in lobby.players.values():
+        lobby.toggle_ready(player.player_id, True)
+    assert lobby.start_game().get("ok")
+    fresh, _, _ = poll(lobby, player_id, envelope[0], strings)
+    assert fresh[0] != envelope[0] and fresh[1] == 0
@@ -0,0 +1,297 @@
+"""Compact MessagePack wire format for player views.
+
+Stdlib-only MessagePack encoder plus a string table per viewer: dict keys and
+static values (player ids, names, avatars, task names) are sent once and then
+referenced by index, so a player id or avatar path costs 2-3 bytes after the
+first poll. Tables are never shared between viewers: a string only one
+player's view contains (a role-only key such as ``killTargets``, a role name)
+must not reach anyone else's delta.
+
+A response is the MessagePack array ``[table_id, offset, new_strings, view]``
+where ``view`` is a ``bin`` holding the encoded payload. Table references are
+ext type ``REF_EXT``; the client appends ``new_strings`` at ``offset`` before
+decoding ``view``.
+"""
+
+import struct
+import threading
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+MIMETYPE = "application/vnd.msgpack"
+REF_EXT = 1
+# String values under these keys are static for a round and get interned.
+INTERN_KEYS = frozenset(
+    {
+        "id",
+        "name",
+        "avatar",
+        "role",
+        "specialRole",
+        "status",
+        "type",
+        "leaderId",
+        "lobbyCode",
+        "caller",
+        "killedBy",
+        "killedByName",
+        "myVote",
+        "voted",
+        "target",
+        "winner",
+    }
+)
+
+
+class StringTable:
+    """Append-only string table of one viewer."""
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.table_id = uuid.uuid4().hex[:8]
+        self._strings: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def rotate(self) -> None:
+        with self._lock:
+            self.table_id = uuid.uuid4().hex[:8]
+            self._strings = []
+            self._index = {}
+
+    def encode(self, payload: object, table_id: str, known: int) -> bytes:
+        with self._lock:
+            body = bytearray()
+            _pack(payload, body, self._intern_locked, None)
+            if table_id != self.table_id or not 0 <= known <= len(self._strings):
+                known = 0
+            envelope = [self.table_id, known, self._strings[known:], bytes(body)]
+        out = bytearray()
+        _pack(envelope, out, None, None)
+        return bytes(out)
+
+    def _intern_locked(self, value: str) -> Optional[int]:
+        index = self._index.get(value)
+        if index is None:
+            if len(self._strings) >= self.max_entries:
+                return None
+            index = len(self._strings)
+            self._strings.append(value)
+            self._index[value] = index
+        return index
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+
+class ViewerTables:
+    """A lobby's string tables, one per viewer; all dropped at the start of each round."""
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self._tables: Dict[str, StringTable] = {}
+
+    def encode(self, viewer_id: str, payload: object, table_id: str, known: int) -> bytes:
+        with self._lock:
+            table = self._tables.get(viewer_id)
+            if table is None:
+                table = self._tables[viewer_id] = StringTable(self.max_entries)
+        return table.encode(payload, table_id, known)
+
+    def discard(self, viewer_id: str) -> None:
+        with self._lock:
+            self._tables.pop(viewer_id, None)
+
+    def rotate(self) -> None:
+        # Fresh tables get fresh ids, so clients start over at offset 0.
+        with self._lock:
+            self._tables = {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(table) for table in self._tables.values())
+
+
+def _pack_ref(index: int, out: bytearray) -> None:
+    if index < 0x100:
+        out += struct.pack("!BbB", 0xD4, REF_EXT, index)
+    else:
+        out += struct.pack("!BbH", 0xD5, REF_EXT, index)
+
+
+def _pack(
+    obj: object,
+    out: bytearray,
+    intern: Optional[Callable[[str], Optional[int]]],
+    key: Optional[str],
+) -> None:
+    if obj is None:
+        out.append(0xC0)
+    elif obj is True:
+        out.append(0xC3)
+    elif obj is False:
+        out.append(0xC2)
+    elif isinstance(obj, int):
+        _pack_int(obj, out)
+    elif isinstance(obj, float):
+        out += struct.pack("!Bd", 0xCB, obj)
+    elif isinstance(obj, str):
+        if intern is not None and key in INTERN_KEYS:
+            index = intern(obj)
+            if index is not None:
+                _pack_ref(index, out)
+                return
+        _pack_str(obj, out)
+    elif isinstance(obj, (bytes, bytearray)):
+        length = len(obj)
+        if length < 0x100:
+            out += struct.pack("!BB", 0xC4, length)
+        elif length < 0x10000:
+            out += struct.pack("!BH", 0xC5, length)
+        else:
+            out += struct.pack("!BI", 0xC6, length)
+        out += obj
+    elif isinstance(obj, (list, tuple)):
+        length = len(obj)
+        if length < 16:
+            out.append(0x90 | length)
+        elif length < 0x10000:
+            out += struct.pack("!BH", 0xDC, length)
+        else:
+            out += struct.pack("!BI", 0xDD, length)
+        for item in obj:
+            _pack(item, out, intern, key)
+    elif isinstance(obj, dict):
+        length = len(obj)
+        if length < 16:
+            out.append(0x80 | length)
+        elif length < 0x10000:
+            out += struct.pack("!BH", 0xDE, length)
+        else:
+            out += struct.pack("!BI", 0xDF, length)
+        for name, value in obj.items():
+            name = str(name)
+            index = intern(name) if intern is not None else None
+            if index is None:
+                _pack_str(name, out)
+            else:
+                _pack_ref(index, out)
+            _pack(value, out, intern, name)
+    else:
+        raise TypeError(f"cannot encode {type(obj).__name__}")
+
+
+def _pack_int(value: int, out: bytearray) -> None:
+    if 0 <= value < 0x80:
+        out.append(value)
+    elif -32 <= value < 0:
+        out += struct.pack("!b", value)
+    elif 0 <= value < 0x100:
+        out += struct.pack("!BB", 0xCC, value)
+    elif 0 <= value < 0x10000:
+        out += struct.pack("!BH", 0xCD, value)
+    elif 0 <= value < 0x100000000:
+        out += struct.pack("!BI", 0xCE, value)
+    elif value >= 0:
+        out += struct.pack("!BQ", 0xCF, value)
+    elif value >= -0x80000000:
+        out += struct.pack("!Bi", 0xD2, value)
+    else:
+        out += struct.pack("!Bq", 0xD3, value)
+
+
+def _pack_str(value: str, out: bytearray) -> None:
+    data = value.encode("utf-8")
+    length = len(data)
+    if length < 32:
+        out.append(0xA0 | length)
+    elif length < 0x100:
+        out += struct.pack("!BB", 0xD9, length)
+    elif length < 0x10000:
+        out += struct.pack("!BH", 0xDA, length)
+    else:
+        out += struct.pack("!BI", 0xDB, length)
+    out += data
+
+
+def decode(data: bytes, strings: Optional[List[str]] = None) -> Tuple[object, int]:
+    """Reference decoder (used by the size benchmark to verify round trips)."""
+    return _unpack(memoryview(data), 0, strings or [])
+
+
+def _unpack(data: memoryview, pos: int, strings: List[str]) -> Tuple[object, int]:
+    tag = data[pos]
+    pos += 1
+    if tag < 0x80:
+        return tag, pos
+    if tag >= 0xE0:
+        return tag - 0x100, pos
+    if 0x80 <= tag <= 0x8F or tag in (0xDE, 0xDF):
+        if tag <= 0x8F:
+            length = tag & 0x0F
+        elif tag == 0xDE:
+            (length,) = struct.unpack_from("!H", data, pos)
+            pos += 2
+        else:
+            (length,) = struct.unpack_from("!I", data, pos)
+            pos += 4
+        result: Dict[str, object] = {}
+        for _ in range(length):
+            name, pos = _unpack(data, pos, strings)
+            value, pos = _unpack(data, pos, strings)
+            result[name] = value
+        return result, pos
+    if 0x90 <= tag <= 0x9F or tag in (0xDC, 0xDD):
+        if tag <= 0x9F:
+            length = tag & 0x0F
+        elif tag == 0xDC:
+            (length,) = struct.unpack_from("!H", data, pos)
+            pos += 2
+        else:
+            (length,) = struct.unpack_from("!I", data, pos)
+            pos += 4
+        items = []
+        for _ in range(length):
+            item, pos = _unpack(data, pos, strings)
+            items.append(item)
+        return items, pos
+    if 0xA0 <= tag <= 0xBF or tag in (0xD9, 0xDA, 0xDB):
+        if tag <= 0xBF:
+            length = tag & 0x1F
+        else:
+            size = {0xD9: 1, 0xDA: 2, 0xDB: 4}[tag]
+            length = int.from_bytes(data[pos:pos + size], "big")
+            pos += size
+        return bytes(data[pos:pos + length]).decode("utf-8"), pos + length
+    if tag in (0xC4, 0xC5, 0xC6):
+        size = {0xC4: 1, 0xC5: 2, 0xC6: 4}[tag]
+        length = int.from_bytes(data[pos:pos + size], "big")
+        pos += size
+        return bytes(data[pos:pos + length]), pos + length
+    if tag in (0xD4, 0xD5):
+        size = 1 if tag == 0xD4 else 2
+        pos += 1  # ext type, always REF_EXT
+        index = int.from_bytes(data[pos:pos + size], "big")
+        return strings[index], pos + size
+    fixed = {
+        0xC0: (None, 0),
+        0xC2: (False, 0),
+        0xC3: (True, 0),
+    }
+    if tag in fixed:
+        return fixed[tag][0], pos
+    formats = {
+        0xCB: "!d",
+        0xCC: "!B",
+        0xCD: "!H",
+        0xCE: "!I",
+        0xCF: "!Q",
+        0xD2: "!i",
+        0xD3: "!q",
+    }
+    fmt = formats.get(tag)
+    if fmt is None:
+        raise ValueError(f"unsupported tag 0x{tag:02x}")
+    (value,) = struct.unpack_from(fmt, data, pos)
+    return value, pos + struct.calcsize(fmt)